@@ -1,3 +1,2 @@
 # Polymarket Copy Trading Bot - Python Edition
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))); import src.lib_core
 
@@ -7,7 +7,6 @@ Three strategies are supported:
 - FIXED: Copy a fixed dollar amount per trade
 - ADAPTIVE: Dynamically adjust percentage based on trader's order size
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 from enum import Enum
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
@@ -57,6 +56,8 @@ class CopyStrategyConfig:
     min_order_size_usd: float = 1.0  # Minimum size for a single order
     max_position_size_usd: Optional[float] = None  # Maximum total size for a position (optional)
     max_daily_volume_usd: Optional[float] = None  # Maximum total volume per day (optional)
+    max_daily_volume_per_trader_usd: Optional[float] = None  # Maximum volume copied from one trader per day (optional)
+    max_daily_volume_per_market_usd: Optional[float] = None  # Maximum volume in one market per day (optional)
 
 
 @dataclass
@@ -76,9 +77,17 @@ def calculate_order_size(
     config: CopyStrategyConfig,
     trader_order_size: float,
     available_balance: float,
-    current_position_size: float = 0.0
+    current_position_size: float = 0.0,
+    trader_address: Optional[str] = None,
+    market: Optional[str] = None
 ) -> OrderSizeCalculation:
-    """Calculate order size based on copy strategy"""
+    """
+    Calculate order size based on copy strategy
+
+    trader_address and market (conditionId) select the per-trader and
+    per-market daily volume caps; the rolling 24h volume comes from the
+    process-wide volume ledger.
+    """
     base_amount: float
     reasoning: str
 
@@ -125,6 +134,18 @@ def calculate_order_size(
                 final_amount = allowed_amount
                 reasoning += " → Reduced to fit position limit"
 
+    # Step 3.5: Apply daily volume limits (if configured)
+    daily_limit_reached = False
+    daily_room = get_daily_volume_room(config, trader_address, market)
+    if daily_room is not None and final_amount > daily_room:
+        if daily_room < config.min_order_size_usd:
+            final_amount = 0
+            daily_limit_reached = True
+            reasoning += " → Daily volume limit reached"
+        else:
+            final_amount = daily_room
+            reasoning += f" → Reduced to fit daily volume limit (${daily_room:.2f} left)"
+
     # Step 4: Check available balance (with 1% safety buffer)
     max_affordable = available_balance * 0.99
     if final_amount > max_affordable:
@@ -133,7 +154,7 @@ def calculate_order_size(
         reasoning += f" → Reduced to fit balance (${max_affordable:.2f})"
 
     # Step 5: Check minimum order size
-    if final_amount < config.min_order_size_usd:
+    if final_amount < config.min_order_size_usd and not daily_limit_reached:
         below_minimum = True
         reasoning += f" → Below minimum ${config.min_order_size_usd}"
         final_amount = config.min_order_size_usd
@@ -150,6 +171,29 @@ def calculate_order_size(
     )
 
 
+def get_daily_volume_room(
+    config: CopyStrategyConfig,
+    trader_address: Optional[str] = None,
+    market: Optional[str] = None
+) -> Optional[float]:
+    """USD that can still be bought today under the daily volume caps (None = no cap applies)"""
+    check_trader = bool(config.max_daily_volume_per_trader_usd and trader_address)
+    check_market = bool(config.max_daily_volume_per_market_usd and market)
+    if not (config.max_daily_volume_usd or check_trader or check_market):
+        return None
+
+    from ..utils.volume_ledger import get_volume_ledger
+    ledger = get_volume_ledger()
+    rooms: List[float] = []
+    if config.max_daily_volume_usd:
+        rooms.append(config.max_daily_volume_usd - ledger.total_volume())
+    if check_trader:
+        rooms.append(config.max_daily_volume_per_trader_usd - ledger.trader_volume(trader_address))
+    if check_market:
+        rooms.append(config.max_daily_volume_per_market_usd - ledger.market_volume(market))
+    return max(0.0, min(rooms))
+
+
 def _calculate_adaptive_percent(config: CopyStrategyConfig, trader_order_size: float) -> float:
     """
     Calculate adaptive percentage based on trader's order size
@@ -1,14 +1,16 @@
 """
 Database configuration and connection management
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import re
 import sys
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from typing import TYPE_CHECKING, Optional
 from .env import ENV
 
-client: MongoClient = None
+if TYPE_CHECKING:
+    from pymongo import MongoClient
+
+# pymongo is imported in connect_db so importing this module stays cheap
+client: Optional['MongoClient'] = None
 database_name: str = 'polymarket_copytrading'  # Default database name
 
 
@@ -42,6 +44,8 @@ def extract_database_name(uri: str) -> str:
 async def connect_db() -> None:
     """Connect to MongoDB"""
     global client, database_name
+    from pymongo import MongoClient
+    from pymongo.errors import ConnectionFailure
     try:
         uri = ENV.MONGO_URI or 'mongodb://localhost:27017/polymarket_copytrading'
         # Extract database name from URI
@@ -82,7 +86,7 @@ def close_db() -> None:
             print(f'[ERROR] Error closing MongoDB connection: {error}', file=sys.stderr)
 
 
-def get_client() -> MongoClient:
+def get_client() -> 'MongoClient':
     """Get MongoDB client instance"""
     if client is None:
         raise RuntimeError('Database not connected. Call connect_db() first.')
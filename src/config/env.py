@@ -1,7 +1,6 @@
 """
 Environment configuration and validation
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import os
 import re
 from typing import List, Optional
@@ -86,6 +85,17 @@ def validate_numeric_config() -> None:
     if network_retry_limit < 1 or network_retry_limit > 10:
         raise ValueError(f'Invalid NETWORK_RETRY_LIMIT: {os.getenv("NETWORK_RETRY_LIMIT")}. Must be between 1 and 10.')
 
+    # A claim must outlive the buffers that hold it, or another executor re-claims a buffered trade
+    claim_lease = int(os.getenv('CLAIM_LEASE_SECONDS', '600'))
+    held_seconds = int(os.getenv('NETTING_WINDOW_MS', '0')) / 1000
+    if os.getenv('TRADE_AGGREGATION_ENABLED', '').lower() == 'true':
+        held_seconds += int(os.getenv('TRADE_AGGREGATION_WINDOW_SECONDS', '300'))
+    if claim_lease <= held_seconds:
+        raise ValueError(
+            f'Invalid CLAIM_LEASE_SECONDS: {claim_lease}. Must be longer than the trade aggregation '
+            f'window plus the netting window ({held_seconds:g}s).'
+        )
+
 
 def validate_urls() -> None:
     """Validate URL formats"""
@@ -196,6 +206,8 @@ def parse_copy_strategy() -> CopyStrategyConfig:
             min_order_size_usd=float(os.getenv('MIN_ORDER_SIZE_USD', '1.0')),
             max_position_size_usd=float(os.getenv('MAX_POSITION_SIZE_USD')) if os.getenv('MAX_POSITION_SIZE_USD') else None,
             max_daily_volume_usd=float(os.getenv('MAX_DAILY_VOLUME_USD')) if os.getenv('MAX_DAILY_VOLUME_USD') else None,
+            max_daily_volume_per_trader_usd=float(os.getenv('MAX_DAILY_VOLUME_PER_TRADER_USD')) if os.getenv('MAX_DAILY_VOLUME_PER_TRADER_USD') else None,
+            max_daily_volume_per_market_usd=float(os.getenv('MAX_DAILY_VOLUME_PER_MARKET_USD')) if os.getenv('MAX_DAILY_VOLUME_PER_MARKET_USD') else None,
         )
 
         # Parse tiered multipliers if configured (even for legacy mode)
@@ -226,6 +238,8 @@ def parse_copy_strategy() -> CopyStrategyConfig:
         min_order_size_usd=float(os.getenv('MIN_ORDER_SIZE_USD', '1.0')),
         max_position_size_usd=float(os.getenv('MAX_POSITION_SIZE_USD')) if os.getenv('MAX_POSITION_SIZE_USD') else None,
         max_daily_volume_usd=float(os.getenv('MAX_DAILY_VOLUME_USD')) if os.getenv('MAX_DAILY_VOLUME_USD') else None,
+        max_daily_volume_per_trader_usd=float(os.getenv('MAX_DAILY_VOLUME_PER_TRADER_USD')) if os.getenv('MAX_DAILY_VOLUME_PER_TRADER_USD') else None,
+        max_daily_volume_per_market_usd=float(os.getenv('MAX_DAILY_VOLUME_PER_MARKET_USD')) if os.getenv('MAX_DAILY_VOLUME_PER_MARKET_USD') else None,
     )
 
     # Add adaptive strategy parameters if applicable
@@ -282,6 +296,32 @@ class ENV:
     # Trade aggregation settings
     TRADE_AGGREGATION_ENABLED: bool = os.getenv('TRADE_AGGREGATION_ENABLED', '').lower() == 'true'
     TRADE_AGGREGATION_WINDOW_SECONDS: int = int(os.getenv('TRADE_AGGREGATION_WINDOW_SECONDS', '300'))  # 5 minutes default
+    # Order execution settings
+    MAX_SWEEP_LEVELS: int = int(os.getenv('MAX_SWEEP_LEVELS', '3'))  # Book levels signed and posted together per attempt
+    COMBINE_SAME_ASSET_ORDERS: bool = os.getenv('COMBINE_SAME_ASSET_ORDERS', 'true').lower() == 'true'
+    NETTING_WINDOW_MS: int = int(os.getenv('NETTING_WINDOW_MS', '0'))  # Hold trades this long to net opposite sides (0 = off)
+    ORDER_BOOK_CACHE_MS: int = int(os.getenv('ORDER_BOOK_CACHE_MS', '250'))  # Reuse fetched order books this long (0 = off)
+    PORTFOLIO_RECONCILE_SECONDS: int = int(os.getenv('PORTFOLIO_RECONCILE_SECONDS', '60'))  # Reconcile our positions with the data-api
+    PORTFOLIO_FILL_GRACE_SECONDS: int = int(os.getenv('PORTFOLIO_FILL_GRACE_SECONDS', '30'))  # Keep local fills over lagging data-api snapshots
+    TRADER_CAPITAL_INCLUDE_CASH: bool = os.getenv('TRADER_CAPITAL_INCLUDE_CASH', 'true').lower() == 'true'  # Count traders' USDC in their capital
+    UNIFIED_COLLECTIONS: bool = os.getenv('UNIFIED_COLLECTIONS', 'false').lower() == 'true'  # One activities/positions collection for all wallets
+    CHANGE_STREAM_SAFETY_POLL_SECONDS: int = int(os.getenv('CHANGE_STREAM_SAFETY_POLL_SECONDS', '30'))  # Executor re-reads pending trades at least this often
+    EXECUTOR_ID: str = os.getenv('EXECUTOR_ID', '')  # Owner id on trade claims (default host:pid)
+    CLAIM_LEASE_SECONDS: int = int(os.getenv('CLAIM_LEASE_SECONDS', '600'))  # Claimed trades return to the queue after this
+    CLAIM_BATCH_SIZE: int = int(os.getenv('CLAIM_BATCH_SIZE', '20'))  # Max trades one executor claims per poll
+    INSTANCE_GROUP: str = os.getenv('INSTANCE_GROUP', '')  # Shard USER_ADDRESSES across instances with this group name (empty = off)
+    INSTANCE_ID: str = os.getenv('INSTANCE_ID', '')  # Member id in the instance group (default host:pid)
+    INSTANCE_HEARTBEAT_SECONDS: int = int(os.getenv('INSTANCE_HEARTBEAT_SECONDS', '5'))  # How often instances heartbeat and rebalance
+    INSTANCE_TTL_SECONDS: int = int(os.getenv('INSTANCE_TTL_SECONDS', '20'))  # Instances silent for longer lose their wallets
+    POLL_MAX_INTERVAL_SECONDS: int = int(os.getenv('POLL_MAX_INTERVAL_SECONDS', '10'))  # HTTP polling interval of quiet traders (active ones use FETCH_INTERVAL)
+    POLL_PAGE_SIZE: int = int(os.getenv('POLL_PAGE_SIZE', '50'))  # Trades requested per HTTP poll
+    RTDS_RETRY_SECONDS: int = int(os.getenv('RTDS_RETRY_SECONDS', '60'))  # Longest delay between RTDS reconnect attempts (jittered exponential backoff)
+    RTDS_PING_SECONDS: int = int(os.getenv('RTDS_PING_SECONDS', '5'))  # Application-level PING interval on RTDS connections
+    RTDS_STALE_SECONDS: int = int(os.getenv('RTDS_STALE_SECONDS', '30'))  # Reconnect when RTDS sends nothing (not even PONG) for this long
+    RTDS_WARM_SPARE: bool = os.getenv('RTDS_WARM_SPARE', 'true').lower() == 'true'  # Keep a standby RTDS connection for instant failover
+    DATA_API_URL: str = os.getenv('DATA_API_URL', 'https://data-api.polymarket.com').rstrip('/')  # Polymarket data-api base URL (positions/activity)
+    RTDS_URL: str = os.getenv('RTDS_URL', 'wss://ws-live-data.polymarket.com')  # RTDS endpoint (point at rtds_replay for offline runs)
+    RTDS_RECORD_FILE: str = os.getenv('RTDS_RECORD_FILE', '')  # Append received RTDS frames to this .jsonl.gz file (empty = off)
     MONGO_URI: str = os.getenv('MONGO_URI', '')
     RPC_URL: str = os.getenv('RPC_URL', '')
     USDC_CONTRACT_ADDRESS: str = os.getenv('USDC_CONTRACT_ADDRESS', '')
@@ -1,7 +1,6 @@
 """
 User interface types
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 from typing import Optional
 from bson import ObjectId
 
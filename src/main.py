@@ -1,17 +1,34 @@
 """
 Main entry point for Polymarket Copy Trading Bot
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))); import src.lib_core
 import asyncio
 import signal
 import sys
+from src.utils.startup_profiler import get_startup_profiler
+
+# --startup-profile prints import and startup phase timings once the bot is ready
+profiler = get_startup_profiler()
+profiler.start_import_timing()
+
 from src.config.db import connect_db, close_db
+from src.models.user_history import ensure_indexes
 from src.config.env import ENV
 from src.utils.create_clob_client import create_clob_client
 from src.services.trade_executor import trade_executor, stop_trade_executor
 from src.services.trade_monitor import trade_monitor, stop_trade_monitor
+from src.services.portfolio_state import start_portfolio_state
+from src.services.trader_portfolio import get_trader_portfolios
+from src.services.activity_stream import ActivityStream
+from src.services.instance_group import join_instance_group, get_active_wallets
 from src.utils.logger import startup, info, success, warning, error, separator
 from src.utils.system_status import check_system_status, display_system_status
+from src.utils.volume_ledger import get_volume_ledger, rebuild_volume_ledger
+
+profiler.stop_import_timing()
+
+# --role monitor|executor runs one side in its own process (default: both)
+ROLE_FLAG = '--role'
+ROLES = ('all', 'monitor', 'executor')
 
 # Global shutdown flag
 is_shutting_down = False
@@ -59,51 +76,108 @@ signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
 
 
+def parse_role(argv) -> str:
+    """Process role from --role monitor|executor (default: both in one process)"""
+    role = 'all'
+    for i, arg in enumerate(argv):
+        if arg == ROLE_FLAG and i + 1 < len(argv):
+            role = argv[i + 1]
+        elif arg.startswith(f'{ROLE_FLAG}='):
+            role = arg.split('=', 1)[1]
+    if role not in ROLES:
+        raise ValueError(f'Invalid {ROLE_FLAG} "{role}" (expected one of: {", ".join(ROLES)})')
+    return role
+
+
 async def main():
     """Main async function"""
     global shutdown_event
     
     # Initialize shutdown event
     shutdown_event = asyncio.Event()
+    tasks = []
+    activity_stream = None
+    instance_group = None
     
     try:
+        role = parse_role(sys.argv)
+        
         # Welcome message for first-time users
         print('\n[INFO] First time running the bot?')
         print('  Read the guide: GETTING_STARTED.md')
         print('  Run system status check: python -m src.scripts.setup.system_status\n')
         
-        await connect_db()
+        await profiler.timed('connect_db', connect_db())
         startup(ENV.USER_ADDRESSES, ENV.PROXY_WALLET)
+        if role != 'all':
+            info(f'Running as {role} process')
         
-        # Perform initial system status check
-        info('Performing initial system status check...')
-        status_result = await check_system_status()
-        display_system_status(status_result)
+        try:
+            await profiler.timed('ensure_indexes', asyncio.to_thread(ensure_indexes, ENV.USER_ADDRESSES))
+        except Exception as e:
+            warning(f'Could not create database indexes: {e}')
         
-        if not status_result.get('healthy', False):
-            warning('System status check failed, but continuing startup...')
+        # INSTANCE_GROUP: take this instance's share of the followed wallets
+        instance_group = await join_instance_group(role)
+        if instance_group is not None:
+            tasks.append(asyncio.create_task(instance_group.run()))
         
-        info('Initializing CLOB client...')
-        clob_client = await create_clob_client()
-        success('CLOB client ready')
+        if role in ('all', 'monitor'):
+            # Start the monitor first so the RTDS subscription is up as early as possible
+            separator()
+            info('Starting trade monitor...')
+            tasks.append(asyncio.create_task(trade_monitor()))
         
-        separator()
-        info('Starting trade monitor...')
-        # Start trade monitor in background
-        monitor_task = asyncio.create_task(trade_monitor())
+        if role in ('all', 'executor'):
+            # Rebuild the rolling 24h volume behind the daily volume limits
+            fills = await profiler.timed(
+                'volume_ledger',
+                asyncio.to_thread(rebuild_volume_ledger, get_volume_ledger(), ENV.USER_ADDRESSES)
+            )
+            info(f'Daily volume ledger: {fills} fill(s), ${get_volume_ledger().total_volume():.2f} in the last 24h')
+            
+            # System status checks and CLOB client setup are independent; run them together
+            info('Performing initial system status check and initializing CLOB client...')
+            status_result, clob_client, portfolio_task = await asyncio.gather(
+                profiler.timed('system_status', check_system_status()),
+                profiler.timed('create_clob_client', create_clob_client()),
+                profiler.timed('portfolio_state', start_portfolio_state()),
+            )
+            tasks.append(portfolio_task)
+            display_system_status(status_result)
+            
+            if not status_result.get('healthy', False):
+                warning('System status check failed, but continuing startup...')
+            
+            success('CLOB client ready')
+            
+            if role == 'executor':
+                # New trades come from the monitor process through MongoDB
+                activity_stream = ActivityStream(ENV.USER_ADDRESSES)
+                if not await profiler.timed('change_stream', activity_stream.start()):
+                    activity_stream = None
+                tasks.append(asyncio.create_task(get_trader_portfolios().run_sync_loop(get_active_wallets)))
+            
+            info('Starting trade executor...')
+            # Start trade executor in background
+            tasks.append(asyncio.create_task(trade_executor(clob_client, activity_stream)))
+            profiler.mark('executor started')
         
-        info('Starting trade executor...')
-        # Start trade executor in background
-        executor_task = asyncio.create_task(trade_executor(clob_client))
+        profiler.report()
         
         # Wait for shutdown event
         await shutdown_event.wait()
         
         # If shutdown event is set, cancel tasks and perform graceful shutdown
         if shutdown_event.is_set():
-            monitor_task.cancel()
-            executor_task.cancel()
-            await asyncio.gather(monitor_task, executor_task, return_exceptions=True)  # Wait for tasks to finish cancelling
+            if activity_stream is not None:
+                activity_stream.stop()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)  # Wait for tasks to finish cancelling
+            if instance_group is not None:
+                # Hand our wallets to the other instances now instead of after INSTANCE_TTL_SECONDS
+                instance_group.leave()
             await graceful_shutdown()
         
     except KeyboardInterrupt:
@@ -1,22 +1,277 @@
 """
 User history models for MongoDB
+
+Two layouts are supported:
+- per-wallet (default): user_activities_<wallet> / user_positions_<wallet>
+- unified (UNIFIED_COLLECTIONS=true): one `activities` and one `positions`
+  collection with a `wallet` field and compound indexes
+
+In the unified layout get_user_activity_collection/get_user_position_collection
+return a WalletScopedCollection, so per-wallet callers work unchanged, while
+the cross-wallet helpers below run a single indexed query.
+Migrate existing data with: python -m src.scripts.setup.migrate_collections
+
+Executors take pending trades with claim_pending_trades: each trade is
+claimed atomically (find_one_and_update) with an owner id and a lease, so
+several executors can share the queue and a crashed executor's trades are
+picked up again once its lease expires. Executors holding trades in a buffer
+(aggregation, netting) keep them with renew_claims.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
-from typing import Dict, Any
-from pymongo.collection import Collection
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
 from ..config.db import get_client, get_database_name
+from ..config.env import ENV
+
+if TYPE_CHECKING:
+    from pymongo.collection import Collection
+    from pymongo.results import UpdateResult
+
+UNIFIED_COLLECTIONS = ENV.UNIFIED_COLLECTIONS
+
+ACTIVITIES_COLLECTION = 'activities'
+POSITIONS_COLLECTION = 'positions'
+
+# (keys, options) per collection; the per-wallet layout uses the same indexes without `wallet`
+ACTIVITY_INDEXES = [
+    ([('wallet', 1), ('type', 1), ('bot', 1), ('botExcutedTime', 1)], {}),
+    # Unique so two monitors owning a wallet during a shard rebalance can't both store a trade
+    ([('wallet', 1), ('transactionHash', 1)], {
+        'unique': True,
+        'partialFilterExpression': {'transactionHash': {'$type': 'string'}},
+    }),
+    ([('wallet', 1), ('timestamp', -1)], {}),
+]
+POSITION_INDEXES = [
+    ([('wallet', 1), ('asset', 1), ('conditionId', 1)], {'unique': True}),
+]
+
+PENDING_TRADES_FILTER = {'type': 'TRADE', 'bot': False, 'botExcutedTime': 0}
+# botExcutedTime while a trade is claimed by an executor
+CLAIMED = 1
+
+
+def _database():
+    return get_client()[get_database_name()]
+
+
+class WalletScopedCollection:
+    """One wallet's view of a unified collection (filters and inserts carry `wallet`)"""
+
+    def __init__(self, collection: 'Collection', wallet: str):
+        self.collection = collection
+        self.wallet = wallet.lower()
+
+    def _scope(self, filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {**(filter or {}), 'wallet': self.wallet}
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, *args, **kwargs):
+        return self.collection.find(self._scope(filter), *args, **kwargs)
+
+    def find_one(self, filter: Optional[Dict[str, Any]] = None, *args, **kwargs):
+        return self.collection.find_one(self._scope(filter), *args, **kwargs)
+
+    def count_documents(self, filter: Dict[str, Any], **kwargs) -> int:
+        return self.collection.count_documents(self._scope(filter), **kwargs)
+
+    def insert_one(self, document: Dict[str, Any], **kwargs):
+        document['wallet'] = self.wallet
+        return self.collection.insert_one(document, **kwargs)
+
+    def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> 'UpdateResult':
+        # Upserts take `wallet` from the scoped filter
+        return self.collection.update_one(self._scope(filter), update, **kwargs)
+
+    def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any], *args, **kwargs):
+        return self.collection.find_one_and_update(self._scope(filter), update, *args, **kwargs)
+
+    def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> 'UpdateResult':
+        return self.collection.update_many(self._scope(filter), update, **kwargs)
+
+    def delete_many(self, filter: Dict[str, Any], **kwargs):
+        return self.collection.delete_many(self._scope(filter), **kwargs)
+
+
+AnyCollection = Union['Collection', WalletScopedCollection]
+
+
+def get_activities_collection() -> 'Collection':
+    """Unified activity collection (all wallets)"""
+    return _database()[ACTIVITIES_COLLECTION]
 
 
-def get_user_position_collection(wallet_address: str) -> Collection:
+def get_positions_collection() -> 'Collection':
+    """Unified position collection (all wallets)"""
+    return _database()[POSITIONS_COLLECTION]
+
+
+def get_user_position_collection(wallet_address: str) -> AnyCollection:
     """Get position collection for a specific wallet address"""
-    db = get_client()[get_database_name()]
+    if UNIFIED_COLLECTIONS:
+        return WalletScopedCollection(get_positions_collection(), wallet_address)
+    db = _database()
     collection_name = f'user_positions_{wallet_address}'
     return db[collection_name]
 
 
-def get_user_activity_collection(wallet_address: str) -> Collection:
+def get_user_activity_collection(wallet_address: str) -> AnyCollection:
     """Get activity collection for a specific wallet address"""
-    db = get_client()[get_database_name()]
+    if UNIFIED_COLLECTIONS:
+        return WalletScopedCollection(get_activities_collection(), wallet_address)
+    db = _database()
     collection_name = f'user_activities_{wallet_address}'
     return db[collection_name]
 
+
+def find_pending_trades(wallet_addresses: List[str]) -> List[Dict[str, Any]]:
+    """Unprocessed trades of all wallets, each tagged with userAddress"""
+    if UNIFIED_COLLECTIONS:
+        wallets = {address.lower(): address for address in wallet_addresses}
+        trades = list(get_activities_collection().find({**PENDING_TRADES_FILTER, 'wallet': {'$in': list(wallets)}}))
+        for trade in trades:
+            trade['userAddress'] = wallets[trade['wallet']]
+        return trades
+
+    trades = []
+    for address in wallet_addresses:
+        for trade in get_user_activity_collection(address).find(PENDING_TRADES_FILTER):
+            trade['userAddress'] = address
+            trades.append(trade)
+    return trades
+
+
+def claimable_filter(now: float) -> Dict[str, Any]:
+    """Pending trades, or claimed trades whose lease has expired"""
+    return {
+        'type': 'TRADE',
+        'bot': False,
+        '$or': [
+            {'botExcutedTime': 0},
+            {'botExcutedTime': CLAIMED, 'claimExpiresAt': {'$lt': now}},
+        ],
+    }
+
+
+def claim_pending_trades(
+    wallet_addresses: List[str],
+    owner: str,
+    lease_seconds: float,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Atomically claim up to `limit` trades (oldest first), each tagged with userAddress
+
+    A claimed trade has botExcutedTime=1, claimedBy=owner and a claimExpiresAt
+    lease; other executors skip it until the lease expires.
+    """
+    from pymongo import ReturnDocument
+
+    wallets = {address.lower(): address for address in wallet_addresses}
+    if UNIFIED_COLLECTIONS:
+        sources = [(get_activities_collection(), {'wallet': {'$in': list(wallets)}}, None)]
+    else:
+        sources = [(get_user_activity_collection(address), {}, address) for address in wallet_addresses]
+
+    claimed: List[Dict[str, Any]] = []
+    # Round-robin over the wallets so one busy wallet can't take the whole batch
+    while sources and len(claimed) < limit:
+        for source in list(sources):
+            if len(claimed) >= limit:
+                break
+            collection, scope, address = source
+            now = time.time()
+            trade = collection.find_one_and_update(
+                {**claimable_filter(now), **scope},
+                {'$set': {
+                    'botExcutedTime': CLAIMED,
+                    'claimedBy': owner,
+                    'claimedAt': now,
+                    'claimExpiresAt': now + lease_seconds,
+                }},
+                sort=[('timestamp', 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if trade is None:
+                sources.remove(source)
+                continue
+            trade['userAddress'] = address or wallets[trade['wallet']]
+            claimed.append(trade)
+    return claimed
+
+
+def renew_claims(trades: List[Dict[str, Any]], owner: str, lease_seconds: float) -> int:
+    """Extend the lease of trades this owner still holds; returns how many were renewed"""
+    expires_at = time.time() + lease_seconds
+    renewed = 0
+    for trade in trades:
+        result = get_user_activity_collection(trade['userAddress']).update_one(
+            {'_id': trade['_id'], 'bot': False, 'botExcutedTime': CLAIMED, 'claimedBy': owner},
+            {'$set': {'claimExpiresAt': expires_at}}
+        )
+        renewed += result.modified_count
+    return renewed
+
+
+def mark_pending_trades(wallet_addresses: List[str], update: Dict[str, Any]) -> Dict[str, int]:
+    """Apply an update to every unprocessed trade; returns modified counts per wallet"""
+    pending = {'bot': False}
+    if UNIFIED_COLLECTIONS:
+        wallets = [address.lower() for address in wallet_addresses]
+        counts = {
+            row['_id']: row['count']
+            for row in get_activities_collection().aggregate([
+                {'$match': {**pending, 'wallet': {'$in': wallets}}},
+                {'$group': {'_id': '$wallet', 'count': {'$sum': 1}}},
+            ])
+        }
+        get_activities_collection().update_many({**pending, 'wallet': {'$in': wallets}}, update)
+        return {address: counts.get(address.lower(), 0) for address in wallet_addresses}
+
+    return {
+        address: get_user_activity_collection(address).update_many(pending, update).modified_count
+        for address in wallet_addresses
+    }
+
+
+def count_activities(wallet_addresses: List[str]) -> List[int]:
+    """Number of stored activities per wallet (in the given order)"""
+    if UNIFIED_COLLECTIONS:
+        counts = {
+            row['_id']: row['count']
+            for row in get_activities_collection().aggregate([
+                {'$match': {'wallet': {'$in': [address.lower() for address in wallet_addresses]}}},
+                {'$group': {'_id': '$wallet', 'count': {'$sum': 1}}},
+            ])
+        }
+        return [counts.get(address.lower(), 0) for address in wallet_addresses]
+
+    return [get_user_activity_collection(address).count_documents({}) for address in wallet_addresses]
+
+
+def _create_indexes(collection: 'Collection', indexes: List[Any], scoped: bool) -> None:
+    from pymongo.errors import OperationFailure
+
+    for keys, options in indexes:
+        if not scoped:
+            keys = [key for key in keys if key[0] != 'wallet']
+        try:
+            collection.create_index(keys, **options)
+        except OperationFailure as e:
+            # IndexOptionsConflict / IndexKeySpecsConflict: an older index on these keys
+            # without the current options (e.g. before it became unique)
+            if e.code not in (85, 86):
+                raise
+            collection.drop_index(keys)
+            collection.create_index(keys, **options)
+
+
+def ensure_indexes(wallet_addresses: List[str]) -> None:
+    """Create the activity/position indexes of the active layout (no-op if they exist)"""
+    if UNIFIED_COLLECTIONS:
+        _create_indexes(get_activities_collection(), ACTIVITY_INDEXES, scoped=True)
+        _create_indexes(get_positions_collection(), POSITION_INDEXES, scoped=True)
+        return
+
+    db = _database()
+    for address in wallet_addresses:
+        _create_indexes(db[f'user_activities_{address}'], ACTIVITY_INDEXES, scoped=False)
+        _create_indexes(db[f'user_positions_{address}'], POSITION_INDEXES, scoped=False)
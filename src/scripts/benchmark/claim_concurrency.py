@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for trade claiming
+
+Starts several executor processes that claim trades from the same pending
+queue on a local mongod and verifies that every trade is claimed exactly once,
+that trades whose lease expired (a crashed executor) are reclaimed, and that
+trades under a live lease are left alone. Runs in a scratch database that is
+dropped afterwards; the bot's own data is never touched.
+
+Usage:
+    python -m src.scripts.benchmark.claim_concurrency [workers] [trades] [mongo_uri]
+"""
+import sys
+import time
+import multiprocessing
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+
+init(autoreset=True)
+
+DEFAULT_WORKERS = 4
+DEFAULT_TRADES = 400
+DEFAULT_URI = 'mongodb://localhost:27017'
+SCRATCH_DB = 'claim_concurrency_check'
+WALLETS = [f'0x{i:040x}' for i in range(1, 4)]
+EXPIRED_CLAIMS = 20
+LIVE_CLAIMS = 10
+LEASE_SECONDS = 60
+BATCH_SIZE = 5
+
+
+def connect(uri: str):
+    """Point the models at the scratch database"""
+    from pymongo import MongoClient
+    from src.config import db
+    db.client = MongoClient(uri)
+    db.database_name = SCRATCH_DB
+    return db.client[SCRATCH_DB]
+
+
+def seed(uri: str, trades: int) -> None:
+    from src.models.user_history import get_user_activity_collection
+    connect(uri).client.drop_database(SCRATCH_DB)
+    now = time.time()
+    for i in range(trades + EXPIRED_CLAIMS + LIVE_CLAIMS):
+        wallet = WALLETS[i % len(WALLETS)]
+        document = {'type': 'TRADE', 'bot': False, 'botExcutedTime': 0, 'timestamp': now + i, 'seq': i}
+        if i >= trades + EXPIRED_CLAIMS:
+            document.update(botExcutedTime=1, claimedBy='live-worker', claimExpiresAt=now + 3600)
+        elif i >= trades:
+            document.update(botExcutedTime=1, claimedBy='crashed-worker', claimExpiresAt=now - 1)
+        get_user_activity_collection(wallet).insert_one(document)
+
+
+def worker(uri: str, owner: str, results) -> None:
+    """One executor: claim in small batches until the queue is empty, then mark done"""
+    from src.models.user_history import claim_pending_trades, get_user_activity_collection
+    connect(uri)
+    claimed = []
+    while True:
+        batch = claim_pending_trades(WALLETS, owner, LEASE_SECONDS, BATCH_SIZE)
+        if not batch:
+            break
+        for trade in batch:
+            get_user_activity_collection(trade['userAddress']).update_one(
+                {'_id': trade['_id']}, {'$set': {'bot': True}}
+            )
+            claimed.append(trade['seq'])
+    results.put((owner, claimed))
+
+
+def run_check(workers: int, trades: int, uri: str) -> bool:
+    print(f"{Fore.CYAN}{Style.BRIGHT}Trade claim concurrency check{Style.RESET_ALL}")
+    print(f"  Workers: {workers} | Trades: {trades} (+{EXPIRED_CLAIMS} expired, +{LIVE_CLAIMS} live leases)")
+    print()
+
+    seed(uri, trades)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(uri, f'worker-{i}', results))
+        for i in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    per_worker = dict(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    counts = Counter(seq for claimed in per_worker.values() for seq in claimed)
+    duplicates = [seq for seq, count in counts.items() if count > 1]
+    expected = set(range(trades + EXPIRED_CLAIMS))
+    missing = expected - set(counts)
+    stolen = set(counts) - expected
+
+    for owner, claimed in sorted(per_worker.items()):
+        print(f"  {owner:<10} claimed {len(claimed):>5} trade(s)")
+    print(f"  {len(counts)} trade(s) in {elapsed:.2f}s")
+    print()
+
+    ok = True
+    for label, problems in (
+        ('claimed more than once', duplicates),
+        ('never claimed', missing),
+        ('claimed under a live lease', stolen),
+    ):
+        if problems:
+            ok = False
+            print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} {len(problems)} trade(s) {label}")
+    if ok:
+        print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Every trade claimed exactly once; expired leases reclaimed")
+
+    connect(uri).client.drop_database(SCRATCH_DB)
+    return ok
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS
+    trades = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TRADES
+    uri = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_URI
+    sys.exit(0 if run_check(workers, trades, uri) else 1)
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Synthetic RTDS firehose for ingestion capacity planning
+
+Generates market-wide activity/trades frames shaped like real RTDS payloads
+(every field process_trade_activity reads) at a target rate, with a given
+share of them made by the followed wallets. Each target rate is served by the
+replay server in a child process into the real monitor ingestion path
+(connect_rtds -> is_active_wallet -> process_trade_activity) against a scratch
+database on a local mongod.
+
+For every rate it reports:
+- achieved rate: frames received and handled per second
+- lag p95:       replay server send -> process_trade_activity for followed trades
+- CPU/msg:       process CPU time (all threads, pymongo included) per frame
+- RSS:           resident memory growth of the bot process during the step
+- Mongo writes:  inserts/s from serverStatus (stored trades/s if not permitted)
+
+A rate is sustainable when at least 95% of it is achieved and the lag p95
+stays under LAG_LIMIT_SECONDS. The scratch database is dropped before and
+after the run.
+
+With --write FILE a single recording at the first rate is written instead, for
+use with rtds_replay / rtds_pipeline.
+
+Usage:
+    python -m src.scripts.benchmark.rtds_firehose [--rates 100,250,500,1000,2000] [--duration 20]
+        [--wallets 50] [--hit-ratio 0.01] [--mongo-uri URI] [--port 8767] [--seed N] [--write FILE]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+from src.scripts.benchmark.rtds_replay import ReplayServer, option
+from src.scripts.benchmark.rtds_pipeline import PLACEHOLDERS, percentile
+
+init(autoreset=True)
+
+DEFAULT_URI = 'mongodb://localhost:27017'
+DEFAULT_PORT = 8767
+DEFAULT_RATES = '100,250,500,1000,2000'
+SCRATCH_DB = 'rtds_firehose_check'
+# Market-wide population the non-followed trades are drawn from
+BACKGROUND_WALLETS = 5000
+MARKETS = 500
+# Sustainability thresholds
+MIN_ACHIEVED_RATIO = 0.95
+LAG_LIMIT_SECONDS = 1.0
+# Give up on draining a step this long after the replay finished
+DRAIN_TIMEOUT = 30.0
+
+
+def fake_address(rng: random.Random) -> str:
+    return '0x' + ''.join(rng.choice('0123456789abcdef') for _ in range(40))
+
+
+def fake_hash(rng: random.Random) -> str:
+    return '0x' + ''.join(rng.choice('0123456789abcdef') for _ in range(64))
+
+
+def make_markets(rng: random.Random, count: int = MARKETS) -> List[Dict[str, Any]]:
+    """Binary markets with a condition id, two outcome tokens and event metadata"""
+    markets = []
+    for index in range(count):
+        slug = f'synthetic-market-{index}'
+        markets.append({
+            'conditionId': fake_hash(rng),
+            'assets': [str(rng.getrandbits(252)) for _ in range(2)],
+            'title': f'Synthetic market #{index}?',
+            'slug': slug,
+            'eventSlug': f'synthetic-event-{index // 4}',
+            'icon': f'https://polymarket-upload.s3.us-east-2.amazonaws.com/{slug}.png',
+            'price': rng.uniform(0.05, 0.95),
+        })
+    return markets
+
+
+def make_profile(address: str) -> Dict[str, Any]:
+    name = f'trader-{address[2:8]}'
+    return {
+        'name': name,
+        'pseudonym': name.title().replace('-', ' '),
+        'bio': '',
+        'profileImage': '',
+        'profileImageOptimized': '',
+    }
+
+
+class FirehoseGenerator:
+    """Builds RTDS activity/trades frames for followed and background wallets"""
+
+    def __init__(self, followed: List[str], hit_ratio: float, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.followed = followed
+        self.hit_ratio = hit_ratio
+        self.background = [fake_address(self.rng) for _ in range(BACKGROUND_WALLETS)]
+        self.markets = make_markets(self.rng)
+        self.sequence = 0
+
+    def trade(self, wallet: str, timestamp: float) -> Dict[str, Any]:
+        """One trade payload with the fields RTDS sends"""
+        market = self.rng.choice(self.markets)
+        outcome_index = self.rng.randrange(2)
+        price = market['price'] if outcome_index == 0 else 1 - market['price']
+        price = round(min(max(price + self.rng.uniform(-0.02, 0.02), 0.01), 0.99), 3)
+        self.sequence += 1
+        return {
+            'proxyWallet': wallet,
+            'timestamp': int(timestamp),
+            'conditionId': market['conditionId'],
+            'type': 'TRADE',
+            # Most trades are small, a few are large (roughly log-normal USDC size)
+            'size': round(min(self.rng.lognormvariate(3.0, 1.5), 50000) / price, 2),
+            'price': price,
+            'asset': market['assets'][outcome_index],
+            'side': self.rng.choice(('BUY', 'SELL')),
+            'outcomeIndex': outcome_index,
+            'outcome': ('Yes', 'No')[outcome_index],
+            'title': market['title'],
+            'slug': market['slug'],
+            'icon': market['icon'],
+            'eventSlug': market['eventSlug'],
+            'transactionHash': '0x' + hashlib.sha256(f'{self.sequence}:{wallet}'.encode()).hexdigest(),
+            **make_profile(wallet),
+        }
+
+    def frames(self, rate: float, duration: float, start: Optional[float] = None) -> List[Tuple[float, str]]:
+        """(send offset or time, raw frame) pairs evenly spaced at the rate"""
+        start = time.time() if start is None else start
+        frames = []
+        for index in range(int(rate * duration)):
+            sent_at = start + index / rate
+            followed = self.followed and self.rng.random() < self.hit_ratio
+            wallet = self.rng.choice(self.followed if followed else self.background)
+            frames.append((sent_at, json.dumps({
+                'connection_id': 'synthetic',
+                'topic': 'activity',
+                'type': 'trades',
+                'timestamp': int(sent_at * 1000),
+                'payload': self.trade(wallet, sent_at),
+            })))
+        return frames
+
+
+def write_recording(path: str, frames: List[Tuple[float, str]]) -> None:
+    """Write frames in the RTDS_RECORD_FILE format"""
+    import gzip
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        for sent_at, frame in frames:
+            file.write(json.dumps({'t': sent_at, 'frame': frame}) + '\n')
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident memory of this process (peak where only that is available)"""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def run_server(frames: List[Tuple[float, str]], port: int, ready, done, stop) -> None:
+    """Child process: replay the frames once at recorded speed"""
+
+    async def serve_once():
+        server = ReplayServer(frames, speed=1.0, fresh_timestamps=True, port=port)
+        await server.start()
+        ready.set()
+        await server.finished.wait()
+        done.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        await server.stop()
+
+    asyncio.run(serve_once())
+
+
+def mongo_writes(db) -> Optional[int]:
+    """Server-wide insert counter (None without serverStatus permission)"""
+    try:
+        return db.command('serverStatus')['opcounters']['insert']
+    except Exception:
+        return None
+
+
+async def run_step(
+    rate: float,
+    duration: float,
+    generator: FirehoseGenerator,
+    port: int,
+    db
+) -> Dict[str, Any]:
+    from src.services import trade_monitor
+    from src.services.rtds_connection import get_rtds_metrics
+
+    frames = generator.frames(rate, duration)
+    context = multiprocessing.get_context('spawn')
+    ready, done, stop = context.Event(), context.Event(), context.Event()
+    server = context.Process(target=run_server, args=(frames, port, ready, done, stop), daemon=True)
+    server.start()
+    await asyncio.to_thread(ready.wait, 30)
+
+    lags: List[float] = []
+    stored = 0
+    process_trade_activity = trade_monitor.process_trade_activity
+
+    async def timed_process(activity, address):
+        nonlocal stored
+        lags.append(time.time() - activity.get('_replaySentAt', time.time()))
+        if await process_trade_activity(activity, address):
+            stored += 1
+            return True
+        return False
+
+    trade_monitor.process_trade_activity = timed_process
+    trade_monitor.is_running = True
+    trade_monitor.disconnected_at = None
+
+    metrics = get_rtds_metrics()
+    connects = metrics.connects
+    rss_before = rss_mb()
+    writes_before = mongo_writes(db)
+    cpu_before = time.process_time()
+    started = time.time()
+    monitor_task = asyncio.create_task(trade_monitor.connect_rtds())
+    try:
+        # Wait for the connection, then for every frame to be handled
+        while metrics.connects == connects:
+            if monitor_task.done():
+                monitor_task.result()
+                raise RuntimeError('RTDS connection closed before the firehose started')
+            await asyncio.sleep(0.01)
+        episode = metrics.episodes[-1]
+        deadline = None
+        while episode.messages < len(frames) and not monitor_task.done():
+            await asyncio.sleep(0.01)
+            if deadline is None and done.is_set():
+                deadline = time.time() + DRAIN_TIMEOUT
+            if deadline is not None and time.time() > deadline:
+                break
+        finished = time.time()
+        handled = episode.messages
+    finally:
+        cpu = time.process_time() - cpu_before
+        trade_monitor.is_running = False
+        monitor_task.cancel()
+        await asyncio.gather(monitor_task, return_exceptions=True)
+        trade_monitor.process_trade_activity = process_trade_activity
+        stop.set()
+        await asyncio.to_thread(server.join, 10)
+
+    elapsed = max(finished - started, 1e-9)
+    writes_after = mongo_writes(db)
+    writes = writes_after - writes_before if writes_before is not None and writes_after is not None else None
+    rss_after = rss_mb()
+    achieved = handled / elapsed
+    lag_p95 = percentile(lags, 95)
+    return {
+        'rate': rate,
+        'frames': len(frames),
+        'handled': handled,
+        'achieved': achieved,
+        'stored': stored,
+        'lag_p95': lag_p95,
+        'cpu_per_message': cpu / max(handled, 1),
+        'rss_growth': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        'rss': rss_after,
+        'write_rate': (writes if writes is not None else stored) / elapsed,
+        'sustainable': handled == len(frames) and achieved >= rate * MIN_ACHIEVED_RATIO and lag_p95 <= LAG_LIMIT_SECONDS,
+    }
+
+
+def print_step(result: Dict[str, Any]) -> None:
+    status = f"{Fore.GREEN}ok{Style.RESET_ALL}" if result['sustainable'] else f"{Fore.RED}over{Style.RESET_ALL}"
+    rss = f"{result['rss_growth']:+7.1f}MB" if result['rss_growth'] is not None else '      n/a'
+    print(
+        f"  {result['rate']:>8.0f}/s  {result['achieved']:>8.0f}/s  {result['stored']:>6}  "
+        f"{result['lag_p95'] * 1000:>8.1f}ms  {result['cpu_per_message'] * 1e6:>7.0f}us  {rss}  "
+        f"{result['write_rate']:>7.1f}/s  {status}"
+    )
+
+
+async def run_firehose(
+    rates: List[float],
+    duration: float,
+    wallet_count: int,
+    hit_ratio: float,
+    uri: str,
+    port: int,
+    seed: Optional[int]
+) -> bool:
+    rng = random.Random(seed)
+    followed = [fake_address(rng) for _ in range(wallet_count)]
+    generator = FirehoseGenerator(followed, hit_ratio, seed)
+
+    # Point the bot's configuration at the firehose and the scratch database
+    os.environ.update({
+        'USER_ADDRESSES': ','.join(followed),
+        'MONGO_URI': f"{uri.rstrip('/')}/{SCRATCH_DB}",
+        'RTDS_URL': f'ws://localhost:{port}',
+        'RTDS_RECORD_FILE': '',
+        'RTDS_WARM_SPARE': 'false',
+        'INSTANCE_GROUP': '',
+    })
+    for key, value in PLACEHOLDERS.items():
+        os.environ.setdefault(key, value)
+
+    from src.config.db import connect_db, close_db, get_client
+    from src.models.user_history import ensure_indexes
+
+    print(f"{Fore.CYAN}{Style.BRIGHT}RTDS firehose benchmark{Style.RESET_ALL}")
+    print(f"  Followed wallets: {wallet_count} | Hit ratio: {hit_ratio:.2%} | {duration:g}s per rate")
+    print(f"  Database: {SCRATCH_DB}")
+    print()
+
+    await connect_db()
+    client = get_client()
+    client.drop_database(SCRATCH_DB)
+    ensure_indexes(followed)
+    rss_start = rss_mb()
+
+    print(f"  {'target':>10}  {'achieved':>10}  {'stored':>6}  {'lag p95':>10}  {'CPU/msg':>9}  {'RSS':>9}  {'writes':>9}")
+    results = []
+    try:
+        for rate in rates:
+            result = await run_step(rate, duration, generator, port, client.admin)
+            results.append(result)
+            print_step(result)
+            if not result['sustainable']:
+                break
+    finally:
+        client.drop_database(SCRATCH_DB)
+        close_db()
+    print()
+
+    rss_end = rss_mb()
+    if rss_start is not None and rss_end is not None:
+        messages = sum(result['handled'] for result in results)
+        print(f"  Memory: {rss_start:.1f}MB -> {rss_end:.1f}MB "
+              f"({(rss_end - rss_start) / max(messages, 1) * 1000:+.2f}MB per 1000 messages)")
+
+    sustainable = [result for result in results if result['sustainable']]
+    if not sustainable:
+        print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} Not even {rates[0]:g} messages/s was sustainable")
+        return False
+    best = max(sustainable, key=lambda result: result['rate'])
+    print(
+        f"{Fore.GREEN}[OK]{Style.RESET_ALL} Sustainable ingest rate: {best['rate']:g} messages/s "
+        f"({best['rate'] * hit_ratio:.1f} followed trade(s)/s across {wallet_count} wallet(s))"
+    )
+    if len(sustainable) == len(rates):
+        print("  The highest rate tested was sustainable; try higher --rates")
+    return True
+
+
+if __name__ == '__main__':
+    rates = [float(rate) for rate in option('--rates', DEFAULT_RATES).split(',') if rate]
+    duration = float(option('--duration', '20'))
+    wallet_count = int(option('--wallets', '50'))
+    hit_ratio = float(option('--hit-ratio', '0.01'))
+    seed_option = option('--seed', '')
+    seed = int(seed_option) if seed_option else None
+    if not rates or not 0 <= hit_ratio <= 1:
+        print(__doc__)
+        sys.exit(1)
+
+    write_path = option('--write', '')
+    if write_path:
+        rng = random.Random(seed)
+        generator = FirehoseGenerator([fake_address(rng) for _ in range(wallet_count)], hit_ratio, seed)
+        frames = generator.frames(rates[0], duration)
+        write_recording(write_path, frames)
+        print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Wrote {len(frames)} frame(s) at {rates[0]:g}/s to {write_path}")
+        sys.exit(0)
+
+    ok = asyncio.run(run_firehose(
+        rates,
+        duration,
+        wallet_count,
+        hit_ratio,
+        option('--mongo-uri', DEFAULT_URI),
+        int(option('--port', str(DEFAULT_PORT))),
+        seed,
+    ))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingestion benchmark from an RTDS recording
+
+Replays a recording through the local replay server into the real monitor
+ingestion path (connect_rtds -> process_trade_activity) and runs an executor
+claim loop (claim_pending_trades, as trade_executor does) against a scratch
+database on a local mongod. No orders are placed: the executor side stops at
+the claim, which is where order placement would start.
+
+Reports throughput and latency percentiles for:
+- ingest: replay server send -> trade stored in MongoDB
+- queue:  trade stored -> claimed by the executor
+- total:  replay server send -> claimed
+
+The scratch database is dropped before and after the run.
+
+Usage:
+    python -m src.scripts.benchmark.rtds_pipeline <recording.jsonl.gz> [--speed 1|N|max] [--mongo-uri URI] [--port 8766]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+from src.scripts.benchmark.rtds_replay import ReplayServer, load_recording, parse_speed, option
+
+init(autoreset=True)
+
+DEFAULT_URI = 'mongodb://localhost:27017'
+DEFAULT_PORT = 8766
+SCRATCH_DB = 'rtds_pipeline_check'
+# Stop once no new trade was stored or claimed for this long after the replay
+IDLE_SECONDS = 3.0
+CLAIM_OWNER = 'rtds-pipeline'
+# Placeholders for settings the ingestion path doesn't use (real values in .env win)
+PLACEHOLDERS = {
+    'PROXY_WALLET': '0x' + '0' * 40,
+    'PRIVATE_KEY': '0' * 64,
+    'CLOB_HTTP_URL': 'https://clob.polymarket.com/',
+    'CLOB_WS_URL': 'wss://ws-subscriptions-clob.polymarket.com/ws',
+    'RPC_URL': 'http://localhost:8545',
+    'USDC_CONTRACT_ADDRESS': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+}
+
+
+def recorded_wallets(frames) -> List[str]:
+    """Trader wallets that appear in the recording's trade frames"""
+    wallets = set()
+    for _, frame in frames:
+        try:
+            payload = json.loads(frame).get('payload') or {}
+        except (ValueError, AttributeError):
+            continue
+        if isinstance(payload, dict) and payload.get('proxyWallet'):
+            wallets.add(payload['proxyWallet'].lower())
+    return sorted(wallets)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def print_latency(label: str, seconds: List[float]) -> None:
+    ms = [value * 1000 for value in seconds]
+    print(
+        f"  {label:<7} p50 {percentile(ms, 50):>8.1f}ms  p95 {percentile(ms, 95):>8.1f}ms  "
+        f"p99 {percentile(ms, 99):>8.1f}ms  max {max(ms, default=0):>8.1f}ms"
+    )
+
+
+async def run_pipeline(path: str, speed: Optional[float], uri: str, port: int) -> bool:
+    frames = load_recording(path)
+    wallets = recorded_wallets(frames)
+    if not wallets:
+        print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} No trade frames in {path}")
+        return False
+
+    server = ReplayServer(frames, speed, fresh_timestamps=True, port=port)
+
+    # Point the bot's configuration at the replay server and the scratch database
+    os.environ.update({
+        'USER_ADDRESSES': ','.join(wallets),
+        'MONGO_URI': f"{uri.rstrip('/')}/{SCRATCH_DB}",
+        'RTDS_URL': server.url,
+        'RTDS_RECORD_FILE': '',
+        'INSTANCE_GROUP': '',
+    })
+    for key, value in PLACEHOLDERS.items():
+        os.environ.setdefault(key, value)
+
+    from src.config.db import connect_db, close_db, get_client
+    from src.config.env import ENV
+    from src.models.user_history import claim_pending_trades, get_user_activity_collection, ensure_indexes
+    from src.services import trade_monitor
+
+    speed_label = 'max' if speed is None else f'{speed:g}x'
+    print(f"{Fore.CYAN}{Style.BRIGHT}RTDS pipeline benchmark{Style.RESET_ALL}")
+    print(f"  Recording: {path} ({len(frames)} frame(s), {len(wallets)} wallet(s))")
+    print(f"  Speed: {speed_label} | Database: {SCRATCH_DB}")
+    print()
+
+    await connect_db()
+    get_client().drop_database(SCRATCH_DB)
+    ensure_indexes(wallets)
+
+    # transactionHash -> (sent by replay server, stored, claimed)
+    sent_at: Dict[str, float] = {}
+    stored_at: Dict[str, float] = {}
+    claimed_at: Dict[str, float] = {}
+
+    process_trade_activity = trade_monitor.process_trade_activity
+
+    async def timed_process(activity, address):
+        stored = await process_trade_activity(activity, address)
+        if stored:
+            tx = activity.get('transactionHash')
+            stored_at[tx] = time.time()
+            sent_at[tx] = activity.get('_replaySentAt', stored_at[tx])
+        return stored
+
+    trade_monitor.process_trade_activity = timed_process
+
+    async def claim_loop():
+        while True:
+            trades = await asyncio.to_thread(
+                claim_pending_trades, wallets, CLAIM_OWNER, 60, ENV.CLAIM_BATCH_SIZE
+            )
+            now = time.time()
+            for trade in trades:
+                claimed_at[trade.get('transactionHash')] = now
+                get_user_activity_collection(trade['userAddress']).update_one(
+                    {'_id': trade['_id']}, {'$set': {'bot': True}}
+                )
+            if not trades:
+                await asyncio.sleep(0.01)
+
+    await server.start()
+    started = time.time()
+    monitor_task = asyncio.create_task(trade_monitor.connect_rtds())
+    claim_task = asyncio.create_task(claim_loop())
+    try:
+        await server.finished.wait()
+        replayed = time.time()
+        last_change, last_counts = time.time(), (0, 0)
+        while time.time() - last_change < IDLE_SECONDS:
+            await asyncio.sleep(0.1)
+            counts = (len(stored_at), len(claimed_at))
+            if counts != last_counts:
+                last_change, last_counts = time.time(), counts
+        finished = last_change
+    finally:
+        trade_monitor.is_running = False
+        for task in (monitor_task, claim_task):
+            task.cancel()
+        await asyncio.gather(monitor_task, claim_task, return_exceptions=True)
+        await trade_monitor.warm_spare.close()
+        await server.stop()
+        trade_monitor.process_trade_activity = process_trade_activity
+
+    elapsed = max(finished - started, 1e-9)
+    complete = [tx for tx in stored_at if tx in claimed_at]
+    print(f"  Frames sent:    {server.frames_sent} in {replayed - started:.2f}s")
+    print(f"  Trades stored:  {len(stored_at)} ({len(stored_at) / elapsed:.1f}/s)")
+    print(f"  Trades claimed: {len(claimed_at)} ({len(claimed_at) / elapsed:.1f}/s)")
+    print()
+    print_latency('ingest', [stored_at[tx] - sent_at[tx] for tx in stored_at])
+    print_latency('queue', [claimed_at[tx] - stored_at[tx] for tx in complete])
+    print_latency('total', [claimed_at[tx] - sent_at[tx] for tx in complete])
+    print()
+
+    ok = len(complete) == len(stored_at) and len(stored_at) > 0
+    if ok:
+        print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Every stored trade was claimed")
+    else:
+        print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} {len(stored_at) - len(complete)} stored trade(s) never claimed")
+
+    get_client().drop_database(SCRATCH_DB)
+    close_db()
+    return ok
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
+        print(__doc__)
+        sys.exit(1)
+    ok = asyncio.run(run_pipeline(
+        sys.argv[1],
+        parse_speed(option('--speed', 'max')),
+        option('--mongo-uri', DEFAULT_URI),
+        int(option('--port', str(DEFAULT_PORT))),
+    ))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Local RTDS replay server
+
+Serves a recording made with RTDS_RECORD_FILE over a local websocket so the
+monitor can run offline (set RTDS_URL=ws://localhost:8765). Each client that
+sends a subscribe message gets the recorded frames at recorded speed (1),
+N times faster (N) or as fast as possible (max). PINGs are answered with PONG
+like the real RTDS.
+
+Trade timestamps are rewritten to the send time by default so the monitor
+doesn't skip replayed trades as too old, and every trade payload carries
+_replaySentAt for latency measurements.
+
+Usage:
+    python -m src.scripts.benchmark.rtds_replay <recording.jsonl.gz> [--speed 1|N|max] [--port 8765] [--keep-timestamps]
+"""
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+
+init(autoreset=True)
+
+DEFAULT_PORT = 8765
+PING_MESSAGE = 'PING'
+PONG_MESSAGE = 'PONG'
+
+
+def load_recording(path: str) -> List[Tuple[float, str]]:
+    """Read a recording without importing the bot's configuration"""
+    import gzip
+    frames = []
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                frames.append((record['t'], record['frame']))
+    return frames
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """Replay speed factor (None = as fast as possible)"""
+    if value == 'max':
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise ValueError(f'Invalid speed: {value}')
+    return speed
+
+
+class ReplayServer:
+    """Replays recorded RTDS frames to every subscribed client"""
+
+    def __init__(
+        self,
+        frames: List[Tuple[float, str]],
+        speed: Optional[float] = 1.0,
+        fresh_timestamps: bool = True,
+        host: str = 'localhost',
+        port: int = DEFAULT_PORT
+    ):
+        self.frames = frames
+        self.speed = speed
+        self.fresh_timestamps = fresh_timestamps
+        self.host = host
+        self.port = port
+        self.replays = 0
+        self.frames_sent = 0
+        self.finished = asyncio.Event()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f'ws://{self.host}:{self.port}'
+
+    def prepare(self, frame: str) -> str:
+        """Stamp trade payloads with the send time"""
+        try:
+            data = json.loads(frame)
+        except ValueError:
+            return frame
+        payload = data.get('payload') if isinstance(data, dict) else None
+        if not isinstance(payload, dict):
+            return frame
+        now = time.time()
+        payload['_replaySentAt'] = now
+        if self.fresh_timestamps and 'timestamp' in payload:
+            payload['timestamp'] = int(now)
+        return json.dumps(data)
+
+    async def replay(self, ws) -> None:
+        started = time.time()
+        first = self.frames[0][0] if self.frames else 0.0
+        for index, (recorded_at, frame) in enumerate(self.frames):
+            if self.speed is not None:
+                delay = (recorded_at - first) / self.speed - (time.time() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await ws.send(self.prepare(frame))
+            self.frames_sent += 1
+        self.replays += 1
+        self.finished.set()
+
+    async def handler(self, ws, path: str = '') -> None:
+        replay_task = None
+        try:
+            async for message in ws:
+                if message == PING_MESSAGE:
+                    await ws.send(PONG_MESSAGE)
+                    continue
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    continue
+                if data.get('action') == 'subscribe' and replay_task is None:
+                    replay_task = asyncio.create_task(self.replay(ws))
+        except Exception:
+            pass  # Client went away
+        finally:
+            if replay_task is not None:
+                replay_task.cancel()
+
+    async def start(self) -> None:
+        import websockets
+        self._server = await websockets.serve(self.handler, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def serve(path: str, speed: Optional[float], port: int, fresh_timestamps: bool) -> None:
+    frames = load_recording(path)
+    server = ReplayServer(frames, speed, fresh_timestamps, port=port)
+    await server.start()
+    speed_label = 'max' if speed is None else f'{speed:g}x'
+    duration = frames[-1][0] - frames[0][0] if frames else 0.0
+    print(f"{Fore.CYAN}{Style.BRIGHT}RTDS replay server{Style.RESET_ALL}")
+    print(f"  Recording: {path} ({len(frames)} frame(s), {duration:.0f}s)")
+    print(f"  Speed: {speed_label}")
+    print(f"  Listening on {server.url}  (set RTDS_URL={server.url})")
+    print()
+    try:
+        while True:
+            await server.finished.wait()
+            server.finished.clear()
+            print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Replay {server.replays} finished ({server.frames_sent} frame(s) sent in total)")
+    finally:
+        await server.stop()
+
+
+def option(name: str, default: str) -> str:
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1].startswith('--'):
+        print(__doc__)
+        sys.exit(1)
+    try:
+        asyncio.run(serve(
+            sys.argv[1],
+            parse_speed(option('--speed', '1')),
+            int(option('--port', str(DEFAULT_PORT))),
+            '--keep-timestamps' not in sys.argv,
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Polymarket data-api, CLOB and Polygon RPC
+
+Serves everything the bot and the research scripts call so they can be
+load-tested on one machine without touching Polymarket:
+
+- data-api:  GET /positions, GET /activity          (DATA_API_URL=http://localhost:8080)
+- CLOB:      GET /book, GET /neg-risk, /auth/*, POST /order, POST /orders
+                                                    (CLOB_HTTP_URL=http://localhost:8080)
+- RPC:       POST /rpc (eth_call balanceOf/allowance/decimals, eth_getCode, batches)
+                                                    (RPC_URL=http://localhost:8080/rpc)
+
+Positions, activity and books come from a fixtures JSON file:
+    {"positions": {"<wallet>": [...]}, "activity": {"<wallet>": [...]},
+     "books": {"<token_id>": {"bids": [...], "asks": [...]}}, "balance": 1000}
+Tokens without a fixture book get a generated one, so any token can be traded.
+
+Orders are accepted with a configurable latency and fill behavior: FOK orders
+are killed with probability --kill-rate, rejected for balance with
+--balance-error-rate (or when the stub USDC balance runs out), and fail with
+HTTP 500 at --error-rate.
+
+Usage:
+    python -m src.scripts.benchmark.stub_server [--fixtures FILE] [--port 8080] [--latency-ms 50]
+        [--kill-rate 0.1] [--balance-error-rate 0.0] [--error-rate 0.0] [--balance 1000] [--seed N]
+"""
+import sys
+import json
+import time
+import base64
+import random
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+from src.scripts.benchmark.rtds_replay import option
+
+init(autoreset=True)
+
+DEFAULT_PORT = 8080
+DEFAULT_BALANCE = 1000.0
+USDC_DECIMALS = 6
+BOOK_LEVELS = 5
+BOOK_LEVEL_SIZE = 500.0
+BALANCE_OF_SELECTOR = '0x70a08231'
+ALLOWANCE_SELECTOR = '0xdd62ed3e'
+DECIMALS_SELECTOR = '0x313ce567'
+FOK_KILLED = "order couldn't be fully filled. FOK orders are fully filled or killed."
+NOT_ENOUGH_BALANCE = 'not enough balance / allowance'
+
+
+def lower_keys(mapping: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key.lower(): value for key, value in (mapping or {}).items()}
+
+
+def generated_book(token_id: str) -> Dict[str, Any]:
+    """Deterministic book around a mid price derived from the token id"""
+    mid = 0.2 + (int(hashlib.sha1(token_id.encode()).hexdigest()[:8], 16) % 600) / 1000
+    return {
+        'market': '',
+        'asset_id': token_id,
+        'bids': [{'price': f'{mid - 0.01 * (i + 1):.2f}', 'size': f'{BOOK_LEVEL_SIZE:.2f}'} for i in range(BOOK_LEVELS)],
+        'asks': [{'price': f'{mid + 0.01 * (i + 1):.2f}', 'size': f'{BOOK_LEVEL_SIZE:.2f}'} for i in range(BOOK_LEVELS)],
+    }
+
+
+class StubState:
+    """Fixtures, order behavior and counters of the stub"""
+
+    def __init__(
+        self,
+        fixtures: Dict[str, Any],
+        latency_ms: float = 0.0,
+        kill_rate: float = 0.0,
+        balance_error_rate: float = 0.0,
+        error_rate: float = 0.0,
+        balance: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.positions: Dict[str, List[Dict[str, Any]]] = lower_keys(fixtures.get('positions'))
+        self.activity: Dict[str, List[Dict[str, Any]]] = lower_keys(fixtures.get('activity'))
+        self.books: Dict[str, Dict[str, Any]] = dict(fixtures.get('books') or {})
+        self.balance = float(balance if balance is not None else fixtures.get('balance', DEFAULT_BALANCE))
+        self.latency = latency_ms / 1000
+        self.kill_rate = kill_rate
+        self.balance_error_rate = balance_error_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.orders = {'filled': 0, 'killed': 0, 'balance': 0, 'error': 0}
+
+    def book(self, token_id: str) -> Dict[str, Any]:
+        if token_id not in self.books:
+            self.books[token_id] = generated_book(token_id)
+        return self.books[token_id]
+
+    def activity_page(self, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Activity filtered and paged like the data-api (newest first by default)"""
+        trades = self.activity.get(query.get('user', '').lower(), [])
+        if query.get('type'):
+            trades = [trade for trade in trades if trade.get('type', 'TRADE') == query['type']]
+        if query.get('start'):
+            trades = [trade for trade in trades if trade.get('timestamp', 0) >= int(query['start'])]
+        if query.get('end'):
+            trades = [trade for trade in trades if trade.get('timestamp', 0) <= int(query['end'])]
+        trades = sorted(trades, key=lambda trade: trade.get('timestamp', 0), reverse=query.get('sortDirection', 'DESC') != 'ASC')
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', 100))
+        return trades[offset:offset + limit]
+
+    def fill(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Outcome of one FOK order"""
+        signed = order.get('order') or {}
+        roll = self.random.random()
+        maker_amount = int(signed.get('makerAmount', 0) or 0) / 10 ** USDC_DECIMALS
+        taker_amount = int(signed.get('takerAmount', 0) or 0) / 10 ** USDC_DECIMALS
+        is_buy = signed.get('side') == 'BUY'
+        if roll < self.balance_error_rate or (is_buy and maker_amount > self.balance):
+            self.orders['balance'] += 1
+            return {'success': False, 'errorMsg': NOT_ENOUGH_BALANCE}
+        if roll < self.balance_error_rate + self.kill_rate:
+            self.orders['killed'] += 1
+            return {'success': False, 'errorMsg': FOK_KILLED}
+        # BUY spends makerAmount USDC; SELL receives takerAmount USDC
+        self.balance += -maker_amount if is_buy else taker_amount
+        self.orders['filled'] += 1
+        return {
+            'success': True,
+            'errorMsg': '',
+            'orderID': '0x' + hashlib.sha256(json.dumps(signed, sort_keys=True).encode()).hexdigest(),
+            'status': 'matched',
+            'makingAmount': f'{maker_amount:.6f}',
+            'takingAmount': f'{taker_amount:.6f}',
+        }
+
+    def rpc(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one JSON-RPC call"""
+        method = call.get('method')
+        params = call.get('params') or []
+        result: Any = '0x'
+        if method == 'eth_call':
+            data = (params[0] or {}).get('data', '')
+            if data.startswith(BALANCE_OF_SELECTOR):
+                result = hex(int(self.balance * 10 ** USDC_DECIMALS))
+            elif data.startswith(ALLOWANCE_SELECTOR):
+                result = hex(2 ** 255)
+            elif data.startswith(DECIMALS_SELECTOR):
+                result = hex(USDC_DECIMALS)
+        elif method == 'eth_chainId':
+            result = hex(137)
+        elif method == 'eth_blockNumber':
+            result = hex(int(time.time()))
+        # eth_getCode: '0x' = EOA wallet
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
+
+
+def create_app(state: StubState):
+    """aiohttp application serving the stub endpoints"""
+    from aiohttp import web
+
+    @web.middleware
+    async def latency(request, handler):
+        state.requests += 1
+        if state.latency:
+            await asyncio.sleep(state.latency)
+        return await handler(request)
+
+    async def positions(request):
+        return web.json_response(state.positions.get(request.query.get('user', '').lower(), []))
+
+    async def activity(request):
+        return web.json_response(state.activity_page(dict(request.query)))
+
+    async def book(request):
+        return web.json_response(state.book(request.query.get('token_id', '')))
+
+    async def neg_risk(request):
+        return web.json_response({'neg_risk': False})
+
+    async def api_key(request):
+        return web.json_response({
+            'apiKey': 'stub-api-key',
+            'secret': base64.urlsafe_b64encode(b'stub-secret').decode(),
+            'passphrase': 'stub-passphrase',
+        })
+
+    async def post_order(request):
+        if state.random.random() < state.error_rate:
+            state.orders['error'] += 1
+            return web.json_response({'error': 'stub injected server error'}, status=500)
+        return web.json_response(state.fill(await request.json()))
+
+    async def post_orders(request):
+        if state.random.random() < state.error_rate:
+            state.orders['error'] += 1
+            return web.json_response({'error': 'stub injected server error'}, status=500)
+        return web.json_response([state.fill(order) for order in await request.json()])
+
+    async def rpc(request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([state.rpc(call) for call in payload])
+        return web.json_response(state.rpc(payload))
+
+    app = web.Application(middlewares=[latency])
+    app.add_routes([
+        web.get('/positions', positions),
+        web.get('/activity', activity),
+        web.get('/book', book),
+        web.get('/neg-risk', neg_risk),
+        web.post('/auth/api-key', api_key),
+        web.get('/auth/derive-api-key', api_key),
+        web.post('/order', post_order),
+        web.post('/orders', post_orders),
+        web.post('/rpc', rpc),
+    ])
+    return app
+
+
+async def serve(state: StubState, port: int) -> None:
+    from aiohttp import web
+
+    runner = web.AppRunner(create_app(state))
+    await runner.setup()
+    await web.TCPSite(runner, 'localhost', port).start()
+    base = f'http://localhost:{port}'
+    print(f"{Fore.CYAN}{Style.BRIGHT}Polymarket stub server{Style.RESET_ALL}")
+    print(f"  DATA_API_URL={base}")
+    print(f"  CLOB_HTTP_URL={base}")
+    print(f"  RPC_URL={base}/rpc")
+    print(f"  Latency: {state.latency * 1000:.0f}ms | Kill rate: {state.kill_rate:.0%} | "
+          f"Balance errors: {state.balance_error_rate:.0%} | Server errors: {state.error_rate:.0%}")
+    print()
+    try:
+        while True:
+            await asyncio.sleep(10)
+            orders = state.orders
+            print(
+                f"  {state.requests} request(s) | orders: {orders['filled']} filled, {orders['killed']} killed, "
+                f"{orders['balance']} balance, {orders['error']} error | balance ${state.balance:.2f}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    fixtures_path = option('--fixtures', '')
+    fixtures = json.loads(Path(fixtures_path).read_text()) if fixtures_path else {}
+    seed = option('--seed', '')
+    state = StubState(
+        fixtures,
+        latency_ms=float(option('--latency-ms', '0')),
+        kill_rate=float(option('--kill-rate', '0')),
+        balance_error_rate=float(option('--balance-error-rate', '0')),
+        error_rate=float(option('--error-rate', '0')),
+        balance=float(option('--balance', str(fixtures.get('balance', DEFAULT_BALANCE)))),
+        seed=int(seed) if seed else None,
+    )
+    try:
+        asyncio.run(serve(state, int(option('--port', str(DEFAULT_PORT)))))
+    except KeyboardInterrupt:
+        pass
@@ -1,3 +1,2 @@
 """Position management scripts"""
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 
@@ -2,7 +2,6 @@
 """
 Manually sell a specific position
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 from pathlib import Path
@@ -2,7 +2,6 @@
 """
 Redeem resolved positions
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 from pathlib import Path
@@ -31,15 +30,14 @@ async def redeem_resolved_positions():
     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Fetching positions...")
     
     try:
-        wallet = ENV.PROXY_WALLET
-        url = f'https://data-api.polymarket.com/positions?user={wallet}'
-        
-        from src.utils.fetch_data import fetch_data_async
-        positions = await fetch_data_async(url)
-        
-        if not isinstance(positions, list):
+        from src.services.portfolio_state import get_portfolio_state
+        portfolio = get_portfolio_state()
+        try:
+            await portfolio.refresh()
+        except ValueError:
             print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to fetch positions")
             return
+        positions = portfolio.positions()
         
         # Filter redeemable positions
         redeemable_positions = [
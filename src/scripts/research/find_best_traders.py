@@ -2,7 +2,6 @@
 """
 Find best performing traders
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
@@ -18,6 +17,9 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.utils.price_timeline import get_price_store
+from src.utils import risk_metrics
+from src.utils.scoring_pipeline import score_traders
 
 init(autoreset=True)
 
@@ -39,7 +41,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch trading activity for a trader"""
     try:
         since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
@@ -76,7 +78,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
 async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch current positions for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/positions?user={trader_address}'
+        url = f'{ENV.DATA_API_URL}/positions?user={trader_address}'
         positions = await fetch_data_async(url)
         return positions if isinstance(positions, list) else []
     except Exception:
@@ -185,13 +187,13 @@ async def simulate_trader(trader_address: str) -> Dict[str, Any]:
         
         # Calculate unrealized P&L from open positions
         unrealized_pnl = 0
+        # Mark-to-market: live curPrice, then last traded price, then avg price
+        price_store = get_price_store()
+        price_store.add_trades(trades)
+        cur_prices = {p.get('asset'): p.get('curPrice') for p in positions_data if p.get('curPrice') is not None}
+        
         for asset, pos in positions.items():
-            # Find current price from positions data
-            current_price = price  # Use last trade price as approximation
-            for p in positions_data:
-                if p.get('asset') == asset:
-                    current_price = float(p.get('curPrice', price))
-                    break
+            current_price = float(cur_prices.get(asset, price_store.latest_price(asset, pos['avg_price'])))
             
             current_value = pos['shares'] * current_price
             unrealized_pnl += current_value - pos['invested']
@@ -209,7 +211,7 @@ async def simulate_trader(trader_address: str) -> Dict[str, Any]:
         
         # Calculate win rate (simplified - based on closed positions)
         closed_count = copied_trades - len(positions)
-        win_rate = 50.0  # Default estimate
+        win_rate = risk_metrics.win_rate(trades, risk_metrics.resolved_prices_from_positions(positions_data))
         
         # Calculate average trade size
         avg_trade_size = total_invested / copied_trades if copied_trades > 0 else 0
@@ -268,18 +270,24 @@ async def find_best_traders():
     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Analyzing {len(traders_to_analyze)} traders...")
     print()
     
-    # Analyze each trader
-    results = []
-    for i, trader in enumerate(traders_to_analyze, 1):
-        print(f"{Fore.CYAN}[{i}/{len(traders_to_analyze)}]{Style.RESET_ALL} Analyzing {trader[:10]}...")
-        result = await simulate_trader(trader)
-        results.append(result)
-        
+    # Analyze traders concurrently (unchanged traders come from the results store)
+    def print_result(done: int, total: int, result: Dict[str, Any], cached: bool):
+        cached_tag = f" {Fore.BLUE}(cached){Style.RESET_ALL}" if cached else ''
+        print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} {result.get('address', '')[:10]}...{cached_tag}")
         if result.get('error'):
             print(f"  {Fore.YELLOW}⚠ {result['error']}{Style.RESET_ALL}")
         else:
             print(f"  {Fore.GREEN}✓ ROI: {result['roi']:.2f}% | P&L: ${result['total_pnl']:.2f} | Trades: {result['copied_trades']}{Style.RESET_ALL}")
     
+    results = await score_traders(
+        traders_to_analyze,
+        simulate_trader,
+        source='find_best_traders',
+        history_days=HISTORY_DAYS,
+        config_key=f'min{MIN_TRADER_TRADES}_max{MAX_TRADES_LIMIT}',
+        on_result=print_result
+    )
+    
     print()
     print('=' * 80)
     print(f"{Fore.CYAN}{Style.BRIGHT}BEST PERFORMING TRADERS{Style.RESET_ALL}")
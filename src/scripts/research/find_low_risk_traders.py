@@ -2,11 +2,9 @@
 """
 Find low-risk traders
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
-import math
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple
@@ -19,6 +17,9 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.utils.price_timeline import get_price_store, normalize_timestamp
+from src.utils import risk_metrics
+from src.utils.scoring_pipeline import score_traders
 
 init(autoreset=True)
 
@@ -27,6 +28,8 @@ STARTING_CAPITAL = 1000.0
 HISTORY_DAYS = int(os.getenv('SIM_HISTORY_DAYS', '90'))  # 90 days for better statistics
 MIN_TRADER_TRADES = int(os.getenv('MIN_TRADER_TRADES', '50'))
 MIN_TRADING_DAYS = int(os.getenv('MIN_TRADING_DAYS', '30'))
+# Extra mark-to-market points between trades (0 = only at each trade)
+EQUITY_RESOLUTION_HOURS = float(os.getenv('EQUITY_RESOLUTION_HOURS', '0'))
 
 # Risk thresholds
 MAX_MDD_THRESHOLD = float(os.getenv('MAX_MDD_THRESHOLD', '20.0'))  # Max 20% drawdown
@@ -45,7 +48,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch trading activity for a trader"""
     try:
         since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
@@ -82,7 +85,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
 async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch current positions for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/positions?user={trader_address}'
+        url = f'{ENV.DATA_API_URL}/positions?user={trader_address}'
         positions = await fetch_data_async(url)
         return positions if isinstance(positions, list) else []
     except Exception:
@@ -90,129 +93,76 @@ async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
 
 
 def calculate_equity_curve(trades: List[Dict[str, Any]], positions: Dict[str, Any]) -> List[Tuple[int, float]]:
-    """Calculate equity curve from trades"""
+    """Calculate mark-to-market equity curve (cash + holdings at last traded price)"""
     equity_points = []
-    current_equity = STARTING_CAPITAL
+    if not trades:
+        return equity_points
+    
+    price_store = get_price_store()
+    price_store.add_trades(trades)
+    
+    cash = STARTING_CAPITAL
+    holdings: Dict[str, float] = {}
+    step = int(EQUITY_RESOLUTION_HOURS * 3600)
+    next_mark = normalize_timestamp(trades[0].get('timestamp', 0)) + step if step > 0 else None
     
     for trade in trades:
+        timestamp = normalize_timestamp(trade.get('timestamp', 0))
+        
+        # Fill grid points between trades with the holdings as they stood
+        while next_mark is not None and next_mark < timestamp:
+            equity_points.append((next_mark, cash + price_store.value_holdings(holdings, next_mark)))
+            next_mark += step
+        
+        asset = trade.get('asset', '')
         side = trade.get('side', '')
         usdc_size = float(trade.get('usdcSize', 0))
+        size = float(trade.get('size', 0))
         
         if side == 'BUY':
-            current_equity -= usdc_size
+            cash -= usdc_size
+            holdings[asset] = holdings.get(asset, 0.0) + size
         elif side == 'SELL':
-            current_equity += usdc_size
+            cash += usdc_size
+            holdings[asset] = max(0.0, holdings.get(asset, 0.0) - size)
         
-        equity_points.append((trade.get('timestamp', 0), current_equity))
+        equity_points.append((timestamp, cash + price_store.value_holdings(holdings, timestamp)))
     
-    # Add current position values
-    total_position_value = sum(
-        float(p.get('currentValue', p.get('initialValue', 0)))
-        for p in positions.values()
+    # Final point: value held shares at the live price where known
+    current_prices = {
+        asset: p['currentValue'] / p['shares']
+        for asset, p in positions.items()
+        if p.get('shares') and p.get('currentValue') is not None
+    }
+    now = int(datetime.now().timestamp())
+    final_value = sum(
+        shares * current_prices.get(asset, price_store.latest_price(asset, 0.0))
+        for asset, shares in holdings.items()
+        if shares > 0
     )
-    
-    if equity_points:
-        last_equity = equity_points[-1][1] + total_position_value
-        equity_points.append((int(datetime.now().timestamp()), last_equity))
+    equity_points.append((now, cash + final_value))
     
     return equity_points
 
 
 def calculate_max_drawdown(equity_points: List[Tuple[int, float]]) -> Tuple[float, float]:
     """Calculate maximum drawdown (percentage and amount)"""
-    if len(equity_points) < 2:
-        return 0.0, 0.0
-    
-    peak = equity_points[0][1]
-    max_dd = 0.0
-    max_dd_amount = 0.0
-    
-    for _, equity in equity_points:
-        if equity > peak:
-            peak = equity
-        
-        drawdown = ((peak - equity) / peak) * 100 if peak > 0 else 0
-        drawdown_amount = peak - equity
-        
-        if drawdown > max_dd:
-            max_dd = drawdown
-            max_dd_amount = drawdown_amount
-    
-    return max_dd, max_dd_amount
+    return risk_metrics.max_drawdown(equity_points)
 
 
 def calculate_sharpe_ratio(equity_points: List[Tuple[int, float]]) -> float:
     """Calculate Sharpe ratio (risk-adjusted return)"""
-    if len(equity_points) < 2:
-        return 0.0
-    
-    # Calculate daily returns
-    returns = []
-    for i in range(1, len(equity_points)):
-        prev_equity = equity_points[i-1][1]
-        curr_equity = equity_points[i][1]
-        
-        if prev_equity > 0:
-            daily_return = ((curr_equity - prev_equity) / prev_equity) * 100
-            returns.append(daily_return)
-    
-    if not returns:
-        return 0.0
-    
-    # Calculate mean and standard deviation
-    mean_return = sum(returns) / len(returns)
-    
-    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-    std_dev = math.sqrt(variance) if variance > 0 else 0
-    
-    # Sharpe ratio = mean return / standard deviation
-    # Annualized (assuming 365 trading days)
-    if std_dev > 0:
-        sharpe = (mean_return / std_dev) * math.sqrt(365)
-    else:
-        sharpe = 0.0
-    
-    return sharpe
+    return risk_metrics.sharpe_ratio(equity_points)
 
 
 def calculate_volatility(equity_points: List[Tuple[int, float]]) -> float:
     """Calculate volatility (standard deviation of daily returns)"""
-    if len(equity_points) < 2:
-        return 0.0
-    
-    returns = []
-    for i in range(1, len(equity_points)):
-        prev_equity = equity_points[i-1][1]
-        curr_equity = equity_points[i][1]
-        
-        if prev_equity > 0:
-            daily_return = ((curr_equity - prev_equity) / prev_equity) * 100
-            returns.append(daily_return)
-    
-    if not returns:
-        return 0.0
-    
-    mean_return = sum(returns) / len(returns)
-    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-    std_dev = math.sqrt(variance) if variance > 0 else 0
-    
-    # Annualized volatility
-    return std_dev * math.sqrt(365)
+    return risk_metrics.volatility(equity_points)
 
 
-def calculate_win_rate(trades: List[Dict[str, Any]], positions: Dict[str, Any]) -> float:
-    """Calculate win rate from closed positions"""
-    # Simplified: count profitable vs unprofitable trades
-    # This is a simplified calculation
-    buy_trades = [t for t in trades if t.get('side') == 'BUY']
-    sell_trades = [t for t in trades if t.get('side') == 'SELL']
-    
-    if len(buy_trades) == 0:
-        return 0.0
-    
-    # Estimate win rate based on position outcomes
-    # This is simplified - full implementation would track position P&L
-    return 55.0  # Default estimate
+def calculate_win_rate(trades: List[Dict[str, Any]], positions_data: List[Dict[str, Any]]) -> float:
+    """Calculate win rate from positions sold or resolved within the history window"""
+    return risk_metrics.win_rate(trades, risk_metrics.resolved_prices_from_positions(positions_data))
 
 
 def calculate_risk_score(mdd: float, sharpe: float, volatility: float, win_rate: float) -> float:
@@ -324,7 +274,7 @@ async def analyze_trader(trader_address: str) -> Dict[str, Any]:
         sharpe = calculate_sharpe_ratio(equity_points)
         volatility = calculate_volatility(equity_points)
         calmar = (roi / mdd) if mdd > 0 else (float('inf') if roi > 0 else 0)
-        win_rate = calculate_win_rate(trades, positions)
+        win_rate = calculate_win_rate(trades, positions_data)
         
         # Calculate average trade size
         total_volume = sum(float(t.get('usdcSize', 0)) for t in trades)
@@ -404,13 +354,10 @@ async def find_low_risk_traders():
     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Analyzing {len(traders_to_analyze)} traders...")
     print()
     
-    # Analyze each trader
-    results = []
-    for i, trader in enumerate(traders_to_analyze, 1):
-        print(f"{Fore.CYAN}[{i}/{len(traders_to_analyze)}]{Style.RESET_ALL} Analyzing {trader[:10]}...")
-        result = await analyze_trader(trader)
-        results.append(result)
-        
+    # Analyze traders concurrently (unchanged traders come from the results store)
+    def print_result(done: int, total: int, result: Dict[str, Any], cached: bool):
+        cached_tag = f" {Fore.BLUE}(cached){Style.RESET_ALL}" if cached else ''
+        print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} {result.get('address', '')[:10]}...{cached_tag}")
         if result.get('error'):
             print(f"  {Fore.YELLOW}⚠ {result['error']}{Style.RESET_ALL}")
         else:
@@ -427,6 +374,15 @@ async def find_low_risk_traders():
                   f"MDD: {result.get('max_drawdown', 0):.2f}% | "
                   f"Sharpe: {result.get('sharpe_ratio', 0):.2f}")
     
+    results = await score_traders(
+        traders_to_analyze,
+        analyze_trader,
+        source='find_low_risk_traders',
+        history_days=HISTORY_DAYS,
+        config_key=f'min{MIN_TRADER_TRADES}_res{EQUITY_RESOLUTION_HOURS:g}h',
+        on_result=print_result
+    )
+    
     print()
     print('=' * 100)
     print(f"{Fore.CYAN}{Style.BRIGHT}LOW-RISK TRADERS (Ranked by Risk Score){Style.RESET_ALL}")
@@ -2,7 +2,6 @@
 """
 Scan and analyze top traders
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
@@ -19,6 +18,10 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.utils.price_timeline import get_price_store
+from src.utils import risk_metrics
+from src.utils.scoring_pipeline import score_traders
+from src.scripts.research.trader_crawler import load_discovered_traders
 
 init(autoreset=True)
 
@@ -45,7 +48,7 @@ async def fetch_markets(limit: int = 20) -> List[Dict[str, Any]]:
         
         for i, trader in enumerate(known_traders, 1):
             try:
-                activity_url = f'https://data-api.polymarket.com/activity?user={trader}&type=TRADE&limit=50'
+                activity_url = f'{ENV.DATA_API_URL}/activity?user={trader}&type=TRADE&limit=50'
                 activities = await fetch_data_async(activity_url)
                 
                 if isinstance(activities, list):
@@ -90,6 +93,12 @@ async def extract_traders_from_markets(markets: List[Dict[str, Any]]) -> Set[str
     for trader in known_traders:
         traders.add(trader.lower())
     
+    # Add the best traders found by previous crawls (trader_crawler)
+    discovered = load_discovered_traders(MAX_TRADERS_TO_ANALYZE)
+    if discovered:
+        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Added {len(discovered)} traders from crawl graph")
+        traders.update(discovered)
+    
     # Extract from markets
     for i, market in enumerate(markets[:10], 1):  # Limit to top 10 markets for performance
         condition_id = market.get('conditionId') or market.get('id')
@@ -99,7 +108,7 @@ async def extract_traders_from_markets(markets: List[Dict[str, Any]]) -> Set[str
         try:
             # Try activity endpoint with conditionId/asset filter
             asset = market.get('conditionId') or market.get('id')
-            activity_url = f'https://data-api.polymarket.com/activity?asset={asset}&type=TRADE&limit=50'
+            activity_url = f'{ENV.DATA_API_URL}/activity?asset={asset}&type=TRADE&limit=50'
             activities = await fetch_data_async(activity_url)
             
             if isinstance(activities, list):
@@ -119,7 +128,7 @@ async def extract_traders_from_markets(markets: List[Dict[str, Any]]) -> Set[str
     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Getting traders from known successful traders' networks...")
     for trader in known_traders[:2]:  # Use first 2 for speed
         try:
-            activity_url = f'https://data-api.polymarket.com/activity?user={trader}&type=TRADE&limit=100'
+            activity_url = f'{ENV.DATA_API_URL}/activity?user={trader}&type=TRADE&limit=100'
             activities = await fetch_data_async(activity_url)
             
             if isinstance(activities, list):
@@ -133,7 +142,7 @@ async def extract_traders_from_markets(markets: List[Dict[str, Any]]) -> Set[str
                 # Get a few traders from each market
                 for asset in list(markets_traded)[:3]:  # Limit to 3 markets per trader
                     try:
-                        market_activity_url = f'https://data-api.polymarket.com/activity?asset={asset}&type=TRADE&limit=20'
+                        market_activity_url = f'{ENV.DATA_API_URL}/activity?asset={asset}&type=TRADE&limit=20'
                         market_activities = await fetch_data_async(market_activity_url)
                         
                         if isinstance(market_activities, list):
@@ -153,7 +162,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch trading activity for a trader"""
     try:
         since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
@@ -189,7 +198,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
 async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch current positions for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/positions?user={trader_address}'
+        url = f'{ENV.DATA_API_URL}/positions?user={trader_address}'
         positions = await fetch_data_async(url)
         return positions if isinstance(positions, list) else []
     except Exception:
@@ -290,13 +299,13 @@ async def analyze_trader(trader_address: str) -> Dict[str, Any]:
         positions_data = await fetch_trader_positions(trader_address)
         unrealized_pnl = 0
         
+        # Mark-to-market: live curPrice, then last traded price, then avg price
+        price_store = get_price_store()
+        price_store.add_trades(trades)
+        cur_prices = {p.get('asset'): p.get('curPrice') for p in positions_data if p.get('curPrice') is not None}
+        
         for asset, pos in positions.items():
-            # Find current price from positions data
-            current_price = pos['avg_price']  # Default to avg price
-            for p in positions_data:
-                if p.get('asset') == asset:
-                    current_price = float(p.get('curPrice', current_price))
-                    break
+            current_price = float(cur_prices.get(asset, price_store.latest_price(asset, pos['avg_price'])))
             
             current_value = pos['shares'] * current_price
             unrealized_pnl += current_value - pos['invested']
@@ -314,7 +323,7 @@ async def analyze_trader(trader_address: str) -> Dict[str, Any]:
         
         # Calculate win rate (simplified)
         closed_count = copied_trades - len(positions)
-        win_rate = 50.0  # Default estimate
+        win_rate = risk_metrics.win_rate(trades, risk_metrics.resolved_prices_from_positions(positions_data))
         
         # Calculate average trade size
         avg_trade_size = total_invested / copied_trades if copied_trades > 0 else 0
@@ -378,7 +387,9 @@ async def scan_best_traders():
         ]
         traders = set(t.lower() for t in known_traders)
     
-    trader_list = list(traders)[:MAX_TRADERS_TO_ANALYZE]  # Limit analysis
+    # Previously crawled traders first, then newly found ones
+    discovered = [t for t in load_discovered_traders(MAX_TRADERS_TO_ANALYZE) if t in traders]
+    trader_list = (discovered + sorted(traders - set(discovered)))[:MAX_TRADERS_TO_ANALYZE]  # Limit analysis
     print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Found {len(trader_list)} unique traders to analyze")
     print()
     
@@ -386,12 +397,9 @@ async def scan_best_traders():
     print(f"{Fore.CYAN}[STEP 3]{Style.RESET_ALL} Analyzing trader performance...")
     print()
     
-    results = []
-    for i, trader in enumerate(trader_list, 1):
-        print(f"{Fore.CYAN}[{i}/{len(trader_list)}]{Style.RESET_ALL} Analyzing {trader[:10]}...", end=' ', flush=True)
-        result = await analyze_trader(trader)
-        results.append(result)
-        
+    def print_result(done: int, total: int, result: Dict[str, Any], cached: bool):
+        cached_tag = f" {Fore.BLUE}(cached){Style.RESET_ALL}" if cached else ''
+        print(f"{Fore.CYAN}[{done}/{total}]{Style.RESET_ALL} {result.get('address', '')[:10]}...{cached_tag}", end=' ')
         if result.get('error'):
             print(f"{Fore.YELLOW}⚠ {result['error']}{Style.RESET_ALL}")
         else:
@@ -399,6 +407,16 @@ async def scan_best_traders():
             roi_color = Fore.GREEN if roi > 0 else Fore.RED
             print(f"{roi_color}ROI: {roi:.2f}% | Trades: {result.get('copied_trades', 0)}{Style.RESET_ALL}")
     
+    # Analyze traders concurrently (unchanged traders come from the results store)
+    results = await score_traders(
+        trader_list,
+        analyze_trader,
+        source='scan_best_traders',
+        history_days=HISTORY_DAYS,
+        config_key=f'min{MIN_TRADER_TRADES}_max{MAX_TRADES_LIMIT}',
+        on_result=print_result
+    )
+    
     print()
     print('=' * 100)
     print(f"{Fore.CYAN}{Style.BRIGHT}TOP TRADERS FROM MARKET SCAN{Style.RESET_ALL}")
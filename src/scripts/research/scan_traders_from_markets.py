@@ -2,7 +2,6 @@
 """
 Scan traders from markets
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
@@ -19,6 +18,7 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.scripts.research.trader_crawler import load_discovered_traders
 
 init(autoreset=True)
 
@@ -44,7 +44,7 @@ async def fetch_markets_from_traders(limit: int = 20) -> List[Dict[str, Any]]:
         
         for i, trader in enumerate(known_traders, 1):
             try:
-                activity_url = f'https://data-api.polymarket.com/activity?user={trader}&type=TRADE&limit=100'
+                activity_url = f'{ENV.DATA_API_URL}/activity?user={trader}&type=TRADE&limit=100'
                 activities = await fetch_data_async(activity_url)
                 
                 if isinstance(activities, list):
@@ -79,7 +79,7 @@ async def extract_traders_from_market(market: Dict[str, Any]) -> Set[str]:
     
     try:
         # Get activity for this market/asset
-        activity_url = f'https://data-api.polymarket.com/activity?asset={asset}&type=TRADE&limit=100'
+        activity_url = f'{ENV.DATA_API_URL}/activity?asset={asset}&type=TRADE&limit=100'
         activities = await fetch_data_async(activity_url)
         
         if isinstance(activities, list):
@@ -98,7 +98,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch trading activity for a trader"""
     try:
         since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
@@ -216,11 +216,18 @@ async def scan_traders_from_markets():
         
         print(f"Found {len(traders)} traders (Total: {len(all_traders)})")
     
+    # Add the best traders found by previous crawls (trader_crawler)
+    discovered = load_discovered_traders(MAX_TRADERS_TO_ANALYZE)
+    if discovered:
+        print(f"  Crawl graph: {len(discovered)} previously discovered traders")
+        all_traders.update(discovered)
+    
     if not all_traders:
         print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} No traders found in markets")
         return
     
-    trader_list = list(all_traders)[:MAX_TRADERS_TO_ANALYZE]
+    # Previously discovered traders first, then newly found ones
+    trader_list = (discovered + sorted(all_traders - set(discovered)))[:MAX_TRADERS_TO_ANALYZE]
     print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Found {len(trader_list)} unique traders to analyze")
     print()
     
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Resumable trader discovery crawler
+
+Keeps a persistent market <-> trader graph and a prioritized frontier:
+- Expanding a trader fetches their recent trades, scores them and links the
+  markets they traded
+- Expanding a market fetches its recent trades and links the traders in it
+- Markets where well-scoring traders are active get expanded first
+
+Expansion runs concurrently under a shared request rate budget. A node whose
+expansion fails goes back on the frontier after an exponential backoff (up to
+CRAWL_MAX_RETRIES times per session). The graph is checkpointed to disk, so a
+crawl can be interrupted and resumed; unexpanded nodes, failed ones included,
+are picked up again on resume.
+
+Usage:
+    python -m src.scripts.research.trader_crawler [max_expansions]
+    python -m src.scripts.research.trader_crawler top [N]
+    python -m src.scripts.research.trader_crawler reset
+"""
+import sys
+import asyncio
+import os
+import json
+import heapq
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+from src.config.env import ENV
+from src.utils.fetch_data import fetch_data_async
+from src.utils.rate_limiter import AsyncRateLimiter
+from src.utils import risk_metrics
+
+init(autoreset=True)
+
+# Configuration
+STATE_FILE = Path(os.getenv('CRAWL_STATE_FILE', str(project_root / 'trader_crawl_cache' / 'graph.json')))
+HISTORY_DAYS = int(os.getenv('SIM_HISTORY_DAYS', '30'))
+MIN_TRADER_TRADES = int(os.getenv('MIN_TRADER_TRADES', '50'))
+MAX_EXPANSIONS = int(os.getenv('CRAWL_MAX_EXPANSIONS', '200'))
+CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', '4'))
+RATE_LIMIT = float(os.getenv('CRAWL_RATE_LIMIT', '5'))  # Requests per second
+CHECKPOINT_EVERY = int(os.getenv('CRAWL_CHECKPOINT_EVERY', '25'))
+TRADES_PER_TRADER = int(os.getenv('CRAWL_TRADES_PER_TRADER', '500'))
+TRADES_PER_MARKET = int(os.getenv('CRAWL_TRADES_PER_MARKET', '100'))
+MAX_RETRIES = int(os.getenv('CRAWL_MAX_RETRIES', '3'))  # Re-queues of a failed node per session
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+# Seeds used when the graph is empty (same wallets the scan scripts start from)
+SEED_TRADERS = [
+    '0x7c3db723f1d4d8cb9c550095203b686cb11e5c6b',
+    '0x6bab41a0dc40d6dd4c1a915b8c01969479fd1292',
+    '0xa4b366ad22fc0d06f1e934ff468e8922431a87b8',
+]
+SEED_PRIORITY = 1000000.0
+# Weight of each well-scoring trader seen in a market
+GOOD_TRADER_WEIGHT = 5.0
+
+
+def score_trader(address: str, trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Score a trader from their recent trades"""
+    tracker = risk_metrics.PositionOutcomeTracker()
+    bought_volume = 0.0
+    total_volume = 0.0
+    markets = set()
+
+    for trade in trades:
+        tracker.record_trade(trade)
+        usdc_size = float(trade.get('usdcSize', 0) or 0)
+        total_volume += usdc_size
+        if trade.get('side') == 'BUY':
+            bought_volume += usdc_size
+        if trade.get('asset'):
+            markets.add(trade['asset'])
+
+    realized_roi = (tracker.realized_pnl / bought_volume) * 100 if bought_volume > 0 else 0.0
+    last_activity = max((int(t.get('timestamp', 0) or 0) for t in trades), default=0)
+
+    return {
+        'address': address,
+        'total_trades': len(trades),
+        'total_volume': total_volume,
+        'unique_markets': len(markets),
+        'closed_positions': tracker.closed_positions,
+        'win_rate': tracker.win_rate,
+        'realized_pnl': tracker.realized_pnl,
+        'realized_roi': realized_roi,
+        'last_activity': last_activity,
+        'eligible': len(trades) >= MIN_TRADER_TRADES,
+        'scored_at': int(datetime.now().timestamp()),
+    }
+
+
+def is_good_score(score: Optional[Dict[str, Any]]) -> bool:
+    """Whether a scored trader should pull its markets up the frontier"""
+    return bool(score and score.get('eligible') and score.get('realized_pnl', 0) > 0)
+
+
+class CrawlGraph:
+    """Market <-> trader graph with a lazily updated priority frontier"""
+
+    def __init__(self):
+        self.traders: Dict[str, Dict[str, Any]] = {}
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self._frontier: List[Tuple[float, int, str, str]] = []
+        self._seq = 0
+
+    # ---- nodes and edges ----
+
+    def add_trader(self, address: str, priority: float = 0.0) -> Dict[str, Any]:
+        node = self.traders.get(address)
+        if node is None:
+            node = self.traders[address] = {'markets': set(), 'expanded': False, 'score': None, 'priority': 0.0}
+        if priority > node['priority']:
+            node['priority'] = priority
+            self._push('trader', address, priority)
+        return node
+
+    def add_market(self, asset: str, title: str = '') -> Dict[str, Any]:
+        node = self.markets.get(asset)
+        if node is None:
+            node = self.markets[asset] = {'traders': set(), 'expanded': False, 'title': title, 'priority': 0.0}
+        elif title and not node['title']:
+            node['title'] = title
+        return node
+
+    def link(self, address: str, asset: str, title: str = '') -> None:
+        """Add a trader-market edge and update both priorities"""
+        trader = self.add_trader(address)
+        market = self.add_market(asset, title)
+        if asset in trader['markets']:
+            return
+        trader['markets'].add(asset)
+        market['traders'].add(address)
+        self._reprioritize_trader(address)
+        self._reprioritize_market(asset)
+
+    def set_score(self, address: str, score: Dict[str, Any]) -> None:
+        """Store a trader score and boost the markets of good traders"""
+        node = self.add_trader(address)
+        node['score'] = score
+        if is_good_score(score):
+            for asset in node['markets']:
+                self._reprioritize_market(asset)
+
+    # ---- priorities ----
+
+    def _reprioritize_trader(self, address: str) -> None:
+        node = self.traders[address]
+        if node['expanded']:
+            return
+        # Traders seen in many markets are more likely to be active, consistent wallets
+        priority = max(node['priority'], float(len(node['markets'])))
+        if priority != node['priority']:
+            node['priority'] = priority
+            self._push('trader', address, priority)
+
+    def _reprioritize_market(self, asset: str) -> None:
+        node = self.markets[asset]
+        if node['expanded']:
+            return
+        good = sum(1 for addr in node['traders'] if is_good_score(self.traders[addr]['score']))
+        priority = len(node['traders']) + GOOD_TRADER_WEIGHT * good
+        if priority != node['priority']:
+            node['priority'] = priority
+            self._push('market', asset, priority)
+
+    def _push(self, kind: str, key: str, priority: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._frontier, (-priority, self._seq, kind, key))
+
+    def _node(self, kind: str, key: str) -> Dict[str, Any]:
+        return self.traders[key] if kind == 'trader' else self.markets[key]
+
+    def pop(self, skip: Set[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+        """Pop the highest-priority unexpanded node that is due (stale entries are dropped)"""
+        now = time.time()
+        deferred = []
+        found = None
+        while self._frontier:
+            entry = heapq.heappop(self._frontier)
+            neg_priority, _, kind, key = entry
+            node = self._node(kind, key)
+            if node['expanded'] or (kind, key) in skip or -neg_priority != node['priority']:
+                continue
+            if node.get('retryAt', 0) > now:
+                deferred.append(entry)  # Failed recently; still backing off
+                continue
+            found = kind, key
+            break
+        for entry in deferred:
+            heapq.heappush(self._frontier, entry)
+        return found
+
+    def record_failure(self, kind: str, key: str, retry_in: Optional[float]) -> None:
+        """Count a failed expansion; put the node back on the frontier after retry_in seconds"""
+        node = self._node(kind, key)
+        node['failures'] = node.get('failures', 0) + 1
+        if retry_in is not None:
+            node['retryAt'] = time.time() + retry_in
+            self._push(kind, key, node['priority'])
+
+    def mark_expanded(self, kind: str, key: str) -> None:
+        node = self._node(kind, key)
+        node['expanded'] = True
+        node.pop('retryAt', None)
+
+    def has_backoff(self) -> bool:
+        """Whether frontier entries are waiting for a retry"""
+        return any(
+            not self._node(kind, key)['expanded'] and self._node(kind, key).get('retryAt', 0) > time.time()
+            for _, _, kind, key in self._frontier
+        )
+
+    def frontier_size(self) -> int:
+        return sum(1 for n in self.traders.values() if not n['expanded']) + \
+            sum(1 for n in self.markets.values() if not n['expanded'])
+
+    # ---- persistence ----
+
+    def save(self, path: Path = STATE_FILE) -> None:
+        """Checkpoint the graph (atomic replace)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'savedAt': datetime.now().isoformat(),
+            'traders': {a: {**n, 'markets': sorted(n['markets'])} for a, n in self.traders.items()},
+            'markets': {m: {**n, 'traders': sorted(n['traders'])} for m, n in self.markets.items()},
+        }
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = STATE_FILE) -> 'CrawlGraph':
+        """Load a checkpoint and rebuild the frontier (empty graph if missing)"""
+        graph = cls()
+        if not path.exists():
+            return graph
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return graph
+
+        for address, node in payload.get('traders', {}).items():
+            graph.traders[address] = {**node, 'markets': set(node.get('markets', []))}
+        for asset, node in payload.get('markets', {}).items():
+            graph.markets[asset] = {**node, 'traders': set(node.get('traders', []))}
+
+        for address, node in graph.traders.items():
+            if not node['expanded']:
+                graph._push('trader', address, node['priority'])
+        for asset, node in graph.markets.items():
+            if not node['expanded']:
+                graph._push('market', asset, node['priority'])
+        return graph
+
+    def top_traders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best eligible scored traders so far"""
+        scores = [n['score'] for n in self.traders.values() if n['score'] and n['score'].get('eligible')]
+        scores.sort(key=lambda s: (s.get('realized_roi', 0), s.get('win_rate', 0)), reverse=True)
+        return scores[:limit]
+
+
+def load_discovered_traders(limit: int = 50) -> List[str]:
+    """Addresses of the best traders found by previous crawls (for the scan scripts)"""
+    if not STATE_FILE.exists():
+        return []
+    return [s['address'] for s in CrawlGraph.load().top_traders(limit)]
+
+
+def parse_user_addresses() -> List[str]:
+    """Parse user addresses from environment"""
+    addresses = ENV.USER_ADDRESSES if hasattr(ENV, 'USER_ADDRESSES') else []
+    if isinstance(addresses, str):
+        addresses = addresses.split(',')
+    return [addr.lower().strip() for addr in addresses or [] if addr.strip()]
+
+
+class TraderCrawler:
+    """Concurrent frontier expansion under a shared rate budget"""
+
+    def __init__(self, graph: CrawlGraph, max_expansions: int = MAX_EXPANSIONS):
+        self.graph = graph
+        self.max_expansions = max_expansions
+        self.limiter = AsyncRateLimiter(RATE_LIMIT, burst=CONCURRENCY)
+        self.in_flight: Set[Tuple[str, str]] = set()
+        # Failed expansions per node in this session
+        self.attempts: Dict[Tuple[str, str], int] = {}
+        self.expansions = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def _fetch(self, url: str) -> List[Dict[str, Any]]:
+        async with self.limiter:
+            self.requests += 1
+            data = await fetch_data_async(url)
+        return data if isinstance(data, list) else []
+
+    async def expand_trader(self, address: str) -> None:
+        """Fetch a trader's recent trades, score them and link their markets"""
+        since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
+        trades: List[Dict[str, Any]] = []
+        offset = 0
+
+        while len(trades) < TRADES_PER_TRADER:
+            batch = await self._fetch(
+                f'{ENV.DATA_API_URL}/activity?user={address}&type=TRADE&limit=100&offset={offset}'
+            )
+            filtered = [t for t in batch if t.get('timestamp', 0) >= since_timestamp]
+            trades.extend(filtered)
+            if len(batch) < 100 or len(filtered) < len(batch):
+                break
+            offset += 100
+
+        trades.sort(key=lambda t: t.get('timestamp', 0))
+        for trade in trades:
+            if trade.get('asset'):
+                self.graph.link(address, trade['asset'], trade.get('slug') or trade.get('title', ''))
+        self.graph.set_score(address, score_trader(address, trades[:TRADES_PER_TRADER]))
+
+    async def expand_market(self, asset: str) -> None:
+        """Fetch a market's recent trades and link the traders in it"""
+        activities = await self._fetch(
+            f'{ENV.DATA_API_URL}/activity?asset={asset}&type=TRADE&limit={TRADES_PER_MARKET}'
+        )
+        for activity in activities:
+            user = activity.get('user') or activity.get('owner') or activity.get('proxyWallet')
+            if user:
+                self.graph.link(user.lower(), asset)
+
+    async def _worker(self, worker_id: int) -> None:
+        while self.expansions < self.max_expansions:
+            item = self.graph.pop(self.in_flight)
+            if item is None:
+                if not self.in_flight and not self.graph.has_backoff():
+                    return
+                # Others may still add to the frontier, or failed nodes become due
+                await asyncio.sleep(0.1)
+                continue
+
+            kind, key = item
+            self.in_flight.add(item)
+            self.expansions += 1
+            try:
+                if kind == 'trader':
+                    await self.expand_trader(key)
+                else:
+                    await self.expand_market(key)
+                self.graph.mark_expanded(kind, key)
+            except Exception as e:
+                self.errors += 1
+                attempts = self.attempts[item] = self.attempts.get(item, 0) + 1
+                if attempts <= MAX_RETRIES:
+                    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                    self.graph.record_failure(kind, key, delay)
+                    print(f"  {Fore.YELLOW}⚠ Failed to expand {kind} {key[:12]}...: {e} "
+                          f"(retry {attempts}/{MAX_RETRIES} in {delay:.0f}s){Style.RESET_ALL}")
+                else:
+                    # Stays unexpanded in the graph, so the next crawl retries it
+                    self.graph.record_failure(kind, key, None)
+                    print(f"  {Fore.YELLOW}⚠ Failed to expand {kind} {key[:12]}...: {e} "
+                          f"(kept pending for the next crawl){Style.RESET_ALL}")
+            finally:
+                self.in_flight.discard(item)
+
+            if self.expansions % CHECKPOINT_EVERY == 0:
+                self.graph.save()
+                print(f"  {Fore.CYAN}[CHECKPOINT]{Style.RESET_ALL} {self.expansions} expansions | "
+                      f"{len(self.graph.traders)} traders | {len(self.graph.markets)} markets | "
+                      f"{self.requests} requests")
+
+    async def run(self) -> None:
+        """Expand the frontier until the budget is spent or it runs dry"""
+        try:
+            await asyncio.gather(*(self._worker(i) for i in range(CONCURRENCY)))
+        finally:
+            self.graph.save()
+
+
+def print_top_traders(graph: CrawlGraph, limit: int = 20) -> None:
+    """Print the best scored traders"""
+    top = graph.top_traders(limit)
+    if not top:
+        print(f"{Fore.YELLOW}No eligible traders scored yet (need {MIN_TRADER_TRADES}+ trades){Style.RESET_ALL}")
+        return
+
+    print(f"{Fore.CYAN}{'Rank':<6} {'Address':<15} {'ROI':<10} {'P&L':<14} {'Win Rate':<10} {'Trades':<8} {'Markets':<8}{Style.RESET_ALL}")
+    print('-' * 80)
+    for idx, score in enumerate(top, 1):
+        roi = score.get('realized_roi', 0)
+        roi_color = Fore.GREEN if roi > 0 else Fore.RED
+        print(f"{idx:<6} {score['address'][:12] + '...':<15} {roi_color}{roi:>8.2f}%{Style.RESET_ALL}  "
+              f"${score.get('realized_pnl', 0):>11.2f}  {score.get('win_rate', 0):>7.1f}%  "
+              f"{score.get('total_trades', 0):>6}  {score.get('unique_markets', 0):>7}")
+
+
+async def crawl_traders():
+    """Main function to crawl traders"""
+    args = sys.argv[1:]
+    command = args[0].lower() if args else ''
+
+    if command == 'reset':
+        if STATE_FILE.exists():
+            STATE_FILE.unlink()
+        print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Crawl state cleared")
+        return
+
+    graph = CrawlGraph.load()
+
+    if command == 'top':
+        print_top_traders(graph, int(args[1]) if len(args) > 1 else 20)
+        return
+
+    max_expansions = int(args[0]) if command.isdigit() else MAX_EXPANSIONS
+
+    print('=' * 80)
+    print(f"{Fore.CYAN}{Style.BRIGHT}  🕸  TRADER DISCOVERY CRAWLER{Style.RESET_ALL}")
+    print('=' * 80)
+    print()
+
+    if graph.traders:
+        print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Resuming crawl: {len(graph.traders)} traders, "
+              f"{len(graph.markets)} markets, {graph.frontier_size()} in frontier")
+    for address in SEED_TRADERS + parse_user_addresses():
+        node = graph.traders.get(address)
+        if node is None or not node['expanded']:
+            graph.add_trader(address, SEED_PRIORITY)
+
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Configuration:")
+    print(f"  Max expansions: {max_expansions}")
+    print(f"  Concurrency: {CONCURRENCY} | Rate limit: {RATE_LIMIT}/s")
+    print(f"  History: {HISTORY_DAYS} days | Min trades: {MIN_TRADER_TRADES}")
+    print(f"  State file: {STATE_FILE}")
+    print()
+
+    crawler = TraderCrawler(graph, max_expansions)
+    started_at = datetime.now()
+    try:
+        await crawler.run()
+    except asyncio.CancelledError:
+        pass
+
+    elapsed = (datetime.now() - started_at).total_seconds()
+    print()
+    print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} {crawler.expansions} expansions, {crawler.requests} requests, "
+          f"{crawler.errors} errors in {elapsed:.1f}s")
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Graph: {len(graph.traders)} traders, {len(graph.markets)} markets, "
+          f"{graph.frontier_size()} left in frontier")
+    print()
+    print_top_traders(graph)
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(crawl_traders())
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}[INFO]{Style.RESET_ALL} Interrupted - progress saved to {STATE_FILE}")
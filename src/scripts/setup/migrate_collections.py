@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Migrate per-wallet collections to the unified layout
+
+Copies user_activities_<wallet> into `activities` and user_positions_<wallet>
+into `positions` (adding the `wallet` field) and creates the compound indexes.
+Safe to re-run: activities are upserted by _id, positions by
+(wallet, asset, conditionId). Set UNIFIED_COLLECTIONS=true afterwards.
+
+Usage:
+    python -m src.scripts.setup.migrate_collections [--all] [--drop]
+
+    --all   migrate every user_* collection in the database, not only USER_ADDRESSES
+    --drop  drop each per-wallet collection once its documents are copied
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from colorama import init, Fore, Style
+from src.config.db import connect_db, close_db, get_client, get_database_name
+from src.config.env import ENV
+from src.models.user_history import (
+    ACTIVITIES_COLLECTION, POSITIONS_COLLECTION, ACTIVITY_INDEXES, POSITION_INDEXES
+)
+
+init(autoreset=True)
+
+BATCH_SIZE = 1000
+ACTIVITY_PREFIX = 'user_activities_'
+POSITION_PREFIX = 'user_positions_'
+
+
+def copy_collection(source, target, wallet: str, key_fields=None) -> int:
+    """Copy documents into the unified collection; returns the number copied"""
+    from pymongo import ReplaceOne, UpdateOne
+
+    copied = 0
+    batch = []
+    for document in source.find():
+        document['wallet'] = wallet
+        if key_fields:
+            document.pop('_id', None)
+            key = {field: document.get(field) for field in key_fields}
+            batch.append(UpdateOne(key, {'$set': document}, upsert=True))
+        else:
+            batch.append(ReplaceOne({'_id': document['_id']}, document, upsert=True))
+        if len(batch) >= BATCH_SIZE:
+            target.bulk_write(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+    if batch:
+        target.bulk_write(batch, ordered=False)
+        copied += len(batch)
+    return copied
+
+
+async def migrate_collections(migrate_all: bool, drop: bool) -> None:
+    print(f"{Fore.CYAN}{Style.BRIGHT}Migrating to unified activity/position collections{Style.RESET_ALL}")
+    print()
+
+    await connect_db()
+    db = get_client()[get_database_name()]
+    names = set(db.list_collection_names())
+
+    if migrate_all:
+        wallets = sorted({
+            name[len(prefix):]
+            for name in names
+            for prefix in (ACTIVITY_PREFIX, POSITION_PREFIX)
+            if name.startswith(prefix)
+        })
+    else:
+        wallets = ENV.USER_ADDRESSES
+
+    activities = db[ACTIVITIES_COLLECTION]
+    positions = db[POSITIONS_COLLECTION]
+    for keys, options in ACTIVITY_INDEXES:
+        activities.create_index(keys, **options)
+    for keys, options in POSITION_INDEXES:
+        positions.create_index(keys, **options)
+
+    for wallet in wallets:
+        short = f'{wallet[:6]}...{wallet[-4:]}'
+        for prefix, target, key_fields in (
+            (ACTIVITY_PREFIX, activities, None),
+            (POSITION_PREFIX, positions, ['wallet', 'asset', 'conditionId']),
+        ):
+            name = f'{prefix}{wallet}'
+            if name not in names:
+                continue
+            source = db[name]
+            copied = copy_collection(source, target, wallet.lower(), key_fields)
+            print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} {short}: {copied} document(s) from {name}")
+            if drop:
+                source.drop()
+                print(f"  {Fore.YELLOW}Dropped {name}{Style.RESET_ALL}")
+
+    print()
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Migrated {len(wallets)} wallet(s). Set UNIFIED_COLLECTIONS=true in .env to use the new layout.")
+    close_db()
+
+
+if __name__ == '__main__':
+    asyncio.run(migrate_collections('--all' in sys.argv, '--drop' in sys.argv))
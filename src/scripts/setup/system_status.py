@@ -4,7 +4,6 @@ System status check script
 
 Verify all system components and configuration
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import asyncio
 import sys
 from pathlib import Path
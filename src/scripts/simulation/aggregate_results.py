@@ -5,7 +5,6 @@ Aggregate trading results
 This script scans all result directories and aggregates statistics
 across different strategies and traders.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import json
 from pathlib import Path
@@ -19,6 +18,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from colorama import init, Fore, Style
+from src.utils.results_store import open_results_store
 
 init(autoreset=True)
 
@@ -58,6 +58,71 @@ class StrategyPerformance:
         }
 
 
+def add_result_set(
+    all_strategies: Dict[str, StrategyPerformance],
+    all_traders: Dict[str, Dict],
+    config: Dict[str, Any],
+    traders: List[Dict[str, Any]]
+):
+    """Accumulate one set of trader results (a file or a store group) into strategy stats"""
+    history_days = config.get('historyDays') or config.get('history_days') or 30
+    multiplier = config.get('multiplier', 1.0)
+    strategy_id = f"{history_days}d_{multiplier}x"
+    
+    # Initialize strategy if not exists
+    if strategy_id not in all_strategies:
+        all_strategies[strategy_id] = StrategyPerformance(
+            strategy_id, history_days, multiplier
+        )
+    
+    strategy = all_strategies[strategy_id]
+    strategy.files_count += 1
+    
+    # Analyze traders
+    for trader in traders:
+        roi = trader.get('roi')
+        if roi is None:
+            continue
+        
+        win_rate = trader.get('winRate', trader.get('win_rate', 0))
+        strategy.trader_count += 1
+        strategy.total_roi += roi
+        strategy.total_win_rate += win_rate
+        
+        if roi > strategy.best_roi:
+            strategy.best_roi = roi
+        if win_rate > strategy.best_win_rate:
+            strategy.best_win_rate = win_rate
+        if trader.get('totalPnl', trader.get('total_pnl', 0)) > strategy.best_pnl:
+            strategy.best_pnl = trader.get('totalPnl', trader.get('total_pnl', 0))
+        if roi > 0:
+            strategy.profitable_traders += 1
+        
+        # Track traders
+        address = trader.get('address', trader.get('traderAddress', ''))
+        if address:
+            if address not in all_traders:
+                all_traders[address] = {
+                    'bestROI': roi,
+                    'bestStrategy': strategy_id,
+                    'timesFound': 1,
+                }
+            else:
+                all_traders[address]['timesFound'] += 1
+                if roi > all_traders[address]['bestROI']:
+                    all_traders[address]['bestROI'] = roi
+                    all_traders[address]['bestStrategy'] = strategy_id
+    
+    # Update averages
+    if strategy.trader_count > 0:
+        strategy.avg_roi = strategy.total_roi / strategy.trader_count
+        strategy.avg_win_rate = strategy.total_win_rate / strategy.trader_count
+        strategy.traders_analyzed += strategy.trader_count
+        strategy.trader_count = 0  # Reset for next file
+        strategy.total_roi = 0.0
+        strategy.total_win_rate = 0.0
+
+
 def load_result_files(dirs: List[str]) -> tuple[Dict[str, StrategyPerformance], Dict[str, Dict], int]:
     """Load and process all result files from directories"""
     all_strategies = {}
@@ -81,9 +146,6 @@ def load_result_files(dirs: List[str]) -> tuple[Dict[str, StrategyPerformance],
                     data = json.load(f)
                 
                 # Determine file type and extract data
-                config = None
-                traders = []
-                
                 if 'traders' in data and isinstance(data['traders'], list):
                     # Scan results format
                     config = data.get('config', {})
@@ -99,69 +161,7 @@ def load_result_files(dirs: List[str]) -> tuple[Dict[str, StrategyPerformance],
                 else:
                     continue
                 
-                if not config or not config.get('historyDays'):
-                    # Try to infer from filename or use defaults
-                    config = config or {}
-                    if 'historyDays' not in config:
-                        config['historyDays'] = 30  # Default
-                    if 'multiplier' not in config:
-                        config['multiplier'] = 1.0  # Default
-                
-                history_days = config.get('historyDays', 30)
-                multiplier = config.get('multiplier', 1.0)
-                strategy_id = f"{history_days}d_{multiplier}x"
-                
-                # Initialize strategy if not exists
-                if strategy_id not in all_strategies:
-                    all_strategies[strategy_id] = StrategyPerformance(
-                        strategy_id, history_days, multiplier
-                    )
-                
-                strategy = all_strategies[strategy_id]
-                strategy.files_count += 1
-                
-                # Analyze traders
-                for trader in traders:
-                    roi = trader.get('roi')
-                    if roi is None:
-                        continue
-                    
-                    strategy.trader_count += 1
-                    strategy.total_roi += roi
-                    strategy.total_win_rate += trader.get('winRate', 0)
-                    
-                    if roi > strategy.best_roi:
-                        strategy.best_roi = roi
-                    if trader.get('winRate', 0) > strategy.best_win_rate:
-                        strategy.best_win_rate = trader.get('winRate', 0)
-                    if trader.get('totalPnl', trader.get('total_pnl', 0)) > strategy.best_pnl:
-                        strategy.best_pnl = trader.get('totalPnl', trader.get('total_pnl', 0))
-                    if roi > 0:
-                        strategy.profitable_traders += 1
-                    
-                    # Track traders
-                    address = trader.get('address', trader.get('traderAddress', ''))
-                    if address:
-                        if address not in all_traders:
-                            all_traders[address] = {
-                                'bestROI': roi,
-                                'bestStrategy': strategy_id,
-                                'timesFound': 1,
-                            }
-                        else:
-                            all_traders[address]['timesFound'] += 1
-                            if roi > all_traders[address]['bestROI']:
-                                all_traders[address]['bestROI'] = roi
-                                all_traders[address]['bestStrategy'] = strategy_id
-                
-                # Update averages
-                if strategy.trader_count > 0:
-                    strategy.avg_roi = strategy.total_roi / strategy.trader_count
-                    strategy.avg_win_rate = strategy.total_win_rate / strategy.trader_count
-                    strategy.traders_analyzed += strategy.trader_count
-                    strategy.trader_count = 0  # Reset for next file
-                    strategy.total_roi = 0.0
-                    strategy.total_win_rate = 0.0
+                add_result_set(all_strategies, all_traders, config or {}, traders)
             
             except Exception as e:
                 # Ignore parsing errors
@@ -170,6 +170,34 @@ def load_result_files(dirs: List[str]) -> tuple[Dict[str, StrategyPerformance],
     return all_strategies, all_traders, total_files
 
 
+def load_store_results(
+    all_strategies: Dict[str, StrategyPerformance],
+    all_traders: Dict[str, Dict]
+) -> int:
+    """Add results from the results store (one result set per source/window/multiplier)"""
+    store = open_results_store()
+    if store is None:
+        return 0
+    
+    with store:
+        rows = store.query()
+    
+    groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[(row['source'], row['history_days'], row['multiplier'])].append(row['result'])
+    
+    for (source, history_days, multiplier), traders in groups.items():
+        add_result_set(
+            all_strategies,
+            all_traders,
+            {'historyDays': history_days, 'multiplier': multiplier},
+            traders
+        )
+    
+    print(f"{Fore.YELLOW}🗄  Results store: {len(rows)} trader results from {len(groups)} group(s){Style.RESET_ALL}")
+    return len(groups)
+
+
 def print_top_strategies(strategies: List[StrategyPerformance]):
     """Print top strategies table"""
     print('=' * 100)
@@ -212,11 +240,12 @@ def print_top_traders(traders: List[tuple[str, Dict]]):
     for i, (address, data) in enumerate(traders[:10], 1):
         roi_color = Fore.GREEN if data['bestROI'] >= 0 else Fore.RED
         roi_sign = '+' if data['bestROI'] >= 0 else ''
+        roi_str = f"{roi_sign}{data['bestROI']:.1f}%"
         
         print(
             f"  {Fore.YELLOW}{str(i):<2}{Style.RESET_ALL} | "
             f"{Fore.BLUE}{address:<42}{Style.RESET_ALL} | "
-            f"{roi_color}{roi_sign}{data['bestROI']:.1f}%{' ' * (9 - len(f'{roi_sign}{data['bestROI']:.1f}%'))}{Style.RESET_ALL} | "
+            f"{roi_color}{roi_str}{' ' * (9 - len(roi_str))}{Style.RESET_ALL} | "
             f"{Fore.CYAN}{data['bestStrategy']:<13}{Style.RESET_ALL} | "
             f"{data['timesFound']}"
         )
@@ -304,8 +333,9 @@ def aggregate_results():
         'simulation_results',  # Also include simulation results
     ]
     
-    # Load and process all files
+    # Load and process all files, then the results store
     all_strategies, all_traders, total_files = load_result_files(dirs)
+    total_files += load_store_results(all_strategies, all_traders)
     
     if not all_strategies:
         print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} No results found in any directory")
@@ -9,7 +9,6 @@ This script performs a comprehensive audit of the copy trading bot:
 - Analyzes trade execution accuracy
 - Generates audit report
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
@@ -72,7 +71,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch trading activity for a trader"""
     try:
         since_timestamp = int((datetime.now() - timedelta(days=AUDIT_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
@@ -109,7 +108,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
 async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch current positions for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/positions?user={trader_address}'
+        url = f'{ENV.DATA_API_URL}/positions?user={trader_address}'
         positions = await fetch_data_async(url)
         return positions if isinstance(positions, list) else []
     except Exception:
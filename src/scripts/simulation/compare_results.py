@@ -5,7 +5,6 @@ Compare simulation results
 This script loads simulation results and compares them side-by-side
 to identify the best strategies and traders.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import json
 from pathlib import Path
@@ -18,28 +17,21 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from colorama import init, Fore, Style
+from src.utils.results_store import open_results_store
 
 init(autoreset=True)
 
 
-def load_simulation_results() -> List[Dict[str, Any]]:
+def load_result_files() -> List[Dict[str, Any]]:
     """Load all simulation result files"""
     results_dir = project_root / 'simulation_results'
     
     if not results_dir.exists():
-        print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} simulation_results directory not found")
-        print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Run simulations first")
-        return []
-    
-    files = list(results_dir.glob('*.json'))
-    
-    if not files:
-        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} No result files found in simulation_results/")
         return []
     
     results = []
     
-    for file in files:
+    for file in results_dir.glob('*.json'):
         try:
             with open(file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -53,6 +45,27 @@ def load_simulation_results() -> List[Dict[str, Any]]:
     return results
 
 
+def load_store_results() -> List[Dict[str, Any]]:
+    """Load simulation results from the results store"""
+    store = open_results_store()
+    if store is None:
+        return []
+    
+    with store:
+        rows = store.query(source='run_simulations')
+    return [row['result'] for row in rows]
+
+
+def load_simulation_results() -> List[Dict[str, Any]]:
+    """Load simulation results from the results store and simulation_results/"""
+    results = load_store_results() + load_result_files()
+    
+    if not results:
+        print(f"{Fore.YELLOW}[WARNING]{Style.RESET_ALL} No results in the results store or simulation_results/")
+    
+    return results
+
+
 def get_result_name(result: Dict[str, Any]) -> str:
     """Extract a readable name from result"""
     # Try to get name from config tag
@@ -5,7 +5,6 @@ Fetch and cache historical trade data for traders
 This script fetches historical trades from Polymarket API and caches them
 for use in simulations and analysis.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
@@ -22,6 +21,7 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.utils.price_timeline import get_price_store
 
 init(autoreset=True)
 
@@ -48,7 +48,7 @@ def parse_user_addresses() -> List[str]:
 async def fetch_batch(address: str, offset: int, limit: int) -> List[Dict[str, Any]]:
     """Fetch a batch of trades for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/activity?user={address}&type=TRADE&limit={limit}&offset={offset}'
+        url = f'{ENV.DATA_API_URL}/activity?user={address}&type=TRADE&limit={limit}&offset={offset}'
         trades = await fetch_data_async(url)
         return trades if isinstance(trades, list) else []
     except Exception as e:
@@ -205,6 +205,7 @@ async def fetch_historical_trades():
     address_chunks = chunk_list(user_addresses, MAX_PARALLEL)
     
     total_trades = 0
+    price_store = get_price_store()
     
     for chunk_idx, chunk in enumerate(address_chunks, 1):
         print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Processing chunk {chunk_idx}/{len(address_chunks)} ({len(chunk)} traders)")
@@ -219,6 +220,7 @@ async def fetch_historical_trades():
                 print(f"{Fore.RED}✗ Error fetching {address[:10]}...: {result}{Style.RESET_ALL}")
             elif isinstance(result, list):
                 total_trades += len(result)
+                price_store.add_trades(result)
         
         print()
         
@@ -226,12 +228,16 @@ async def fetch_historical_trades():
         if chunk_idx < len(address_chunks):
             await asyncio.sleep(0.5)
     
+    # Persist price timelines for mark-to-market in simulations
+    price_store.save()
+    
     print('=' * 80)
     print(f"{Fore.GREEN}{Style.BRIGHT}  ✅ FETCH COMPLETED{Style.RESET_ALL}")
     print('=' * 80)
     print()
     print(f"{Fore.CYAN}Total trades fetched: {total_trades}{Style.RESET_ALL}")
     print(f"{Fore.CYAN}Cache directory: {project_root / 'trader_data_cache'}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Price timelines: {len(price_store)} assets{Style.RESET_ALL}")
     print()
 
 
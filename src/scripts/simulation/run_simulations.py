@@ -5,13 +5,13 @@ Run comprehensive batch simulations
 This script runs multiple simulations with different configurations
 to find optimal trading parameters.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
 import importlib
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent.parent
@@ -25,6 +25,10 @@ init(autoreset=True)
 
 # Import the module (will be reloaded for each simulation)
 import src.scripts.simulation.simulate_profitability as sim_module
+from src.scripts.simulation.simulation_engine import StrategyVector, simulate_configs, results_to_dicts
+from src.utils.price_timeline import get_price_store
+from src.utils import risk_metrics
+from src.utils.results_store import ResultsStore, make_last_trade_key
 
 # Default traders
 DEFAULT_TRADERS = [
@@ -140,30 +144,123 @@ async def run_simulation(config: SimulationConfig) -> Dict[str, Any]:
                 os.environ[key] = value
 
 
+def multiplier_tag(base: str, multiplier: float) -> str:
+    """Result tag that keeps runs at different multipliers apart (e.g. std_m1p5)"""
+    return f"{base}_m{str(multiplier).replace('.', 'p')}"
+
+
+def config_to_dict(config: SimulationConfig) -> Dict[str, Any]:
+    """Serialize a simulation config for result output"""
+    return {
+        'trader_address': config.trader_address,
+        'history_days': config.history_days,
+        'multiplier': config.multiplier,
+        'min_order_size': config.min_order_size,
+        'tag': config.tag,
+    }
+
+
+def group_configs(configs: List[SimulationConfig]) -> Dict[Tuple[str, int, Optional[int]], List[SimulationConfig]]:
+    """Group configs that share the same trade stream (trader, window, trade cap)"""
+    groups: Dict[Tuple[str, int, Optional[int]], List[SimulationConfig]] = {}
+    for config in configs:
+        key = (config.trader_address, config.history_days, config.max_trades)
+        groups.setdefault(key, []).append(config)
+    return groups
+
+
+async def run_sweep(configs: List[SimulationConfig]) -> List[Dict[str, Any]]:
+    """Run several configs that share one trade stream in a single pass"""
+    first = configs[0]
+    started_at = datetime.now()
+    
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Sweeping {len(configs)} configuration(s) in one pass...")
+    print(f"{Fore.YELLOW}  Trader: {first.trader_address[:10]}...")
+    print(f"  Days: {first.history_days}, Multipliers: {', '.join(f'{c.multiplier}x' for c in configs)}")
+    print()
+    
+    trades = await sim_module.fetch_trader_activity(
+        first.trader_address,
+        history_days=first.history_days,
+        max_trades=first.max_trades
+    )
+    
+    if not trades:
+        return [{
+            'address': first.trader_address,
+            'error': 'No trades found',
+            'roi': 0,
+            'total_pnl': 0,
+            'config': config_to_dict(config),
+        } for config in configs]
+    
+    print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} Found {len(trades)} trades, simulating...")
+    positions_data = await sim_module.fetch_trader_positions(first.trader_address)
+    
+    # Mark-to-market: live curPrice where available, else last traded price
+    price_store = get_price_store()
+    price_store.add_trades(trades)
+    current_prices = price_store.latest_prices()
+    current_prices.update({
+        p['asset']: float(p['curPrice'])
+        for p in positions_data
+        if p.get('asset') and p.get('curPrice') is not None
+    })
+    
+    strategies = StrategyVector(
+        multipliers=[c.multiplier for c in configs],
+        min_order_sizes=[c.min_order_size for c in configs],
+        starting_capitals=[sim_module.STARTING_CAPITAL] * len(configs),
+        tags=[c.tag for c in configs]
+    )
+    arrays = simulate_configs(trades, strategies, current_prices)
+    results = results_to_dicts(
+        first.trader_address, trades, strategies, arrays, started_at,
+        win_rate=risk_metrics.win_rate(trades, risk_metrics.resolved_prices_from_positions(positions_data))
+    )
+    
+    for config, result in zip(configs, results):
+        result['config'] = config_to_dict(config)
+    
+    # Keep results queryable by compare_results / aggregate_results
+    last_trade_key = make_last_trade_key(trades[-1])
+    with ResultsStore() as store:
+        for config, result in zip(configs, results):
+            store.put(
+                'run_simulations', config.trader_address, config.history_days, result,
+                last_trade_key, config_key=f'{config.tag}_min{config.min_order_size:g}',
+                multiplier=config.multiplier
+            )
+    
+    print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Sweep completed")
+    print()
+    return results
+
+
 async def run_batch(configs: List[SimulationConfig]) -> List[Dict[str, Any]]:
-    """Run a batch of simulations"""
+    """Run a batch of simulations (one fetch and one pass per trade stream)"""
     print('=' * 80)
     print(f"{Fore.CYAN}{Style.BRIGHT}  BATCH SIMULATION RUNNER{Style.RESET_ALL}")
     print('=' * 80)
     print()
     
-    print(f"{Fore.YELLOW}Total simulations to run: {len(configs)}")
+    groups = group_configs(configs)
+    print(f"{Fore.YELLOW}Total simulations to run: {len(configs)} ({len(groups)} trade stream(s))")
     print()
     
     results = []
     
-    for i, config in enumerate(configs, 1):
-        print(f"{Style.BRIGHT}[{i}/{len(configs)}]{Style.RESET_ALL} Running simulation...")
+    for i, group in enumerate(groups.values(), 1):
+        print(f"{Style.BRIGHT}[{i}/{len(groups)}]{Style.RESET_ALL} Running sweep...")
         try:
-            result = await run_simulation(config)
-            results.append(result)
+            results.extend(await run_sweep(group))
         except Exception as e:
-            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Simulation {i} failed: {e}")
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Sweep {i} failed: {e}")
             print()
-            results.append({'error': str(e), 'config': config.__dict__})
+            results.extend({'error': str(e), 'config': config_to_dict(config)} for config in group)
         
-        # Small delay between simulations
-        if i < len(configs):
+        # Small delay between trade streams
+        if i < len(groups):
             await asyncio.sleep(1)
     
     print('=' * 80)
@@ -189,7 +286,7 @@ def generate_configs(preset: str, traders: Optional[List[str]] = None) -> List[S
     
     for trader in trader_list:
         for multiplier in preset_config['multipliers']:
-            tag = f"{preset_config['tag']}_m{str(multiplier).replace('.', 'p')}"
+            tag = multiplier_tag(preset_config['tag'], multiplier)
             configs.append(SimulationConfig(
                 trader_address=trader.lower(),
                 history_days=preset_config['history_days'],
@@ -286,8 +383,8 @@ async def run_simulations():
             trader_address=trader,
             history_days=days,
             multiplier=multiplier,
-            min_order_size=MIN_ORDER_SIZE,
-            tag='custom'
+            min_order_size=float(os.getenv('SIM_MIN_ORDER_USD', '1.0')),
+            tag=multiplier_tag('custom', multiplier)
         )
         
         await run_simulation(config)
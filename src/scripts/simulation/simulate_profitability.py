@@ -2,13 +2,12 @@
 """
 Simulate profitability of copying a trader
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 import asyncio
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent.parent
@@ -18,6 +17,8 @@ if str(project_root) not in sys.path:
 from colorama import init, Fore, Style
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
+from src.utils.price_timeline import get_price_store
+from src.utils import risk_metrics
 
 init(autoreset=True)
 
@@ -29,17 +30,23 @@ MIN_ORDER_SIZE = float(os.getenv('SIM_MIN_ORDER_USD', '1.0'))
 MAX_TRADES_LIMIT = int(os.getenv('SIM_MAX_TRADES', '2000'))
 
 
-async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
-    """Fetch trading activity for a trader"""
+async def fetch_trader_activity(
+    trader_address: str,
+    history_days: Optional[int] = None,
+    max_trades: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Fetch trading activity for a trader (defaults to SIM_HISTORY_DAYS / SIM_MAX_TRADES)"""
+    history_days = history_days if history_days is not None else HISTORY_DAYS
+    max_trades = max_trades if max_trades is not None else MAX_TRADES_LIMIT
     try:
-        since_timestamp = int((datetime.now() - timedelta(days=HISTORY_DAYS)).timestamp())
-        url = f'https://data-api.polymarket.com/activity?user={trader_address}&type=TRADE'
+        since_timestamp = int((datetime.now() - timedelta(days=history_days)).timestamp())
+        url = f'{ENV.DATA_API_URL}/activity?user={trader_address}&type=TRADE'
         
         all_trades = []
         offset = 0
         limit = 100
         
-        while len(all_trades) < MAX_TRADES_LIMIT:
+        while len(all_trades) < max_trades:
             batch_url = f'{url}&limit={limit}&offset={offset}'
             trades = await fetch_data_async(batch_url)
             
@@ -60,7 +67,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
         
         # Sort by timestamp
         all_trades.sort(key=lambda x: x.get('timestamp', 0))
-        return all_trades[:MAX_TRADES_LIMIT]
+        return all_trades[:max_trades]
     
     except Exception as e:
         print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to fetch activity: {e}")
@@ -70,7 +77,7 @@ async def fetch_trader_activity(trader_address: str) -> List[Dict[str, Any]]:
 async def fetch_trader_positions(trader_address: str) -> List[Dict[str, Any]]:
     """Fetch current positions for a trader"""
     try:
-        url = f'https://data-api.polymarket.com/positions?user={trader_address}'
+        url = f'{ENV.DATA_API_URL}/positions?user={trader_address}'
         positions = await fetch_data_async(url)
         return positions if isinstance(positions, list) else []
     except Exception:
@@ -171,13 +178,13 @@ async def simulate_trader(trader_address: str) -> Dict[str, Any]:
         positions_data = await fetch_trader_positions(trader_address)
         unrealized_pnl = 0
         
+        # Mark-to-market: live curPrice, then last traded price, then avg price
+        price_store = get_price_store()
+        price_store.add_trades(trades)
+        cur_prices = {p.get('asset'): p.get('curPrice') for p in positions_data if p.get('curPrice') is not None}
+        
         for asset, pos in positions.items():
-            # Find current price from positions data
-            current_price = pos['avg_price']  # Default to avg price
-            for p in positions_data:
-                if p.get('asset') == asset:
-                    current_price = float(p.get('curPrice', current_price))
-                    break
+            current_price = float(cur_prices.get(asset, price_store.latest_price(asset, pos['avg_price'])))
             
             current_value = pos['shares'] * current_price
             unrealized_pnl += current_value - pos['invested']
@@ -195,7 +202,7 @@ async def simulate_trader(trader_address: str) -> Dict[str, Any]:
         
         # Calculate win rate (simplified)
         closed_count = copied_trades - len(positions)
-        win_rate = 50.0  # Default estimate
+        win_rate = risk_metrics.win_rate(trades, risk_metrics.resolved_prices_from_positions(positions_data))
         
         # Calculate average trade size
         avg_trade_size = total_invested / copied_trades if copied_trades > 0 else 0
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Vectorized copy-trading simulation engine
+
+Evaluates K strategy configurations in a single pass over one trade stream.
+Each configuration's portfolio state (cash, invested, shares per asset, trade
+counters) lives in a NumPy array of length K, so a sweep over multipliers or
+minimum order sizes costs one fetch and one loop instead of K.
+
+The per-configuration accounting mirrors simulate_profitability.simulate_trader
+exactly, so results are interchangeable with the single-config simulator.
+"""
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+# Same default as the single-config simulators
+TRADER_CAPITAL_ESTIMATE = 100000.0
+# Positions with fewer shares than this are considered closed
+DUST_SHARES = 0.001
+
+
+class StrategyVector:
+    """Parameters for K simulation configurations, stored column-wise"""
+    def __init__(
+        self,
+        multipliers: Sequence[float],
+        min_order_sizes: Optional[Sequence[float]] = None,
+        starting_capitals: Optional[Sequence[float]] = None,
+        tags: Optional[Sequence[str]] = None
+    ):
+        self.k = len(multipliers)
+        if self.k == 0:
+            raise ValueError('At least one configuration is required')
+
+        self.multipliers = np.asarray(multipliers, dtype=np.float64)
+        self.min_order_sizes = self._broadcast(min_order_sizes, 1.0, 'min_order_sizes')
+        self.starting_capitals = self._broadcast(starting_capitals, 1000.0, 'starting_capitals')
+        self.tags = list(tags) if tags is not None else [''] * self.k
+
+        if len(self.tags) != self.k:
+            raise ValueError(f'Expected {self.k} tags, got {len(self.tags)}')
+
+    def _broadcast(self, values: Optional[Sequence[float]], default: float, name: str) -> np.ndarray:
+        """Broadcast a scalar default or validate a per-config sequence"""
+        if values is None:
+            return np.full(self.k, default, dtype=np.float64)
+        array = np.asarray(values, dtype=np.float64)
+        if array.shape != (self.k,):
+            raise ValueError(f'Expected {self.k} values for {name}, got {array.shape[0] if array.ndim else 1}')
+        return array
+
+
+class _AssetState:
+    """Per-asset position arrays (one slot per configuration)"""
+    __slots__ = ('invested', 'shares', 'avg_price')
+
+    def __init__(self, k: int):
+        self.invested = np.zeros(k, dtype=np.float64)
+        self.shares = np.zeros(k, dtype=np.float64)
+        self.avg_price = np.zeros(k, dtype=np.float64)
+
+
+def simulate_configs(
+    trades: List[Dict[str, Any]],
+    strategies: StrategyVector,
+    current_prices: Optional[Dict[str, float]] = None,
+    trader_capital_estimate: float = TRADER_CAPITAL_ESTIMATE
+) -> Dict[str, np.ndarray]:
+    """
+    Run all configurations over the trade stream in one pass
+
+    Args:
+        trades: Trader activity sorted by timestamp
+        strategies: Configurations to evaluate side by side
+        current_prices: Optional mark prices by asset for unrealized P&L
+        trader_capital_estimate: Assumed trader capital for proportional sizing
+
+    Returns:
+        Dict of result arrays, each of length K
+    """
+    k = strategies.k
+    capital = strategies.starting_capitals.copy()
+    total_invested = np.zeros(k, dtype=np.float64)
+    copied = np.zeros(k, dtype=np.int64)
+    skipped = np.zeros(k, dtype=np.int64)
+    positions: Dict[str, _AssetState] = {}
+
+    scale = strategies.multipliers / trader_capital_estimate
+
+    for trade in trades:
+        asset = trade.get('asset', '')
+        side = trade.get('side', '')
+        price = float(trade.get('price', 0) or 0)
+        usdc_size = float(trade.get('usdcSize', 0) or 0)
+        size = float(trade.get('size', 0) or 0)
+
+        if not asset or price <= 0 or usdc_size <= 0:
+            skipped += 1
+            continue
+
+        # Each configuration sizes the copy from its own current cash
+        trade_size = capital * scale * usdc_size
+        eligible = trade_size >= strategies.min_order_sizes
+        skipped += ~eligible
+
+        if side == 'BUY':
+            buy = eligible & (capital >= trade_size)
+            skipped += eligible & ~buy
+            if not buy.any():
+                continue
+
+            pos = positions.get(asset)
+            if pos is None:
+                pos = positions[asset] = _AssetState(k)
+
+            amount = np.where(buy, trade_size, 0.0)
+            capital -= amount
+            total_invested += amount
+            copied += buy
+
+            new_shares = np.where(buy, pos.shares + size, pos.shares)
+            pos.invested += amount
+            safe_shares = np.where(new_shares > 0, new_shares, 1.0)
+            pos.avg_price = np.where(
+                buy,
+                np.where(new_shares > 0, pos.invested / safe_shares, price),
+                pos.avg_price
+            )
+            pos.shares = new_shares
+
+        elif side == 'SELL':
+            pos = positions.get(asset)
+            if pos is None:
+                skipped += eligible
+                continue
+
+            sell = eligible & (pos.shares > 0)
+            skipped += eligible & ~sell
+            if not sell.any():
+                continue
+
+            safe_shares = np.where(pos.shares > 0, pos.shares, 1.0)
+            sell_ratio = np.where(sell, np.minimum(size / safe_shares, 1.0), 0.0)
+            capital += np.where(sell, trade_size, 0.0)
+            pos.invested -= pos.invested * sell_ratio
+            pos.shares -= size * sell_ratio
+            copied += sell
+
+            # Mirror the single-config simulator: closed positions are dropped
+            closed = sell & (pos.shares <= DUST_SHARES)
+            if closed.any():
+                pos.invested[closed] = 0.0
+                pos.shares[closed] = 0.0
+                pos.avg_price[closed] = 0.0
+
+    invested_open = np.zeros(k, dtype=np.float64)
+    value_at_cost = np.zeros(k, dtype=np.float64)
+    unrealized_pnl = np.zeros(k, dtype=np.float64)
+    open_positions = np.zeros(k, dtype=np.int64)
+    prices = current_prices or {}
+
+    for asset, pos in positions.items():
+        is_open = pos.shares > 0
+        if not is_open.any():
+            continue
+        open_positions += is_open
+        invested_open += np.where(is_open, pos.invested, 0.0)
+        value_at_cost += np.where(is_open, pos.shares * pos.avg_price, 0.0)
+        mark = prices.get(asset)
+        marked_price = pos.avg_price if mark is None else np.full(k, float(mark))
+        unrealized_pnl += np.where(is_open, pos.shares * marked_price - pos.invested, 0.0)
+
+    starting = strategies.starting_capitals
+    current_capital = capital + value_at_cost
+    total_pnl = current_capital - starting
+    safe_starting = np.where(starting > 0, starting, 1.0)
+
+    return {
+        'starting_capital': starting,
+        'current_capital': current_capital,
+        'cash': capital,
+        'total_invested': total_invested,
+        'copied_trades': copied,
+        'skipped_trades': skipped,
+        'total_pnl': total_pnl,
+        'roi': np.where(starting > 0, total_pnl / safe_starting * 100, 0.0),
+        'realized_pnl': capital - starting - invested_open,
+        'unrealized_pnl': unrealized_pnl,
+        'open_positions': open_positions,
+        'closed_positions': copied - open_positions,
+    }
+
+
+def results_to_dicts(
+    trader_address: str,
+    trades: List[Dict[str, Any]],
+    strategies: StrategyVector,
+    arrays: Dict[str, np.ndarray],
+    started_at: Optional[datetime] = None,
+    win_rate: float = 0.0
+) -> List[Dict[str, Any]]:
+    """Split result arrays into per-configuration dicts (simulate_trader format)"""
+    elapsed_ms = (datetime.now() - started_at).total_seconds() * 1000 if started_at else 0
+    results = []
+
+    for i in range(strategies.k):
+        copied = int(arrays['copied_trades'][i])
+        results.append({
+            'address': trader_address,
+            'starting_capital': float(arrays['starting_capital'][i]),
+            'current_capital': float(arrays['current_capital'][i]),
+            'total_trades': len(trades),
+            'copied_trades': copied,
+            'skipped_trades': int(arrays['skipped_trades'][i]),
+            'total_pnl': float(arrays['total_pnl'][i]),
+            'roi': float(arrays['roi'][i]),
+            'realized_pnl': float(arrays['realized_pnl'][i]),
+            'unrealized_pnl': float(arrays['unrealized_pnl'][i]),
+            'win_rate': win_rate,
+            'avg_trade_size': float(arrays['total_invested'][i]) / copied if copied > 0 else 0,
+            'open_positions': int(arrays['open_positions'][i]),
+            'closed_positions': int(arrays['closed_positions'][i]),
+            'simulation_time': elapsed_ms / strategies.k,
+        })
+
+    return results
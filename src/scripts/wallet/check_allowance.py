@@ -2,7 +2,6 @@
 """
 Check and set USDC allowance for Polymarket trading
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -15,12 +14,13 @@ import asyncio
 from web3 import Web3
 from eth_account import Account
 from src.config.env import ENV
+from src.utils.onchain_reader import get_onchain_reader, CTF_EXCHANGE
 from colorama import init, Fore, Style
 
 init(autoreset=True)
 
 # Polymarket Exchange address where tokens need to be approved
-POLYMARKET_EXCHANGE = '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'
+POLYMARKET_EXCHANGE = CTF_EXCHANGE
 POLYMARKET_COLLATERAL = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'  # USDC.e on Polygon
 NATIVE_USDC_ADDRESS = '0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359'  # Native USDC on Polygon
 
@@ -67,33 +67,35 @@ async def check_and_set_allowance():
     """Check and set USDC allowance"""
     print(f'{Fore.CYAN}[INFO]{Style.RESET_ALL} Checking USDC balance and allowance...\n')
     
-    # Connect to Polygon
-    w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
-    
-    if not w3.is_connected():
-        print(f'{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to connect to RPC endpoint')
-        sys.exit(1)
-    
-    # Create wallet from private key
-    account = Account.from_key(ENV.PRIVATE_KEY)
     wallet_address = Web3.to_checksum_address(ENV.PROXY_WALLET)
     exchange_address = Web3.to_checksum_address(POLYMARKET_EXCHANGE)
     collateral_address = Web3.to_checksum_address(POLYMARKET_COLLATERAL)
-    
-    # Create USDC contract instance
     usdc_address = Web3.to_checksum_address(ENV.USDC_CONTRACT_ADDRESS)
-    usdc_contract = w3.eth.contract(address=usdc_address, abi=USDC_ABI)
     
     try:
+        # Read configured USDC, USDC.e and native USDC state in one RPC batch
+        tokens = list(dict.fromkeys(t.lower() for t in (usdc_address, collateral_address, NATIVE_USDC_ADDRESS)))
+        snapshot = await get_onchain_reader().read_wallets(
+            [wallet_address], tokens=tokens, spenders=[exchange_address]
+        )
+        wallet_state = snapshot['wallets'][wallet_address.lower()]
+        
+        def token_state(token: str):
+            token = token.lower()
+            decimals = snapshot['decimals'].get(token)
+            balance = wallet_state['balances'].get(token)
+            allowance = wallet_state['allowances'][token].get(exchange_address.lower())
+            if decimals is None or balance is None or allowance is None:
+                raise RuntimeError(f'Failed to read token state for {token}')
+            return decimals, balance, allowance
+        
         # Get USDC decimals
-        decimals = usdc_contract.functions.decimals().call()
+        decimals, local_balance, local_allowance = token_state(usdc_address)
         print(f'USDC Decimals: {decimals}')
         
         uses_polymarket_collateral = (usdc_address.lower() == collateral_address.lower())
         
         # Local token balance & allowance
-        local_balance = usdc_contract.functions.balanceOf(wallet_address).call()
-        local_allowance = usdc_contract.functions.allowance(wallet_address, exchange_address).call()
         local_balance_formatted = local_balance / (10 ** decimals)
         local_allowance_formatted = local_allowance / (10 ** decimals)
         
@@ -104,12 +106,7 @@ async def check_and_set_allowance():
         # Check native USDC if different
         if usdc_address.lower() != NATIVE_USDC_ADDRESS.lower():
             try:
-                native_contract = w3.eth.contract(
-                    address=Web3.to_checksum_address(NATIVE_USDC_ADDRESS),
-                    abi=USDC_ABI
-                )
-                native_decimals = native_contract.functions.decimals().call()
-                native_balance = native_contract.functions.balanceOf(wallet_address).call()
+                native_decimals, native_balance, _ = token_state(NATIVE_USDC_ADDRESS)
                 if native_balance > 0:
                     native_formatted = native_balance / (10 ** native_decimals)
                     print(f'{Fore.YELLOW}[INFO]{Style.RESET_ALL} Detected native USDC (Polygon PoS) balance:')
@@ -120,15 +117,11 @@ async def check_and_set_allowance():
         
         # Determine the contract Polymarket actually reads from (USDC.e)
         if uses_polymarket_collateral:
-            polymarket_contract = usdc_contract
             polymarket_decimals = decimals
             polymarket_balance = local_balance
             polymarket_allowance = local_allowance
         else:
-            polymarket_contract = w3.eth.contract(address=collateral_address, abi=USDC_ABI)
-            polymarket_decimals = polymarket_contract.functions.decimals().call()
-            polymarket_balance = polymarket_contract.functions.balanceOf(wallet_address).call()
-            polymarket_allowance = polymarket_contract.functions.allowance(wallet_address, exchange_address).call()
+            polymarket_decimals, polymarket_balance, polymarket_allowance = token_state(collateral_address)
         
         if not uses_polymarket_collateral:
             polymarket_balance_formatted = polymarket_balance / (10 ** polymarket_decimals)
@@ -143,6 +136,18 @@ async def check_and_set_allowance():
             print(f'{Fore.YELLOW}[WARNING]{Style.RESET_ALL} Allowance is insufficient or zero!')
             print('Setting unlimited allowance for Polymarket...\n')
             
+            # Web3 is only needed to send the approval transaction
+            w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
+            if not w3.is_connected():
+                print(f'{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to connect to RPC endpoint')
+                sys.exit(1)
+            
+            account = Account.from_key(ENV.PRIVATE_KEY)
+            polymarket_contract = w3.eth.contract(
+                address=usdc_address if uses_polymarket_collateral else collateral_address,
+                abi=USDC_ABI
+            )
+            
             # Approve unlimited amount (max uint256)
             max_allowance = (2 ** 256) - 1
             
@@ -2,7 +2,6 @@
 """
 Check both wallet addresses for comparison
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -15,7 +14,7 @@ if str(project_root) not in sys.path:
 import asyncio
 from src.config.env import ENV
 from src.utils.fetch_data import fetch_data_async
-from src.utils.get_my_balance import get_my_balance_async
+from src.utils.get_my_balance import get_balances_async
 from colorama import init, Fore, Style
 
 init(autoreset=True)
@@ -34,16 +33,22 @@ async def check_both_wallets():
     ADDRESS_2 = '0xd62531bc536bff72394fc5ef715525575787e809'  # Example - should be configurable
     
     try:
+        # Both USDC balances in one RPC request
+        try:
+            balances = await get_balances_async([ADDRESS_1, ADDRESS_2])
+        except Exception:
+            balances = {}
+        
         # 1. Check first address (from .env)
         print(f'{Fore.CYAN}ADDRESS 1 (from .env - PROXY_WALLET):{Style.RESET_ALL}\n')
         print(f'   {ADDRESS_1}')
         print(f'   Profile: https://polymarket.com/profile/{ADDRESS_1}\n')
         
         addr1_activities = await fetch_data_async(
-            f'https://data-api.polymarket.com/activity?user={ADDRESS_1}&type=TRADE'
+            f'{ENV.DATA_API_URL}/activity?user={ADDRESS_1}&type=TRADE'
         )
         addr1_positions = await fetch_data_async(
-            f'https://data-api.polymarket.com/positions?user={ADDRESS_1}'
+            f'{ENV.DATA_API_URL}/positions?user={ADDRESS_1}'
         )
         
         if not isinstance(addr1_activities, list):
@@ -71,10 +76,10 @@ async def check_both_wallets():
                 print(f'   • proxyWallet in trades: {addr1_activities[0]["proxyWallet"]}')
         
         # Balance
-        try:
-            balance1 = await get_my_balance_async(ADDRESS_1)
+        balance1 = balances.get(ADDRESS_1.lower())
+        if balance1 is not None:
             print(f'   • USDC Balance: ${balance1:.2f}')
-        except Exception as e:
+        else:
             print('   • USDC Balance: failed to get')
         
         print('\n' + '─' * 65 + '\n')
@@ -85,10 +90,10 @@ async def check_both_wallets():
         print(f'   Profile: https://polymarket.com/profile/{ADDRESS_2}\n')
         
         addr2_activities = await fetch_data_async(
-            f'https://data-api.polymarket.com/activity?user={ADDRESS_2}&type=TRADE'
+            f'{ENV.DATA_API_URL}/activity?user={ADDRESS_2}&type=TRADE'
         )
         addr2_positions = await fetch_data_async(
-            f'https://data-api.polymarket.com/positions?user={ADDRESS_2}'
+            f'{ENV.DATA_API_URL}/positions?user={ADDRESS_2}'
         )
         
         if not isinstance(addr2_activities, list):
@@ -126,10 +131,10 @@ async def check_both_wallets():
                     print(f'         TX: {tx_hash[:10]}...{tx_hash[-6:]}')
         
         # Balance
-        try:
-            balance2 = await get_my_balance_async(ADDRESS_2)
+        balance2 = balances.get(ADDRESS_2.lower())
+        if balance2 is not None:
             print(f'\n   • USDC Balance: ${balance2:.2f}')
-        except Exception as e:
+        else:
             print('\n   • USDC Balance: failed to get')
         
         print('\n' + '─' * 65 + '\n')
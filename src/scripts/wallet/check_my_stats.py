@@ -2,7 +2,6 @@
 """
 Check wallet statistics on Polymarket
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -36,7 +35,7 @@ async def check_my_stats():
         
         # 2. Open Positions
         print(f'{Fore.CYAN}OPEN POSITIONS{Style.RESET_ALL}')
-        positions_url = f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}'
+        positions_url = f'{ENV.DATA_API_URL}/positions?user={PROXY_WALLET}'
         positions = await fetch_data_async(positions_url)
         
         if not isinstance(positions, list):
@@ -83,7 +82,7 @@ async def check_my_stats():
         # 3. Trading Activity
         print('─' * 65 + '\n')
         print(f'{Fore.CYAN}TRADING ACTIVITY{Style.RESET_ALL}')
-        activity_url = f'https://data-api.polymarket.com/activity?user={PROXY_WALLET}&type=TRADE'
+        activity_url = f'{ENV.DATA_API_URL}/activity?user={PROXY_WALLET}&type=TRADE'
         activities = await fetch_data_async(activity_url)
         
         if not isinstance(activities, list):
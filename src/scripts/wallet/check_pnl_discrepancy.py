@@ -2,7 +2,6 @@
 """
 Check P&L discrepancy between open and closed positions
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -31,7 +30,7 @@ async def check_discrepancy():
         # 1. Get all positions (open and closed)
         print(f'{Fore.CYAN}Fetching data from Polymarket API...{Style.RESET_ALL}\n')
         
-        positions_url = f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}'
+        positions_url = f'{ENV.DATA_API_URL}/positions?user={PROXY_WALLET}'
         positions = await fetch_data_async(positions_url)
         
         if not isinstance(positions, list):
@@ -2,7 +2,6 @@
 """
 Check detailed positions information
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -26,7 +25,7 @@ async def check_positions():
     print(f'\n{Fore.CYAN}CURRENT POSITIONS:{Style.RESET_ALL}\n')
     
     positions = await fetch_data_async(
-        f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}'
+        f'{ENV.DATA_API_URL}/positions?user={PROXY_WALLET}'
     )
     
     if not isinstance(positions, list) or not positions:
@@ -2,7 +2,6 @@
 """
 Check proxy wallet and main wallet activity
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -39,7 +38,7 @@ async def check_proxy_wallet():
         
         # 2. Check activity on EOA
         print(f'{Fore.CYAN}CHECKING ACTIVITY ON MAIN WALLET (EOA):{Style.RESET_ALL}\n')
-        eoa_activity_url = f'https://data-api.polymarket.com/activity?user={eoa_address}&type=TRADE'
+        eoa_activity_url = f'{ENV.DATA_API_URL}/activity?user={eoa_address}&type=TRADE'
         eoa_activities = await fetch_data_async(eoa_activity_url)
         
         if not isinstance(eoa_activities, list):
@@ -74,7 +73,7 @@ async def check_proxy_wallet():
         
         # 3. Check activity on Proxy Wallet
         print(f'{Fore.CYAN}CHECKING ACTIVITY ON PROXY WALLET (CONTRACT):{Style.RESET_ALL}\n')
-        proxy_activity_url = f'https://data-api.polymarket.com/activity?user={ENV.PROXY_WALLET}&type=TRADE'
+        proxy_activity_url = f'{ENV.DATA_API_URL}/activity?user={ENV.PROXY_WALLET}&type=TRADE'
         proxy_activities = await fetch_data_async(proxy_activity_url)
         
         if not isinstance(proxy_activities, list):
@@ -2,7 +2,6 @@
 """
 Check recent trading activity
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -23,7 +22,7 @@ init(autoreset=True)
 async def check_recent_activity():
     """Check recent trading activity"""
     wallet = ENV.PROXY_WALLET
-    url = f'https://data-api.polymarket.com/activity?user={wallet}&type=TRADE'
+    url = f'{ENV.DATA_API_URL}/activity?user={wallet}&type=TRADE'
     activities = await fetch_data_async(url)
     
     if not isinstance(activities, list) or not activities:
@@ -2,7 +2,6 @@
 """
 Find Gnosis Safe Proxy wallet
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -42,7 +41,7 @@ async def find_gnosis_safe_proxy():
     
     try:
         eoa_positions = await fetch_data_async(
-            f'https://data-api.polymarket.com/positions?user={eoa_address}'
+            f'{ENV.DATA_API_URL}/positions?user={eoa_address}'
         )
         if not isinstance(eoa_positions, list):
             eoa_positions = []
@@ -59,7 +58,7 @@ async def find_gnosis_safe_proxy():
     
     try:
         activities = await fetch_data_async(
-            f'https://data-api.polymarket.com/activity?user={eoa_address}&type=TRADE'
+            f'{ENV.DATA_API_URL}/activity?user={eoa_address}&type=TRADE'
         )
         if not isinstance(activities, list):
             activities = []
@@ -77,7 +76,7 @@ async def find_gnosis_safe_proxy():
                 
                 # Check positions on proxy
                 proxy_positions = await fetch_data_async(
-                    f'https://data-api.polymarket.com/positions?user={proxy_wallet_from_trade}'
+                    f'{ENV.DATA_API_URL}/positions?user={proxy_wallet_from_trade}'
                 )
                 if not isinstance(proxy_positions, list):
                     proxy_positions = []
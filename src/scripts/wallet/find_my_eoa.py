@@ -2,7 +2,6 @@
 """
 Find and analyze EOA (Externally Owned Account) wallet
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -81,7 +80,7 @@ async def analyze_wallets():
     
     try:
         proxy_positions = await fetch_data_async(
-            f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}'
+            f'{ENV.DATA_API_URL}/positions?user={PROXY_WALLET}'
         )
         if not isinstance(proxy_positions, list):
             proxy_positions = []
@@ -90,7 +89,7 @@ async def analyze_wallets():
         
         if eoa_address.lower() != PROXY_WALLET.lower():
             eoa_positions = await fetch_data_async(
-                f'https://data-api.polymarket.com/positions?user={eoa_address}'
+                f'{ENV.DATA_API_URL}/positions?user={eoa_address}'
             )
             if not isinstance(eoa_positions, list):
                 eoa_positions = []
@@ -105,7 +104,7 @@ async def analyze_wallets():
     
     try:
         activities = await fetch_data_async(
-            f'https://data-api.polymarket.com/activity?user={PROXY_WALLET}&type=TRADE'
+            f'{ENV.DATA_API_URL}/activity?user={PROXY_WALLET}&type=TRADE'
         )
         if not isinstance(activities, list):
             activities = []
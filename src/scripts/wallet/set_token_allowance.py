@@ -2,7 +2,6 @@
 """
 Set token allowance for Polymarket trading (ERC1155 approval)
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
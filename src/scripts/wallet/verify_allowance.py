@@ -2,7 +2,6 @@
 """
 Verify USDC allowance status
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))); import src.lib_core
 import sys
 from pathlib import Path
 
@@ -11,72 +10,44 @@ project_root = Path(__file__).parent.parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from web3 import Web3
 from src.config.env import ENV
+from src.utils.onchain_reader import get_onchain_reader, format_units, CTF_EXCHANGE, POLYMARKET_SPENDERS
 from colorama import init, Fore, Style
 
 init(autoreset=True)
 
 # Polymarket's CTF Exchange contract address on Polygon
-POLYMARKET_EXCHANGE = '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'
-
-# USDC ABI (only the functions we need)
-USDC_ABI = [
-    {
-        "constant": True,
-        "inputs": [{"name": "owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [
-            {"name": "owner", "type": "address"},
-            {"name": "spender", "type": "address"}
-        ],
-        "name": "allowance",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [{"name": "", "type": "uint8"}],
-        "type": "function"
-    }
-]
+POLYMARKET_EXCHANGE = CTF_EXCHANGE
 
 
 async def verify_allowance():
     """Verify USDC allowance status"""
     print(f'{Fore.CYAN}[INFO]{Style.RESET_ALL} Verifying USDC allowance status...\n')
     
-    # Connect to Polygon
-    w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
-    
-    if not w3.is_connected():
-        print(f'{Fore.RED}[ERROR]{Style.RESET_ALL} Failed to connect to RPC endpoint')
-        sys.exit(1)
-    
-    # Create USDC contract instance (read-only, no wallet needed)
-    usdc_address = Web3.to_checksum_address(ENV.USDC_CONTRACT_ADDRESS)
-    exchange_address = Web3.to_checksum_address(POLYMARKET_EXCHANGE)
-    usdc_contract = w3.eth.contract(address=usdc_address, abi=USDC_ABI)
+    usdc_address = ENV.USDC_CONTRACT_ADDRESS.lower()
+    wallet_address = ENV.PROXY_WALLET.lower()
     
     try:
-        # Get USDC decimals
-        decimals = usdc_contract.functions.decimals().call()
+        # Decimals, balance and allowances to every Polymarket spender in one batch
+        snapshot = await get_onchain_reader().read_wallets(
+            [wallet_address],
+            tokens=[usdc_address],
+            spenders=list(POLYMARKET_SPENDERS.values())
+        )
+        if snapshot['errors']:
+            raise RuntimeError(f"RPC read failed: {snapshot['errors'][0]}")
+        
+        decimals = snapshot['decimals'][usdc_address] or 6
+        wallet = snapshot['wallets'][wallet_address]
+        allowances = wallet['allowances'][usdc_address]
         
         # Check balance
-        wallet_address = Web3.to_checksum_address(ENV.PROXY_WALLET)
-        balance = usdc_contract.functions.balanceOf(wallet_address).call()
-        balance_formatted = balance / (10 ** decimals)
+        balance = wallet['balances'][usdc_address] or 0
+        balance_formatted = format_units(balance, decimals)
         
         # Check current allowance
-        current_allowance = usdc_contract.functions.allowance(wallet_address, exchange_address).call()
-        allowance_formatted = current_allowance / (10 ** decimals)
+        current_allowance = allowances[POLYMARKET_EXCHANGE.lower()] or 0
+        allowance_formatted = format_units(current_allowance, decimals)
         
         print('=' * 70)
         print(f'{Fore.CYAN}WALLET STATUS{Style.RESET_ALL}')
@@ -88,6 +59,9 @@ async def verify_allowance():
         else:
             print(f'{Fore.GREEN}Allowance:  {allowance_formatted:.6f} USDC (SET!){Style.RESET_ALL}')
         print(f'Exchange:   {POLYMARKET_EXCHANGE}')
+        for name, spender in POLYMARKET_SPENDERS.items():
+            if spender != POLYMARKET_EXCHANGE:
+                print(f'  {name + ":":<22} {format_units(allowances[spender.lower()], decimals):.6f} USDC')
         print('=' * 70)
         
         if current_allowance == 0:
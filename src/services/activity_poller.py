@@ -0,0 +1,199 @@
+"""
+HTTP polling ingestion of trader activity (fallback while RTDS is down)
+
+Each followed wallet has a cursor: the newest trade timestamp seen (in
+seconds) and the transaction hashes at that timestamp. A poll requests the
+newest page of /activity starting at the cursor, pages further when a full
+page comes back, and passes the trades past the cursor (oldest first) to the
+monitor's normal insert path, which deduplicates by transaction hash.
+
+Wallets are polled concurrently, each on its own interval: a wallet that just
+traded is polled every FETCH_INTERVAL seconds, and the interval grows towards
+POLL_MAX_INTERVAL_SECONDS while it stays quiet.
+
+After an RTDS reconnect, backfill() pages through /activity from every cursor
+so trades made while the websocket was down are not missed.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from ..config.env import ENV
+from ..utils.fetch_data import fetch_data_async
+from ..utils.logger import info, warning
+
+POLL_MIN_INTERVAL_SECONDS = max(ENV.FETCH_INTERVAL, 1)
+POLL_MAX_INTERVAL_SECONDS = max(ENV.POLL_MAX_INTERVAL_SECONDS, POLL_MIN_INTERVAL_SECONDS)
+POLL_PAGE_SIZE = ENV.POLL_PAGE_SIZE
+TOO_OLD_TIMESTAMP = ENV.TOO_OLD_TIMESTAMP
+# Upper bound on pages fetched per wallet by one poll or backfill
+BACKFILL_MAX_PAGES = 20
+# Quiet wallets back off by this factor per empty poll
+POLL_BACKOFF_FACTOR = 1.5
+
+
+def trade_seconds(trade: Dict[str, Any]) -> float:
+    """Trade timestamp in seconds (RTDS may send milliseconds)"""
+    timestamp = trade.get('timestamp', 0) or 0
+    return timestamp / 1000 if timestamp > 1000000000000 else timestamp
+
+
+@dataclass
+class TraderCursor:
+    """Newest trade seen for one wallet"""
+    timestamp: float
+    hashes: Set[str] = field(default_factory=set)
+    interval: float = POLL_MIN_INTERVAL_SECONDS
+    next_poll: float = 0.0
+
+    def advance(self, trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Trades past the cursor (oldest first); moves the cursor to the newest"""
+        new = [
+            trade for trade in trades
+            if trade_seconds(trade) > self.timestamp
+            or (trade_seconds(trade) == self.timestamp and trade.get('transactionHash') not in self.hashes)
+        ]
+        new.sort(key=trade_seconds)
+        for trade in new:
+            timestamp = trade_seconds(trade)
+            if timestamp > self.timestamp:
+                self.timestamp = timestamp
+                self.hashes = set()
+            self.hashes.add(trade.get('transactionHash'))
+        return new
+
+    def catch_up(self, other: 'TraderCursor') -> None:
+        """Move forward to another cursor's position (never backwards)"""
+        if other.timestamp > self.timestamp:
+            self.timestamp = other.timestamp
+            self.hashes = set(other.hashes)
+        elif other.timestamp == self.timestamp:
+            self.hashes |= other.hashes
+
+
+def activity_url(address: str, start: float, limit: int = POLL_PAGE_SIZE, offset: int = 0) -> str:
+    return (
+        f'{ENV.DATA_API_URL}/activity?user={address}&type=TRADE'
+        f'&start={int(start)}&limit={limit}&offset={offset}&sortBy=TIMESTAMP&sortDirection=DESC'
+    )
+
+
+class ActivityPoller:
+    """Polls /activity for the followed wallets and feeds new trades to a handler"""
+
+    def __init__(
+        self,
+        handle_trade: Callable[[Dict[str, Any], str], Awaitable[bool]],
+        get_addresses: Callable[[], Sequence[str]],
+        min_interval: float = POLL_MIN_INTERVAL_SECONDS,
+        max_interval: float = POLL_MAX_INTERVAL_SECONDS
+    ):
+        # Returns True when the trade was new and stored
+        self.handle_trade = handle_trade
+        self.get_addresses = get_addresses
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cursors: Dict[str, TraderCursor] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def cursor(self, address: str) -> TraderCursor:
+        """Cursor of a wallet (new wallets start now: history is not replayed)"""
+        address = address.lower()
+        if address not in self.cursors:
+            self.cursors[address] = TraderCursor(timestamp=time.time(), interval=self.min_interval)
+        return self.cursors[address]
+
+    def observe(self, trade: Dict[str, Any], address: str) -> None:
+        """Move the cursor past a trade that arrived over RTDS"""
+        self.cursor(address).advance([trade])
+
+    async def fetch_since(self, address: str, start: float, label: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """Every trade from start on, page by page; returns (trades, complete)"""
+        trades: List[Dict[str, Any]] = []
+        for page in range(BACKFILL_MAX_PAGES):
+            try:
+                batch = await fetch_data_async(activity_url(address, start, POLL_PAGE_SIZE, page * POLL_PAGE_SIZE))
+            except Exception as e:
+                warning(f'{label} failed for {address[:6]}...{address[-4:]}: {e}')
+                return trades, False
+            if not isinstance(batch, list):
+                return trades, False
+            trades.extend(batch)
+            if len(batch) < POLL_PAGE_SIZE:
+                return trades, True
+        warning(f'{label} for {address[:6]}...{address[-4:]} stopped after {BACKFILL_MAX_PAGES} pages')
+        return trades, True
+
+    async def poll_wallet(self, address: str) -> int:
+        """Poll one wallet once; returns the number of new trades"""
+        cursor = self.cursor(address)
+        trades, complete = await self.fetch_since(address, cursor.timestamp, 'Activity poll')
+
+        # Pages are newest first: advancing past a partial result would skip the older trades
+        new = cursor.advance(trades) if complete else []
+        for trade in new:
+            await self.handle_trade(trade, address)
+
+        # Active traders are polled at the minimum interval, quiet ones back off
+        if new:
+            cursor.interval = self.min_interval
+        else:
+            cursor.interval = min(cursor.interval * POLL_BACKOFF_FACTOR, self.max_interval)
+        cursor.next_poll = time.time() + cursor.interval
+        return len(new)
+
+    async def backfill_wallet(self, address: str) -> int:
+        """Fetch every trade past the cursor (bounded by TOO_OLD_TIMESTAMP); returns the number stored"""
+        cursor = self.cursor(address)
+        # RTDS is already live and observe() moves the cursor while we fetch: filter
+        # against the cursor as it was when the gap started (the store deduplicates)
+        snapshot = TraderCursor(timestamp=cursor.timestamp, hashes=set(cursor.hashes))
+        cutoff = time.time() - TOO_OLD_TIMESTAMP * 3600
+        start = max(snapshot.timestamp, cutoff)
+        trades, complete = await self.fetch_since(address, start, 'Backfill')
+
+        recovered = 0
+        for trade in snapshot.advance([trade for trade in trades if trade_seconds(trade) >= cutoff]):
+            if await self.handle_trade(trade, address):
+                recovered += 1
+        if complete:
+            cursor.catch_up(snapshot)
+        else:
+            warning(f'Backfill for {address[:6]}...{address[-4:]} incomplete; older gap trades may be missing')
+        return recovered
+
+    async def backfill(self) -> Dict[str, int]:
+        """Backfill all followed wallets concurrently; returns stored trades per wallet"""
+        addresses = list(self.get_addresses())
+        counts = await asyncio.gather(*(self.backfill_wallet(address) for address in addresses))
+        return dict(zip(addresses, counts))
+
+    async def run(self) -> None:
+        """Poll due wallets concurrently until cancelled"""
+        while True:
+            now = time.time()
+            addresses = list(self.get_addresses())
+            due = [address for address in addresses if self.cursor(address).next_poll <= now]
+            if due:
+                await asyncio.gather(*(self.poll_wallet(address) for address in due))
+            next_poll = min((self.cursor(address).next_poll for address in addresses), default=now + self.min_interval)
+            await asyncio.sleep(max(next_poll - time.time(), 0.05))
+
+    def start(self) -> None:
+        if not self.running:
+            info(f'HTTP polling active for {len(self.get_addresses())} trader(s)')
+            # Start every wallet at the fast interval
+            for cursor in self.cursors.values():
+                cursor.interval = self.min_interval
+                cursor.next_poll = 0.0
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.running:
+            self._task.cancel()
+            info('HTTP polling stopped')
+        self._task = None
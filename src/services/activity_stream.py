@@ -0,0 +1,163 @@
+"""
+Change stream of new pending trades (executor process)
+
+When the monitor and executor run as separate processes, the executor learns
+about trades the monitor inserted from a MongoDB change stream instead of
+polling. The stream only wakes the executor; pending trades are still read
+with find_pending_trades, so an event lost across a restart at worst delays a
+trade until the next safety read (CHANGE_STREAM_SAFETY_POLL_SECONDS).
+
+The resume token of the last event is stored in the `change_stream_state`
+collection so a restarted executor continues where it stopped. Change streams
+need a replica set; a single-node set is enough (mongod --replSet rs0, then
+rs.initiate()). On a standalone server the executor falls back to polling.
+"""
+import asyncio
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from ..config.db import get_client, get_database_name
+from ..config.env import ENV
+from ..models.user_history import ACTIVITIES_COLLECTION, UNIFIED_COLLECTIONS
+from .trader_portfolio import get_trader_portfolios
+from ..utils.logger import info, warning
+
+CHANGE_STREAM_SAFETY_POLL_SECONDS = ENV.CHANGE_STREAM_SAFETY_POLL_SECONDS
+
+STATE_COLLECTION = 'change_stream_state'
+STATE_ID = 'executor'
+
+
+class ActivityStream:
+    """Wakes the executor when a pending trade of a followed wallet is inserted"""
+
+    def __init__(self, wallet_addresses: List[str], safety_poll_seconds: float = CHANGE_STREAM_SAFETY_POLL_SECONDS):
+        self.wallets = {address.lower(): address for address in wallet_addresses}
+        self.safety_poll_seconds = safety_poll_seconds
+        self._event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stream = None
+        self._stopped = False
+        self._last_read = 0.0
+        self.events = 0
+
+    def _database(self):
+        return get_client()[get_database_name()]
+
+    def _pipeline(self) -> List[Dict[str, Any]]:
+        match: Dict[str, Any] = {
+            'operationType': 'insert',
+            'fullDocument.type': 'TRADE',
+            'fullDocument.bot': False,
+        }
+        if UNIFIED_COLLECTIONS:
+            match['ns.coll'] = ACTIVITIES_COLLECTION
+            match['fullDocument.wallet'] = {'$in': list(self.wallets)}
+        else:
+            match['ns.coll'] = {'$in': [f'user_activities_{address}' for address in self.wallets.values()]}
+        return [{'$match': match}]
+
+    def _wallet_of(self, change: Dict[str, Any]) -> Optional[str]:
+        document = change.get('fullDocument') or {}
+        if document.get('wallet'):
+            return self.wallets.get(document['wallet'])
+        collection = change.get('ns', {}).get('coll', '')
+        return self.wallets.get(collection[len('user_activities_'):].lower())
+
+    def _load_token(self) -> Optional[Dict[str, Any]]:
+        state = self._database()[STATE_COLLECTION].find_one({'_id': STATE_ID})
+        return state.get('resumeToken') if state else None
+
+    def _save_token(self, token: Dict[str, Any]) -> None:
+        self._database()[STATE_COLLECTION].update_one(
+            {'_id': STATE_ID}, {'$set': {'resumeToken': token, 'updatedAt': time.time()}}, upsert=True
+        )
+
+    def _open(self):
+        """Open the change stream (resuming if a token is stored)"""
+        from pymongo.errors import OperationFailure
+
+        database = self._database()
+        token = self._load_token()
+        if token:
+            try:
+                return database.watch(self._pipeline(), resume_after=token)
+            except OperationFailure as e:
+                # Token fell off the oplog; pending trades are re-read anyway
+                warning(f'Change stream resume token rejected, starting fresh: {e}')
+        return database.watch(self._pipeline())
+
+    async def start(self) -> bool:
+        """Open the stream; False if the server does not support change streams"""
+        from pymongo.errors import OperationFailure
+
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        try:
+            self._stream = await asyncio.to_thread(self._open)
+        except OperationFailure as e:
+            warning(f'Change streams unavailable ({e}); executor falls back to polling')
+            return False
+        self._thread = threading.Thread(target=self._run, name='activity-stream', daemon=True)
+        self._thread.start()
+        info('Executor subscribed to new trades via MongoDB change stream')
+        return True
+
+    def _run(self) -> None:
+        """Blocking stream reader (background thread)"""
+        while not self._stopped:
+            try:
+                with self._stream as stream:
+                    for change in stream:
+                        self.events += 1
+                        self._loop.call_soon_threadsafe(self._on_change, change)
+                        self._save_token(stream.resume_token)
+                        if self._stopped:
+                            return
+            except Exception as e:
+                if self._stopped:
+                    return
+                warning(f'Change stream interrupted, reopening: {e}')
+                time.sleep(1)
+                try:
+                    self._stream = self._open()
+                except Exception as open_error:
+                    warning(f'Failed to reopen change stream: {open_error}')
+                    time.sleep(4)
+
+    def _on_change(self, change: Dict[str, Any]) -> None:
+        wallet = self._wallet_of(change)
+        if wallet:
+            # The monitor runs in another process; keep the trader capital estimates current from here
+            get_trader_portfolios().apply_activity(wallet, change.get('fullDocument') or {})
+        self._event.set()
+
+    def should_read(self) -> bool:
+        """True when pending trades should be read (new event or safety interval elapsed)"""
+        now = time.time()
+        if self._event.is_set() or now - self._last_read >= self.safety_poll_seconds:
+            self._event.clear()
+            self._last_read = now
+            return True
+        return False
+
+    def request_read(self) -> None:
+        """Make the next should_read() return True (more trades are pending than one claim takes)"""
+        if self._event is not None:
+            self._event.set()
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep until an event arrives or the timeout passes"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
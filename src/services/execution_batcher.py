@@ -0,0 +1,119 @@
+"""
+Combined execution of simultaneous copy trades
+
+When several followed traders buy the same asset in the same polling cycle,
+each copy order is sized on its own (strategy, caps, balance), the sizes are
+summed and bought with one sweep of the ask book (signed and posted as one
+batch). The fill is then allocated back to every source activity document in
+proportion to the amount it asked for.
+"""
+import time
+from typing import List, Dict, Any, Tuple
+from ..config.env import ENV
+from ..config.copy_strategy import calculate_order_size
+from ..models.user_history import get_user_activity_collection
+from ..utils.get_my_balance import get_my_balance_async
+from ..utils.post_order import execute_buy_sweep
+from ..utils.volume_ledger import get_volume_ledger
+from .portfolio_state import get_portfolio_state
+from ..utils.logger import info, warning, header, separator
+
+RETRY_LIMIT = ENV.RETRY_LIMIT
+PROXY_WALLET = ENV.PROXY_WALLET
+COPY_STRATEGY_CONFIG = ENV.COPY_STRATEGY_CONFIG
+
+
+def group_combinable_trades(trades: List[Dict[str, Any]]) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Split trades into same-asset BUY groups (2+ trades) and trades to run alone
+
+    Returns (groups, single_trades), both in detection order.
+    """
+    by_asset: Dict[str, List[Dict[str, Any]]] = {}
+    for trade in trades:
+        if trade.get('side') == 'BUY' and trade.get('asset'):
+            by_asset.setdefault(trade['asset'], []).append(trade)
+
+    groups = [group for group in by_asset.values() if len(group) > 1]
+    grouped_ids = {id(trade) for group in groups for trade in group}
+    single_trades = [trade for trade in trades if id(trade) not in grouped_ids]
+    return groups, single_trades
+
+
+def allocate_fill(amounts: List[float], spent: float, tokens: float) -> List[Dict[str, float]]:
+    """Split a combined fill across source orders in proportion to their requested amounts"""
+    total = sum(amounts)
+    allocations = []
+    for amount in amounts:
+        share = amount / total if total > 0 else 0.0
+        allocations.append({
+            'requestedUsd': amount,
+            'filledUsd': spent * share,
+            'filledTokens': tokens * share,
+        })
+    return allocations
+
+
+async def execute_combined_buy(clob_client: Any, trades: List[Dict[str, Any]]) -> None:
+    """Size each trade's copy order, buy the total in one sweep and allocate the fill"""
+    asset = trades[0]['asset']
+    traders = {trade['userAddress'] for trade in trades}
+    header(f'COMBINED BUY ({len(trades)} trades from {len(traders)} trader{"s" if len(traders) > 1 else ""})')
+    info(f"Market: {trades[0].get('slug') or asset}")
+
+    my_position = get_portfolio_state().get(asset)
+    my_balance = await get_my_balance_async(PROXY_WALLET)
+    info(f'Your balance: ${my_balance:.2f}')
+
+    # Size each copy order as if executed one after another
+    balance_left = my_balance
+    position_value = (my_position.get('size', 0) * my_position.get('avgPrice', 0)) if my_position else 0
+    intents: List[Tuple[Dict[str, Any], float]] = []
+    ledger = get_volume_ledger()
+    sized_at = time.time()
+    for trade in trades:
+        address = trade['userAddress']
+        order_calc = calculate_order_size(
+            COPY_STRATEGY_CONFIG,
+            trade.get('usdcSize', 0),
+            balance_left,
+            position_value,
+            address,
+            trade.get('conditionId')
+        )
+        info(f'{address[:6]}...{address[-4:]}: {order_calc.reasoning}')
+        if order_calc.final_amount == 0:
+            get_user_activity_collection(address).update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
+            continue
+        intents.append((trade, order_calc.final_amount))
+        # Reserve daily volume so the next trade in the group sees it; corrected to the fill below
+        ledger.add(order_calc.final_amount, address, trade.get('conditionId'), sized_at)
+        balance_left -= order_calc.final_amount
+        position_value += order_calc.final_amount
+
+    if not intents:
+        warning('No copy orders to execute after sizing')
+        separator()
+        return
+
+    total_amount = sum(amount for _, amount in intents)
+    info(f'Combined order: ${total_amount:.2f} for {len(intents)} trade(s)')
+
+    sweep = await execute_buy_sweep(clob_client, asset, total_amount, my_balance, trades[0].get('conditionId'))
+    allocations = allocate_fill([amount for _, amount in intents], sweep['spent'], sweep['tokens'])
+
+    for (trade, amount), allocation in zip(intents, allocations):
+        ledger.add(allocation['filledUsd'] - amount, trade['userAddress'], trade.get('conditionId'), sized_at)
+        update: Dict[str, Any] = {
+            'bot': True,
+            'myBoughtSize': allocation['filledTokens'],
+            'copyAllocation': {**allocation, 'combinedTrades': len(intents)},
+        }
+        if sweep['abort_due_to_funds']:
+            update['botExcutedTime'] = RETRY_LIMIT
+        elif sweep['retry'] >= RETRY_LIMIT:
+            update['botExcutedTime'] = sweep['retry']
+        get_user_activity_collection(trade['userAddress']).update_one({'_id': trade['_id']}, {'$set': update})
+
+    info(f"Combined fill: ${sweep['spent']:.2f} ({sweep['tokens']:.2f} tokens) allocated to {len(intents)} trade(s)")
+    separator()
@@ -0,0 +1,158 @@
+"""
+Sharding followed wallets across bot instances
+
+With INSTANCE_GROUP set, every instance heartbeats into the
+`instance_heartbeats` collection and the live members of the group split
+USER_ADDRESSES between them on a consistent hash ring. When an instance joins,
+stops (it removes its heartbeat) or misses heartbeats for INSTANCE_TTL_SECONDS,
+the other members recompute the ring on their next heartbeat; only the wallets
+whose owner changed move.
+
+Monitors and executors form separate groups (the role is part of the group
+name), so `--role monitor` and `--role executor` processes shard
+independently. Per-wallet work asks get_active_wallets() for the current shard.
+"""
+import asyncio
+import bisect
+import hashlib
+import os
+import socket
+import time
+from typing import List, Optional
+from ..config.db import get_client, get_database_name
+from ..config.env import ENV
+from ..utils.logger import info, warning
+
+INSTANCE_GROUP = ENV.INSTANCE_GROUP
+INSTANCE_HEARTBEAT_SECONDS = ENV.INSTANCE_HEARTBEAT_SECONDS
+INSTANCE_TTL_SECONDS = ENV.INSTANCE_TTL_SECONDS
+
+HEARTBEAT_COLLECTION = 'instance_heartbeats'
+# Points per member on the ring (more points = more even split)
+VIRTUAL_NODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring of member ids"""
+
+    def __init__(self, members: List[str], virtual_nodes: int = VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f'{member}#{i}'), member)
+            for member in set(members)
+            for i in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def shard(self, keys: List[str], member: str) -> List[str]:
+        """Keys owned by a member (in input order)"""
+        return [key for key in keys if self.owner(key.lower()) == member]
+
+
+class InstanceGroup:
+    """Heartbeat membership of one group and this instance's wallet shard"""
+
+    def __init__(
+        self,
+        group: str,
+        instance_id: str,
+        wallets: List[str],
+        heartbeat_seconds: float = INSTANCE_HEARTBEAT_SECONDS,
+        ttl_seconds: float = INSTANCE_TTL_SECONDS
+    ):
+        self.group = group
+        self.instance_id = instance_id
+        self.all_wallets = list(wallets)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.ttl_seconds = ttl_seconds
+        self.members: List[str] = []
+        self.wallets: List[str] = []
+        self.wallet_set = set()
+
+    @property
+    def _id(self) -> str:
+        return f'{self.group}/{self.instance_id}'
+
+    def _collection(self):
+        return get_client()[get_database_name()][HEARTBEAT_COLLECTION]
+
+    def heartbeat(self) -> bool:
+        """Record our heartbeat, reload the live members and recompute the shard (True if it changed)"""
+        now = time.time()
+        collection = self._collection()
+        collection.update_one(
+            {'_id': self._id},
+            {'$set': {'group': self.group, 'instance': self.instance_id, 'lastSeen': now}},
+            upsert=True
+        )
+        live = collection.find({'group': self.group, 'lastSeen': {'$gte': now - self.ttl_seconds}}, {'instance': 1})
+        members = sorted({doc['instance'] for doc in live} | {self.instance_id})
+        if members == self.members:
+            return False
+
+        wallets = HashRing(members).shard(self.all_wallets, self.instance_id)
+        added = len(set(wallets) - set(self.wallets))
+        removed = len(set(self.wallets) - set(wallets))
+        self.members = members
+        self.wallets = wallets
+        self.wallet_set = {wallet.lower() for wallet in wallets}
+        info(
+            f'Instance group {self.group}: {len(members)} member(s), '
+            f'handling {len(wallets)}/{len(self.all_wallets)} wallet(s) (+{added}/-{removed})'
+        )
+        return True
+
+    def leave(self) -> None:
+        """Remove our heartbeat so the other members take over our wallets at once"""
+        self._collection().delete_one({'_id': self._id})
+
+    async def run(self) -> None:
+        """Heartbeat until cancelled"""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await asyncio.to_thread(self.heartbeat)
+            except Exception as e:
+                # Keep the current shard; peers drop us after INSTANCE_TTL_SECONDS if this persists
+                warning(f'Instance heartbeat failed: {e}')
+
+
+_group: Optional[InstanceGroup] = None
+_all_wallets = {address.lower() for address in ENV.USER_ADDRESSES}
+
+
+def get_instance_group() -> Optional[InstanceGroup]:
+    return _group
+
+
+def get_active_wallets() -> List[str]:
+    """Wallets this instance handles (all of USER_ADDRESSES unless INSTANCE_GROUP is set)"""
+    return _group.wallets if _group is not None else ENV.USER_ADDRESSES
+
+
+def is_active_wallet(address: str) -> bool:
+    """True if this instance handles the wallet"""
+    wallets = _group.wallet_set if _group is not None else _all_wallets
+    return address.lower() in wallets
+
+
+async def join_instance_group(role: str) -> Optional[InstanceGroup]:
+    """Join INSTANCE_GROUP for a role and take the first shard (None if grouping is off)"""
+    global _group
+    if not INSTANCE_GROUP:
+        return None
+    instance_id = ENV.INSTANCE_ID or f'{socket.gethostname()}:{os.getpid()}'
+    group = InstanceGroup(f'{INSTANCE_GROUP}:{role}', instance_id, ENV.USER_ADDRESSES)
+    await asyncio.to_thread(group.heartbeat)
+    _group = group
+    return group
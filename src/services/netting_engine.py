@@ -0,0 +1,224 @@
+"""
+Netting of offsetting copy intents across followed traders
+
+New trades are held per asset for a short window (NETTING_WINDOW_MS). When the
+window closes, each trade is sized as the copy order we would have placed (BUY
+in USDC via the copy strategy, SELL in shares scaled to our position). Opposite
+sides cancel out internally at the book mid price and only the residual is
+sent to the book, so two traders crossing each other costs no spread.
+
+Each source activity document records its attribution: how many shares were
+netted internally, how many were executed on the book, and at what prices.
+"""
+import time
+from typing import List, Dict, Any, Optional
+from ..config.env import ENV
+from ..config.copy_strategy import calculate_order_size
+from ..models.user_history import get_user_activity_collection
+from ..utils.fetch_data import fetch_data_async
+from ..utils.get_my_balance import get_my_balance_async
+from ..utils.post_order import (
+    execute_buy_sweep, execute_sell_sweep, calculate_sell_size,
+    MIN_ORDER_SIZE_USD, MIN_ORDER_SIZE_TOKENS
+)
+from ..utils.volume_ledger import get_volume_ledger
+from .portfolio_state import get_portfolio_state
+from ..utils.logger import info, warning, header, separator
+
+RETRY_LIMIT = ENV.RETRY_LIMIT
+PROXY_WALLET = ENV.PROXY_WALLET
+COPY_STRATEGY_CONFIG = ENV.COPY_STRATEGY_CONFIG
+NETTING_WINDOW_MS = ENV.NETTING_WINDOW_MS
+
+# Shares below this are treated as fully netted
+DUST_SHARES = 0.01
+
+
+class NettingBuffer:
+    """Trades held per asset until their netting window closes"""
+
+    def __init__(self, window_ms: int = NETTING_WINDOW_MS):
+        self.window_ms = window_ms
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, trade: Dict[str, Any], now_ms: Optional[int] = None) -> None:
+        """Hold a trade (the window starts at the first trade of its asset)"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        group = self._pending.setdefault(trade.get('asset', ''), {'first': now_ms, 'trades': []})
+        group['trades'].append(trade)
+
+    def trades(self) -> List[Dict[str, Any]]:
+        """Every trade currently held"""
+        return [trade for group in self._pending.values() for trade in group['trades']]
+
+    def pop_ready(self, now_ms: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Remove and return the trade groups whose window has closed"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        ready_assets = [
+            asset for asset, group in self._pending.items()
+            if now_ms - group['first'] >= self.window_ms
+        ]
+        return [self._pending.pop(asset)['trades'] for asset in ready_assets]
+
+
+def net_intents(intents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Net signed share quantities of one asset
+
+    intents: [{'side': 'BUY'|'SELL', 'shares': float, ...}]
+    Returns {'buy_shares', 'sell_shares', 'matched', 'residual'} where a positive
+    residual is shares left to buy and a negative one shares left to sell.
+    """
+    buy_shares = sum(i['shares'] for i in intents if i['side'] == 'BUY')
+    sell_shares = sum(i['shares'] for i in intents if i['side'] == 'SELL')
+    return {
+        'buy_shares': buy_shares,
+        'sell_shares': sell_shares,
+        'matched': min(buy_shares, sell_shares),
+        'residual': buy_shares - sell_shares,
+    }
+
+
+def attribute_fill(
+    intents: List[Dict[str, Any]],
+    netting: Dict[str, Any],
+    cross_price: float,
+    filled_shares: float,
+    filled_usd: float
+) -> List[Dict[str, Any]]:
+    """Per-intent attribution of the internal match and the book execution"""
+    residual_side = 'BUY' if netting['residual'] > 0 else 'SELL'
+    side_totals = {'BUY': netting['buy_shares'], 'SELL': netting['sell_shares']}
+    attributions = []
+    for intent in intents:
+        side_total = side_totals[intent['side']]
+        share = intent['shares'] / side_total if side_total > 0 else 0.0
+        executed = intent['side'] == residual_side and abs(netting['residual']) > DUST_SHARES
+        attributions.append({
+            'side': intent['side'],
+            'requestedShares': intent['shares'],
+            'nettedShares': netting['matched'] * share,
+            'nettedPrice': cross_price,
+            'executedShares': filled_shares * share if executed else 0.0,
+            'executedUsd': filled_usd * share if executed else 0.0,
+            'groupSize': len(intents),
+        })
+    return attributions
+
+
+def _mid_price(order_book: Dict[str, Any], fallback: float) -> float:
+    bids = [float(b['price']) for b in order_book.get('bids') or []]
+    asks = [float(a['price']) for a in order_book.get('asks') or []]
+    if bids and asks:
+        return (max(bids) + min(asks)) / 2
+    return fallback
+
+
+async def execute_netted_group(clob_client: Any, trades: List[Dict[str, Any]]) -> None:
+    """Size, net and execute one asset's held trades"""
+    asset = trades[0]['asset']
+    header(f"NETTING {len(trades)} TRADES ON {trades[0].get('slug') or asset}")
+
+    my_position = get_portfolio_state().get(asset)
+    my_balance = await get_my_balance_async(PROXY_WALLET)
+
+    # Size every trade as the copy order we would have placed on its own
+    balance_left = my_balance
+    position_value = (my_position.get('size', 0) * my_position.get('avgPrice', 0)) if my_position else 0
+    position_shares = float(my_position.get('size', 0) or 0) if my_position else 0.0
+    user_positions_cache: Dict[str, List[Dict[str, Any]]] = {}
+    intents: List[Dict[str, Any]] = []
+
+    ledger = get_volume_ledger()
+    sized_at = time.time()
+    for trade in trades:
+        address = trade['userAddress']
+        price = float(trade.get('price', 0) or 0)
+        if trade.get('side') == 'BUY':
+            order_calc = calculate_order_size(
+                COPY_STRATEGY_CONFIG, trade.get('usdcSize', 0), balance_left, position_value,
+                address, trade.get('conditionId')
+            )
+            info(f'{address[:6]}...{address[-4:]} BUY: {order_calc.reasoning}')
+            if order_calc.final_amount == 0 or price <= 0:
+                get_user_activity_collection(address).update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
+                continue
+            intents.append({
+                'trade': trade, 'side': 'BUY', 'usd': order_calc.final_amount,
+                'shares': order_calc.final_amount / price, 'price': price,
+            })
+            # Reserve daily volume for the rest of the group; corrected to the attributed fill below
+            ledger.add(order_calc.final_amount, address, trade.get('conditionId'), sized_at)
+            balance_left -= order_calc.final_amount
+            position_value += order_calc.final_amount
+        else:
+            if address not in user_positions_cache:
+                data = await fetch_data_async(f'{ENV.DATA_API_URL}/positions?user={address}')
+                user_positions_cache[address] = data if isinstance(data, list) else []
+            user_position = next((p for p in user_positions_cache[address] if p.get('asset') == asset), None)
+            remaining_position = {**(my_position or {}), 'size': position_shares} if my_position else None
+            shares = calculate_sell_size(remaining_position, user_position, trade)
+            info(f'{address[:6]}...{address[-4:]} SELL: {shares:.2f} of our {position_shares:.2f} tokens')
+            if shares <= DUST_SHARES:
+                get_user_activity_collection(address).update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
+                continue
+            intents.append({'trade': trade, 'side': 'SELL', 'shares': shares, 'price': price})
+            position_shares -= shares
+
+    if not intents:
+        warning('No copy orders to execute after sizing')
+        separator()
+        return
+
+    netting = net_intents(intents)
+    try:
+        order_book = await clob_client.get_order_book(asset)
+    except Exception:
+        order_book = {}
+    cross_price = _mid_price(order_book, sum(i['price'] for i in intents) / len(intents))
+    info(
+        f"Buy {netting['buy_shares']:.2f} / sell {netting['sell_shares']:.2f} tokens -> "
+        f"{netting['matched']:.2f} netted at ${cross_price:.4f}, residual {netting['residual']:+.2f}"
+    )
+
+    residual = netting['residual']
+    sweep: Dict[str, Any] = {'retry': 0, 'abort_due_to_funds': False}
+    filled_shares = 0.0
+    filled_usd = 0.0
+    if residual > DUST_SHARES:
+        buy_usd = sum(i['usd'] for i in intents if i['side'] == 'BUY')
+        residual_usd = buy_usd * residual / netting['buy_shares']
+        if residual_usd >= MIN_ORDER_SIZE_USD:
+            sweep = await execute_buy_sweep(clob_client, asset, residual_usd, my_balance, trades[0].get('conditionId'))
+            filled_shares, filled_usd = sweep['tokens'], sweep['spent']
+        else:
+            info(f'Residual ${residual_usd:.2f} below minimum - nothing to execute')
+    elif residual < -DUST_SHARES:
+        if -residual >= MIN_ORDER_SIZE_TOKENS:
+            sweep = await execute_sell_sweep(clob_client, asset, -residual, trades[0].get('conditionId'))
+            filled_shares, filled_usd = sweep['sold'], sweep['proceeds']
+        else:
+            info(f'Residual {-residual:.2f} tokens below minimum - nothing to execute')
+    else:
+        info('Fully netted - no order sent')
+
+    residual_side = 'BUY' if residual > 0 else 'SELL'
+    attributions = attribute_fill(intents, netting, cross_price, filled_shares, filled_usd)
+    for intent, attribution in zip(intents, attributions):
+        trade = intent['trade']
+        update: Dict[str, Any] = {'bot': True, 'netting': attribution}
+        if intent['side'] == 'BUY':
+            update['myBoughtSize'] = attribution['nettedShares'] + attribution['executedShares']
+            bought_usd = attribution['nettedShares'] * cross_price + attribution['executedUsd']
+            ledger.add(bought_usd - intent['usd'], trade['userAddress'], trade.get('conditionId'), sized_at)
+        if intent['side'] == residual_side:
+            if sweep['abort_due_to_funds']:
+                update['botExcutedTime'] = RETRY_LIMIT
+            elif sweep['retry'] >= RETRY_LIMIT:
+                update['botExcutedTime'] = sweep['retry']
+        get_user_activity_collection(trade['userAddress']).update_one({'_id': trade['_id']}, {'$set': update})
+
+    separator()
@@ -0,0 +1,187 @@
+"""
+In-memory state of our own wallet's positions
+
+Positions are indexed by outcome token (asset) and by market (conditionId) so
+the executors look them up in O(1) instead of downloading and scanning the
+full /positions list on every trade. The state is seeded once at startup,
+updated immediately from our own fills, and reconciled against the data-api
+in the background (PORTFOLIO_RECONCILE_SECONDS).
+
+The data-api lags behind the book, so a reconcile keeps the local version of
+any position we filled within the last PORTFOLIO_FILL_GRACE_SECONDS.
+"""
+import asyncio
+import time
+from typing import List, Dict, Any, Optional
+from ..config.env import ENV
+from ..utils.fetch_data import fetch_data_async
+from ..utils.logger import info, warning
+
+PROXY_WALLET = ENV.PROXY_WALLET
+PORTFOLIO_RECONCILE_SECONDS = ENV.PORTFOLIO_RECONCILE_SECONDS
+PORTFOLIO_FILL_GRACE_SECONDS = ENV.PORTFOLIO_FILL_GRACE_SECONDS
+
+# Positions below this many shares are treated as closed
+DUST_SHARES = 0.01
+
+
+class PortfolioState:
+    """Positions of one wallet, indexed by asset and conditionId"""
+
+    def __init__(self, wallet: str = PROXY_WALLET, fill_grace_seconds: float = PORTFOLIO_FILL_GRACE_SECONDS):
+        self.wallet = wallet
+        self.fill_grace_seconds = fill_grace_seconds
+        self._by_asset: Dict[str, Dict[str, Any]] = {}
+        self._by_condition: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._filled_at: Dict[str, float] = {}
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self.last_refresh: Optional[float] = None
+
+    @property
+    def seeded(self) -> bool:
+        return self.last_refresh is not None
+
+    def _index(self, position: Dict[str, Any]) -> None:
+        asset = position['asset']
+        self._by_asset[asset] = position
+        if position.get('conditionId'):
+            self._by_condition.setdefault(position['conditionId'], {})[asset] = position
+
+    def _unindex(self, asset: str) -> None:
+        position = self._by_asset.pop(asset, None)
+        if position and position.get('conditionId'):
+            market = self._by_condition.get(position['conditionId'], {})
+            market.pop(asset, None)
+            if not market:
+                self._by_condition.pop(position['conditionId'], None)
+
+    def load(self, positions: List[Dict[str, Any]], fetched_at: Optional[float] = None) -> None:
+        """Replace the state with a /positions snapshot (recent local fills are kept)"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        keep_after = fetched_at - self.fill_grace_seconds
+        kept = {
+            asset: self._by_asset.get(asset)
+            for asset, filled_at in self._filled_at.items()
+            if filled_at >= keep_after
+        }
+        self._by_asset.clear()
+        self._by_condition.clear()
+        self._filled_at = {asset: self._filled_at[asset] for asset in kept}
+        for position in positions:
+            if position.get('asset') and position['asset'] not in kept:
+                self._index(dict(position))
+        for position in kept.values():
+            if position is not None:
+                self._index(position)
+        self.last_refresh = fetched_at
+
+    async def refresh(self, force: bool = True) -> None:
+        """Reload positions from the data-api (force=False skips it once seeded)"""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if not force and self.seeded:
+                return
+            fetched_at = time.time()
+            data = await fetch_data_async(f'{ENV.DATA_API_URL}/positions?user={self.wallet}')
+            if not isinstance(data, list):
+                raise ValueError(f'Unexpected /positions response: {type(data).__name__}')
+            self.load(data, fetched_at)
+
+    async def ensure_seeded(self) -> None:
+        if not self.seeded:
+            await self.refresh(force=False)
+
+    def get(self, asset: str) -> Optional[Dict[str, Any]]:
+        """Position in an outcome token"""
+        return self._by_asset.get(asset)
+
+    def get_market(self, condition_id: str) -> List[Dict[str, Any]]:
+        """Positions in every outcome of a market"""
+        return list(self._by_condition.get(condition_id, {}).values())
+
+    def find(self, trade: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Position a trade refers to (its asset, else the first outcome of its market)"""
+        if trade.get('asset'):
+            return self.get(trade['asset'])
+        market = self.get_market(trade.get('conditionId', ''))
+        return market[0] if market else None
+
+    def positions(self) -> List[Dict[str, Any]]:
+        return list(self._by_asset.values())
+
+    def apply_fill(
+        self,
+        asset: str,
+        side: str,
+        shares: float,
+        price: float,
+        condition_id: Optional[str] = None
+    ) -> None:
+        """Update a position from one of our own fills"""
+        self._filled_at[asset] = time.time()
+        position = self._by_asset.get(asset)
+        if position is None:
+            if side != 'BUY':
+                return
+            position = {'asset': asset, 'conditionId': condition_id, 'size': 0.0, 'avgPrice': 0.0, 'initialValue': 0.0}
+            self._index(position)
+        elif condition_id and not position.get('conditionId'):
+            position['conditionId'] = condition_id
+            self._index(position)
+
+        size = float(position.get('size', 0) or 0)
+        avg_price = float(position.get('avgPrice', 0) or 0)
+        if side == 'BUY':
+            new_size = size + shares
+            position['avgPrice'] = (size * avg_price + shares * price) / new_size if new_size > 0 else price
+        else:
+            new_size = max(0.0, size - shares)
+        position['size'] = new_size
+        position['initialValue'] = new_size * position['avgPrice']
+        position['curPrice'] = price
+        position['currentValue'] = new_size * price
+        if new_size < DUST_SHARES:
+            self._unindex(asset)
+
+    async def run_reconciler(self, interval_seconds: float = PORTFOLIO_RECONCILE_SECONDS) -> None:
+        """Reconcile against the data-api until cancelled"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                warning(f'Portfolio reconcile failed: {e}')
+
+
+_portfolio: Optional[PortfolioState] = None
+
+
+def get_portfolio_state() -> PortfolioState:
+    """Portfolio state of PROXY_WALLET"""
+    global _portfolio
+    if _portfolio is None:
+        _portfolio = PortfolioState()
+    return _portfolio
+
+
+def record_portfolio_fill(
+    asset: str,
+    side: str,
+    shares: float,
+    price: float,
+    condition_id: Optional[str] = None
+) -> None:
+    """Apply one of our fills to the portfolio state"""
+    get_portfolio_state().apply_fill(asset, side, shares, price, condition_id)
+
+
+async def start_portfolio_state() -> 'asyncio.Task':
+    """Seed the portfolio state and start background reconciliation"""
+    portfolio = get_portfolio_state()
+    try:
+        await portfolio.ensure_seeded()
+        info(f'Portfolio state: {len(portfolio.positions())} position(s)')
+    except Exception as e:
+        warning(f'Failed to load positions, retrying in the background: {e}')
+    return asyncio.create_task(portfolio.run_reconciler())
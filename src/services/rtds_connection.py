@@ -0,0 +1,210 @@
+"""
+RTDS websocket liveness: heartbeats, stale-stream detection and a warm spare
+
+A connection sends an application-level PING every RTDS_PING_SECONDS; RTDS
+answers PONG, so a healthy connection is never silent. receive() treats
+RTDS_STALE_SECONDS without any message as a half-open socket and raises
+StaleConnection so the monitor reconnects.
+
+While the primary connection is up, a warm spare is kept connected (and
+pinged) but not subscribed. When the primary dies the monitor takes the spare
+and only has to send the subscription, skipping the connect/TLS handshake.
+Otherwise reconnects back off exponentially with jitter up to
+RTDS_RETRY_SECONDS, without a limit on attempts.
+
+Every connection is recorded as an episode in RtdsMetrics.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Deque, Dict, Any, Optional
+from ..config.env import ENV
+from ..utils.logger import info, warning
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
+
+RTDS_PING_SECONDS = ENV.RTDS_PING_SECONDS
+RTDS_STALE_SECONDS = ENV.RTDS_STALE_SECONDS
+RTDS_WARM_SPARE = ENV.RTDS_WARM_SPARE
+RTDS_RETRY_SECONDS = ENV.RTDS_RETRY_SECONDS
+RECONNECT_BASE_DELAY = 1.0
+CONNECT_TIMEOUT = 30.0
+PING_MESSAGE = 'PING'
+PONG_MESSAGE = 'PONG'
+# Episodes kept for inspection
+MAX_EPISODES = 100
+
+
+class StaleConnection(Exception):
+    """No message (not even a PONG) within RTDS_STALE_SECONDS"""
+
+
+def backoff_delay(attempt: int, base: float = RECONNECT_BASE_DELAY, cap: float = RTDS_RETRY_SECONDS) -> float:
+    """Exponential backoff with equal jitter: half the step fixed, half random"""
+    step = min(cap, base * 2 ** max(attempt - 1, 0))
+    return step / 2 + random.uniform(0, step / 2)
+
+
+@dataclass
+class ConnectionEpisode:
+    """One RTDS connection from connect to close"""
+    connected_at: float
+    from_spare: bool = False
+    # Last frame of any kind (PONGs included)
+    last_message_at: float = 0.0
+    messages: int = 0
+    ended_at: Optional[float] = None
+    reason: str = ''
+
+    @property
+    def duration(self) -> float:
+        return (self.ended_at or time.time()) - self.connected_at
+
+
+class RtdsMetrics:
+    """Connection episodes and counters of the RTDS connection"""
+
+    def __init__(self, max_episodes: int = MAX_EPISODES):
+        self.episodes: Deque[ConnectionEpisode] = deque(maxlen=max_episodes)
+        self.connects = 0
+        self.failed_connects = 0
+        self.stale_disconnects = 0
+        self.spare_takeovers = 0
+
+    def start_episode(self, from_spare: bool) -> ConnectionEpisode:
+        episode = ConnectionEpisode(connected_at=time.time(), from_spare=from_spare)
+        episode.last_message_at = episode.connected_at
+        self.connects += 1
+        if from_spare:
+            self.spare_takeovers += 1
+        self.episodes.append(episode)
+        return episode
+
+    def end_episode(self, episode: ConnectionEpisode, reason: str) -> None:
+        episode.ended_at = time.time()
+        episode.reason = reason
+        if reason == 'stale':
+            self.stale_disconnects += 1
+        info(
+            f'RTDS connection ended ({reason}) after {episode.duration:.0f}s, '
+            f'{episode.messages} message(s)'
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        ended = [episode for episode in self.episodes if episode.ended_at is not None]
+        return {
+            'connects': self.connects,
+            'failed_connects': self.failed_connects,
+            'stale_disconnects': self.stale_disconnects,
+            'spare_takeovers': self.spare_takeovers,
+            'avg_episode_seconds': sum(e.duration for e in ended) / len(ended) if ended else 0.0,
+        }
+
+
+async def open_connection(url: str) -> 'WebSocketClientProtocol':
+    import websockets
+    return await asyncio.wait_for(websockets.connect(url), timeout=CONNECT_TIMEOUT)
+
+
+async def heartbeat(ws: 'WebSocketClientProtocol', interval: float = RTDS_PING_SECONDS) -> None:
+    """Send PING until cancelled or the socket closes"""
+    while True:
+        await asyncio.sleep(interval)
+        await ws.send(PING_MESSAGE)
+
+
+async def receive(
+    ws: 'WebSocketClientProtocol',
+    episode: Optional[ConnectionEpisode] = None,
+    stale_seconds: float = RTDS_STALE_SECONDS
+) -> AsyncIterator[str]:
+    """Messages of a connection without PONGs; raises StaleConnection when it goes quiet"""
+    while True:
+        try:
+            message = await asyncio.wait_for(ws.recv(), timeout=stale_seconds)
+        except asyncio.TimeoutError:
+            raise StaleConnection(f'no message in {stale_seconds}s')
+        if episode is not None:
+            episode.last_message_at = time.time()
+        if message == PONG_MESSAGE or not message:
+            continue
+        if episode is not None:
+            episode.messages += 1
+        yield message
+
+
+class WarmSpare:
+    """A second connected (unsubscribed) socket ready to replace the primary"""
+
+    def __init__(self, url: str, enabled: bool = RTDS_WARM_SPARE):
+        self.url = url
+        self.enabled = enabled
+        self._ws: Optional['WebSocketClientProtocol'] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ws is not None and self._task is not None and not self._task.done()
+
+    def ensure(self) -> None:
+        """Open a spare in the background if there is none"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._keep_warm())
+
+    async def _keep_warm(self) -> None:
+        """Keep one spare open, reopening it with backoff when it drops"""
+        attempt = 0
+        while True:
+            try:
+                self._ws = await open_connection(self.url)
+                attempt = 0
+                ping_task = asyncio.create_task(heartbeat(self._ws))
+                try:
+                    # Only PONGs arrive on an unsubscribed socket
+                    async for _ in receive(self._ws):
+                        pass
+                finally:
+                    ping_task.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                warning(f'RTDS warm spare lost: {e}')
+            await self._discard()
+            attempt += 1
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def _discard(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+
+    async def take(self) -> Optional['WebSocketClientProtocol']:
+        """Hand over the spare connection (None if it isn't ready)"""
+        if not self.ready:
+            return None
+        ws, task = self._ws, self._task
+        self._ws, self._task = None, None
+        # Stop the drain loop first: a socket allows only one pending recv()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return ws
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._discard()
+
+
+_metrics: Optional[RtdsMetrics] = None
+
+
+def get_rtds_metrics() -> RtdsMetrics:
+    """Process-wide RTDS connection metrics"""
+    global _metrics
+    if _metrics is None:
+        _metrics = RtdsMetrics()
+    return _metrics
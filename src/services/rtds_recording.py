@@ -0,0 +1,63 @@
+"""
+Recording and reading raw RTDS frames
+
+With RTDS_RECORD_FILE set, the monitor appends every frame it receives (PONGs
+excluded) to a gzip-compressed JSON lines file, one {"t": receive time,
+"frame": raw text} object per line. The replay server
+(python -m src.scripts.benchmark.rtds_replay) serves such a file to the
+monitor offline at recorded speed, N times faster or as fast as possible.
+"""
+import gzip
+import json
+import time
+from typing import IO, Iterator, Optional, Tuple
+from ..config.env import ENV
+from ..utils.logger import info
+
+RTDS_RECORD_FILE = ENV.RTDS_RECORD_FILE
+# Flush the gzip stream every N frames so a killed process loses little
+FLUSH_EVERY = 100
+
+
+class FrameRecorder:
+    """Appends received frames with their receive timestamps"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self._file: Optional[IO[str]] = gzip.open(path, 'at', encoding='utf-8')
+
+    def write(self, frame: str, received_at: Optional[float] = None) -> None:
+        if self._file is None:
+            return
+        self._file.write(json.dumps({'t': received_at or time.time(), 'frame': frame}) + '\n')
+        self.frames += 1
+        if self.frames % FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            info(f'Recorded {self.frames} RTDS frame(s) to {self.path}')
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """(receive time, raw frame) pairs of a recording, in order"""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                yield record['t'], record['frame']
+
+
+_recorder: Optional[FrameRecorder] = None
+
+
+def get_frame_recorder() -> Optional[FrameRecorder]:
+    """Process-wide recorder (None unless RTDS_RECORD_FILE is set)"""
+    global _recorder
+    if _recorder is None and RTDS_RECORD_FILE:
+        _recorder = FrameRecorder(RTDS_RECORD_FILE)
+        info(f'Recording RTDS frames to {RTDS_RECORD_FILE}')
+    return _recorder
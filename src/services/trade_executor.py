@@ -1,16 +1,23 @@
 """
 Trade executor service - executes trades based on monitored activity
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import asyncio
+import os
+import socket
 import time
 from typing import List, Dict, Any, Optional
 from ..config.env import ENV
-from ..models.user_history import get_user_activity_collection
+from ..models.user_history import get_user_activity_collection, claim_pending_trades, renew_claims
 from ..interfaces.user import UserActivityInterface, UserPositionInterface
 from ..utils.fetch_data import fetch_data_async
 from ..utils.get_my_balance import get_my_balance_async
 from ..utils.post_order import post_order
+from .execution_batcher import group_combinable_trades, execute_combined_buy
+from .netting_engine import NettingBuffer, execute_netted_group
+from .portfolio_state import get_portfolio_state
+from .activity_stream import ActivityStream
+from .trader_portfolio import get_trader_portfolios
+from .instance_group import get_active_wallets
 from ..utils.logger import (
     success, info, warning, header, waiting, clear_line, separator, trade as log_trade, balance as log_balance
 )
@@ -21,6 +28,14 @@ PROXY_WALLET = ENV.PROXY_WALLET
 TRADE_AGGREGATION_ENABLED = ENV.TRADE_AGGREGATION_ENABLED
 TRADE_AGGREGATION_WINDOW_SECONDS = ENV.TRADE_AGGREGATION_WINDOW_SECONDS
 TRADE_AGGREGATION_MIN_TOTAL_USD = 1.0  # Polymarket minimum
+COMBINE_SAME_ASSET_ORDERS = ENV.COMBINE_SAME_ASSET_ORDERS
+NETTING_WINDOW_MS = ENV.NETTING_WINDOW_MS
+# Owner id on trade claims (unique per executor process unless set explicitly)
+EXECUTOR_ID = ENV.EXECUTOR_ID or f'{socket.gethostname()}:{os.getpid()}'
+CLAIM_LEASE_SECONDS = ENV.CLAIM_LEASE_SECONDS
+CLAIM_BATCH_SIZE = ENV.CLAIM_BATCH_SIZE
+# Buffered trades get their lease renewed this often (well before it expires)
+CLAIM_RENEW_SECONDS = CLAIM_LEASE_SECONDS / 3
 
 is_running = True
 
@@ -32,26 +47,47 @@ AggregatedTrade = Dict[str, Any]
 # Buffer for aggregating trades
 trade_aggregation_buffer: Dict[str, AggregatedTrade] = {}
 
+# Trades held for netting (only used when NETTING_WINDOW_MS > 0)
+netting_buffer = NettingBuffer(NETTING_WINDOW_MS)
 
-async def read_temp_trades() -> List[TradeWithUser]:
-    """Read unprocessed trades from database"""
-    all_trades: List[TradeWithUser] = []
-    
-    for address in USER_ADDRESSES:
-        collection = get_user_activity_collection(address)
-        # Only get trades that haven't been processed yet (bot: false AND botExcutedTime: 0)
-        # This prevents processing the same trade multiple times
-        trades = list(collection.find({
-            'type': 'TRADE',
-            'bot': False,
-            'botExcutedTime': 0
-        }))
-        
-        for trade in trades:
-            trade['userAddress'] = address
-            all_trades.append(trade)
+last_claim_renewal = 0.0
+
+
+def held_trades() -> List[TradeWithUser]:
+    """Claimed trades still waiting in the aggregation or netting buffer"""
+    aggregated = [trade for agg in trade_aggregation_buffer.values() for trade in agg['trades']]
+    return aggregated + netting_buffer.trades()
+
+
+async def renew_held_claims() -> None:
+    """Keep the leases of buffered trades alive so no executor re-claims them"""
+    global last_claim_renewal
+    if time.time() - last_claim_renewal < CLAIM_RENEW_SECONDS:
+        return
+    last_claim_renewal = time.time()
+    trades = held_trades()
+    if not trades:
+        return
+    renewed = await asyncio.to_thread(renew_claims, trades, EXECUTOR_ID, CLAIM_LEASE_SECONDS)
+    if renewed < len(trades):
+        warning(f'Renewed {renewed} of {len(trades)} buffered trade claim(s); the rest were taken over or finished')
+
+
+async def read_temp_trades(activity_stream: Optional[ActivityStream] = None) -> List[TradeWithUser]:
+    """Claim unprocessed trades from the database"""
+    # Each trade is claimed atomically with a lease, so other executors sharing
+    # the queue skip it and a crash hands it back once the lease expires
+    all_trades: List[TradeWithUser] = await asyncio.to_thread(
+        claim_pending_trades, get_active_wallets(), EXECUTOR_ID, CLAIM_LEASE_SECONDS, CLAIM_BATCH_SIZE
+    )
+    # A full batch may have left trades behind (a burst, or leases expired after a
+    # crash) that no new change event will announce, so read again right away
+    if activity_stream is not None and len(all_trades) >= CLAIM_BATCH_SIZE:
+        activity_stream.request_read()
     
-    return all_trades
+    # A trade this executor already buffers must not be buffered (and copied) twice
+    held_ids = {trade['_id'] for trade in held_trades()}
+    return [trade for trade in all_trades if trade['_id'] not in held_ids]
 
 
 def get_aggregation_key(trade: TradeWithUser) -> str:
@@ -66,6 +102,8 @@ def add_to_aggregation_buffer(trade: TradeWithUser) -> None:
     now = int(time.time() * 1000)  # milliseconds
     
     if existing:
+        if any(buffered['_id'] == trade['_id'] for buffered in existing['trades']):
+            return  # Already aggregated
         # Update existing aggregation
         existing['trades'].append(trade)
         existing['totalUsdcSize'] += trade.get('usdcSize', 0)
@@ -132,16 +170,40 @@ def get_ready_aggregated_trades() -> List[AggregatedTrade]:
     return ready
 
 
+def find_position(positions: List[Dict[str, Any]], trade: TradeWithUser) -> Optional[Dict[str, Any]]:
+    """Position in the traded outcome token (falls back to the market if the asset is unknown)"""
+    if trade.get('asset'):
+        return next((p for p in positions if p.get('asset') == trade['asset']), None)
+    return next((p for p in positions if p.get('conditionId') == trade.get('conditionId')), None)
+
+
+async def fetch_trader_position(trade: TradeWithUser) -> Optional[Dict[str, Any]]:
+    """
+    Trader's data-api position in the traded outcome, read only when sizing needs it
+
+    Buys are sized from the trade alone, and sells with a stored
+    traderPositionBefore don't need the post-trade position either.
+    """
+    if trade.get('side') != 'SELL' or float(trade.get('traderPositionBefore', 0) or 0) > 0:
+        return None
+    positions = await fetch_data_async(f'{ENV.DATA_API_URL}/positions?user={trade["userAddress"]}')
+    return find_position(positions if isinstance(positions, list) else [], trade)
+
+
+async def get_trader_capital(address: str) -> float:
+    """Trader's capital from the tracker (synced from the data-api the first time)"""
+    trader_portfolios = get_trader_portfolios()
+    capital = trader_portfolios.capital(address)
+    if capital is None:
+        positions = await fetch_data_async(f'{ENV.DATA_API_URL}/positions?user={address}')
+        trader_portfolios.sync_positions(address, positions if isinstance(positions, list) else [])
+        capital = trader_portfolios.capital(address)
+    return capital
+
+
 async def do_trading(clob_client: Any, trades: List[TradeWithUser]) -> None:
     """Execute trades"""
     for trade in trades:
-        # Mark trade as being processed immediately to prevent duplicate processing
-        collection = get_user_activity_collection(trade['userAddress'])
-        collection.update_one(
-            {'_id': trade['_id']},
-            {'$set': {'botExcutedTime': 1}}
-        )
-        
         log_trade(
             trade['userAddress'],
             trade.get('side', 'UNKNOWN'),
@@ -156,26 +218,14 @@ async def do_trading(clob_client: Any, trades: List[TradeWithUser]) -> None:
             }
         )
         
-        my_positions_data = await fetch_data_async(f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}')
-        user_positions_data = await fetch_data_async(f'https://data-api.polymarket.com/positions?user={trade["userAddress"]}')
-        
-        my_positions_list = my_positions_data if isinstance(my_positions_data, list) else []
-        user_positions_list = user_positions_data if isinstance(user_positions_data, list) else []
-        
-        my_position = next(
-            (p for p in my_positions_list if p.get('conditionId') == trade.get('conditionId')),
-            None
-        )
-        user_position = next(
-            (p for p in user_positions_list if p.get('conditionId') == trade.get('conditionId')),
-            None
-        )
+        # Match on the outcome token: a sell must be scaled against the same outcome the trader sold
+        my_position = get_portfolio_state().find(trade)
+        user_position = await fetch_trader_position(trade)
         
         # Get USDC balance
         my_balance = await get_my_balance_async(PROXY_WALLET)
         
-        # Calculate trader's total portfolio value from positions
-        user_balance = sum(pos.get('currentValue', 0) or 0 for pos in user_positions_list)
+        user_balance = await get_trader_capital(trade['userAddress'])
         
         log_balance(my_balance, user_balance, trade['userAddress'])
         
@@ -194,6 +244,37 @@ async def do_trading(clob_client: Any, trades: List[TradeWithUser]) -> None:
         separator()
 
 
+async def execute_trades(clob_client: Any, trades: List[TradeWithUser]) -> None:
+    """Execute new trades, combining same-asset buys from the same cycle into one order"""
+    if not COMBINE_SAME_ASSET_ORDERS:
+        await do_trading(clob_client, trades)
+        return
+    
+    groups, single_trades = group_combinable_trades(trades)
+    for group in groups:
+        await execute_combined_buy(clob_client, group)
+    if single_trades:
+        await do_trading(clob_client, single_trades)
+
+
+def hold_for_netting(trades: List[TradeWithUser]) -> None:
+    """Move new (already claimed) trades into the netting buffer"""
+    for trade in trades:
+        netting_buffer.add(trade)
+    info(f'{len(trades)} trade{"s" if len(trades) > 1 else ""} held for netting ({NETTING_WINDOW_MS}ms window)')
+
+
+async def execute_netting_ready(clob_client: Any) -> bool:
+    """Execute trade groups whose netting window has closed (True if any ran)"""
+    ready_groups = netting_buffer.pop_ready()
+    for group in ready_groups:
+        if len(group) == 1:
+            await do_trading(clob_client, group)
+        else:
+            await execute_netted_group(clob_client, group)
+    return bool(ready_groups)
+
+
 async def do_aggregated_trading(clob_client: Any, aggregated_trades: List[AggregatedTrade]) -> None:
     """Execute aggregated trades"""
     for agg in aggregated_trades:
@@ -203,37 +284,6 @@ async def do_aggregated_trading(clob_client: Any, aggregated_trades: List[Aggreg
         info(f"Total volume: ${agg['totalUsdcSize']:.2f}")
         info(f"Average price: ${agg['averagePrice']:.4f}")
         
-        # Mark all individual trades as being processed
-        for trade in agg['trades']:
-            collection = get_user_activity_collection(trade['userAddress'])
-            collection.update_one(
-                {'_id': trade['_id']},
-                {'$set': {'botExcutedTime': 1}}
-            )
-        
-        my_positions_data = await fetch_data_async(f'https://data-api.polymarket.com/positions?user={PROXY_WALLET}')
-        user_positions_data = await fetch_data_async(f'https://data-api.polymarket.com/positions?user={agg["userAddress"]}')
-        
-        my_positions_list = my_positions_data if isinstance(my_positions_data, list) else []
-        user_positions_list = user_positions_data if isinstance(user_positions_data, list) else []
-        
-        my_position = next(
-            (p for p in my_positions_list if p.get('conditionId') == agg.get('conditionId')),
-            None
-        )
-        user_position = next(
-            (p for p in user_positions_list if p.get('conditionId') == agg.get('conditionId')),
-            None
-        )
-        
-        # Get USDC balance
-        my_balance = await get_my_balance_async(PROXY_WALLET)
-        
-        # Calculate trader's total portfolio value from positions
-        user_balance = sum(pos.get('currentValue', 0) or 0 for pos in user_positions_list)
-        
-        log_balance(my_balance, user_balance, agg['userAddress'])
-        
         # Create a synthetic trade object for postOrder using aggregated values
         synthetic_trade: TradeWithUser = {
             **agg['trades'][0],  # Use first trade as template
@@ -242,6 +292,16 @@ async def do_aggregated_trading(clob_client: Any, aggregated_trades: List[Aggreg
             'side': agg.get('side', 'BUY'),
         }
         
+        my_position = get_portfolio_state().find(agg)
+        user_position = await fetch_trader_position(synthetic_trade)
+        
+        # Get USDC balance
+        my_balance = await get_my_balance_async(PROXY_WALLET)
+        
+        user_balance = await get_trader_capital(agg['userAddress'])
+        
+        log_balance(my_balance, user_balance, agg['userAddress'])
+        
         # Execute the aggregated trade
         await post_order(
             clob_client,
@@ -264,9 +324,14 @@ def stop_trade_executor() -> None:
     info('Trade executor shutdown requested...')
 
 
-async def trade_executor(clob_client: Any) -> None:
-    """Main trade executor function"""
-    success(f'Trade executor ready for {len(USER_ADDRESSES)} trader(s)')
+async def trade_executor(clob_client: Any, activity_stream: Optional[ActivityStream] = None) -> None:
+    """
+    Main trade executor function
+
+    With an activity stream, pending trades are read when the stream reports
+    a new one instead of on every 300ms tick.
+    """
+    success(f'Trade executor ready for {len(get_active_wallets())} trader(s)')
     if TRADE_AGGREGATION_ENABLED:
         info(
             f'Trade aggregation enabled: {TRADE_AGGREGATION_WINDOW_SECONDS}s window, '
@@ -276,7 +341,11 @@ async def trade_executor(clob_client: Any) -> None:
     last_check = time.time()
     
     while is_running:
-        trades = await read_temp_trades()
+        await renew_held_claims()
+        if activity_stream is None or activity_stream.should_read():
+            trades = await read_temp_trades(activity_stream)
+        else:
+            trades = []
         
         if TRADE_AGGREGATION_ENABLED:
             # Process with aggregation logic
@@ -316,26 +385,45 @@ async def trade_executor(clob_client: Any) -> None:
                 if time.time() - last_check > 0.3:
                     buffered_count = len(trade_aggregation_buffer)
                     if buffered_count > 0:
-                        waiting(len(USER_ADDRESSES), f'{buffered_count} trade group(s) pending')
+                        waiting(len(get_active_wallets()), f'{buffered_count} trade group(s) pending')
                     else:
-                        waiting(len(USER_ADDRESSES))
+                        waiting(len(get_active_wallets()))
                     last_check = time.time()
+        elif NETTING_WINDOW_MS > 0:
+            # Hold trades briefly so offsetting trades on the same asset net out
+            if trades:
+                clear_line()
+                hold_for_netting(trades)
+                last_check = time.time()
+            
+            if await execute_netting_ready(clob_client):
+                last_check = time.time()
+            elif not trades and time.time() - last_check > 0.3:
+                pending = len(netting_buffer)
+                if pending > 0:
+                    waiting(len(get_active_wallets()), f'{pending} asset(s) pending netting')
+                else:
+                    waiting(len(get_active_wallets()))
+                last_check = time.time()
         else:
             # Original non-aggregation logic
             if trades:
                 clear_line()
                 header(f'{len(trades)} NEW TRADE{"S" if len(trades) > 1 else ""} TO COPY')
-                await do_trading(clob_client, trades)
+                await execute_trades(clob_client, trades)
                 last_check = time.time()
             else:
                 # Update waiting message every 300ms for smooth animation
                 if time.time() - last_check > 0.3:
-                    waiting(len(USER_ADDRESSES))
+                    waiting(len(get_active_wallets()))
                     last_check = time.time()
         
         if not is_running:
             break
         
-        await asyncio.sleep(0.3)
+        if activity_stream is None:
+            await asyncio.sleep(0.3)
+        else:
+            await activity_stream.wait(0.3)
     
     info('Trade executor stopped')
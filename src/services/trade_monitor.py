@@ -1,55 +1,68 @@
 """
 Trade monitor service - monitors trader activity via WebSocket
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import asyncio
 import json
-import websockets
-from typing import List, Dict, Any, Optional
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from ..config.env import ENV
-from ..models.user_history import get_user_activity_collection, get_user_position_collection
+from ..models.user_history import (
+    get_user_activity_collection, get_user_position_collection, count_activities, mark_pending_trades
+)
 from ..utils.fetch_data import fetch_data_async
 from ..utils.logger import (
     info, success, warning, error, db_connection, my_positions,
     traders_positions, clear_line
 )
-from ..utils.get_my_balance import get_my_balance
+from ..utils.get_my_balance import get_my_balance_async
+from ..utils.startup_profiler import get_startup_profiler
+from .portfolio_state import get_portfolio_state
+from .trader_portfolio import get_trader_portfolios
+from .instance_group import get_instance_group, get_active_wallets, is_active_wallet
+from .activity_poller import ActivityPoller
+from .rtds_recording import get_frame_recorder
+from .rtds_connection import (
+    StaleConnection, WarmSpare, backoff_delay, get_rtds_metrics, heartbeat, open_connection, receive
+)
+
+if TYPE_CHECKING:
+    from websockets.client import WebSocketClientProtocol
 
 USER_ADDRESSES = ENV.USER_ADDRESSES
 TOO_OLD_TIMESTAMP = ENV.TOO_OLD_TIMESTAMP
-RTDS_URL = 'wss://ws-live-data.polymarket.com'
+RTDS_URL = ENV.RTDS_URL
 
 if not USER_ADDRESSES or len(USER_ADDRESSES) == 0:
     raise ValueError('USER_ADDRESSES is not defined or empty')
 
 # WebSocket connection state
-ws: Optional[websockets.client.WebSocketClientProtocol] = None
+ws: Optional['WebSocketClientProtocol'] = None
 reconnect_attempts = 0
-MAX_RECONNECT_ATTEMPTS = 10
-RECONNECT_DELAY = 5  # 5 seconds
+# Connected standby that replaces a dropped connection without a new handshake
+warm_spare = WarmSpare(RTDS_URL)
 is_running = True
 position_update_task: Optional[asyncio.Task] = None
+# When the RTDS connection was lost (None while connected)
+disconnected_at: Optional[float] = None
+backfill_task: Optional[asyncio.Task] = None
 is_first_run = True
 
 
 async def init():
     """Initialize monitor"""
-    counts = []
-    for address in USER_ADDRESSES:
-        collection = get_user_activity_collection(address)
-        count = collection.count_documents({})
-        counts.append(count)
+    counts = count_activities(USER_ADDRESSES)
     
     clear_line()
     db_connection(USER_ADDRESSES, counts)
     
     # Show your own positions first
     try:
-        my_positions_url = f'https://data-api.polymarket.com/positions?user={ENV.PROXY_WALLET}'
-        my_positions_data = await fetch_data_async(my_positions_url)
+        portfolio = get_portfolio_state()
+        await portfolio.ensure_seeded()
+        my_positions_data = portfolio.positions()
         
         # Get current USDC balance
-        current_balance = get_my_balance(ENV.PROXY_WALLET)
+        current_balance = await get_my_balance_async(ENV.PROXY_WALLET)
         
         if isinstance(my_positions_data, list) and len(my_positions_data) > 0:
             # Calculate your overall profitability and initial investment
@@ -109,10 +122,11 @@ async def init():
     traders_positions(USER_ADDRESSES, position_counts, position_details, profitabilities)
 
 
-async def process_trade_activity(activity: Dict[str, Any], address: str):
-    """Process incoming trade activity from RTDS"""
+async def process_trade_activity(activity: Dict[str, Any], address: str) -> bool:
+    """Store a new trade from RTDS or HTTP polling (True if it was new)"""
+    from pymongo.errors import DuplicateKeyError
+
     activity_collection = get_user_activity_collection(address)
-    position_collection = get_user_position_collection(address)
     
     try:
         # Skip if too old
@@ -122,15 +136,9 @@ async def process_trade_activity(activity: Dict[str, Any], address: str):
         else:
             activity_timestamp_ms = activity_timestamp * 1000
         
-        import time
         hours_ago = (time.time() * 1000 - activity_timestamp_ms) / (1000 * 60 * 60)
         if hours_ago > TOO_OLD_TIMESTAMP:
-            return
-        
-        # Check if this trade already exists in database
-        existing = activity_collection.find_one({'transactionHash': activity.get('transactionHash')})
-        if existing:
-            return  # Already processed this trade
+            return False
         
         # Save new trade to database
         new_activity = {
@@ -158,20 +166,42 @@ async def process_trade_activity(activity: Dict[str, Any], address: str):
             'bot': False,
             'botExcutedTime': 0,
         }
+        # Trader's position before this trade: the data-api snapshot read at execution
+        # time often doesn't include the trade yet, which understates sell ratios
+        position_before = get_trader_portfolios().position_size_before(address, activity)
+        if position_before is not None:
+            new_activity['traderPositionBefore'] = position_before
         
-        activity_collection.insert_one(new_activity)
+        # The unique (wallet, transactionHash) index makes the insert the duplicate check,
+        # so two monitors receiving the same trade store it once
+        try:
+            activity_collection.insert_one(new_activity)
+        except DuplicateKeyError:
+            return False  # Already processed this trade
+        get_trader_portfolios().apply_activity(address, activity)
         info(f'New trade detected for {address[:6]}...{address[-4:]}')
+        return True
     except Exception as e:
         error(f'Error processing trade activity for {address[:6]}...{address[-4:]}: {e}')
+        return False
+
+
+# Ingests trades over HTTP while the RTDS connection is down
+activity_poller = ActivityPoller(process_trade_activity, get_active_wallets)
 
 
 async def update_positions():
     """Fetch and update positions"""
-    for address in USER_ADDRESSES:
+    trader_portfolios = get_trader_portfolios()
+    addresses = get_active_wallets()
+    for address in addresses:
         try:
-            positions_url = f'https://data-api.polymarket.com/positions?user={address}'
+            positions_url = f'{ENV.DATA_API_URL}/positions?user={address}'
             positions = await fetch_data_async(positions_url)
             
+            if isinstance(positions, list):
+                trader_portfolios.sync_positions(address, positions)
+            
             if isinstance(positions, list) and len(positions) > 0:
                 position_collection = get_user_position_collection(address)
                 for position in positions:
@@ -209,23 +239,37 @@ async def update_positions():
                     )
         except Exception as e:
             error(f'Error updating positions for {address[:6]}...{address[-4:]}: {e}')
+    
+    await trader_portfolios.refresh_cash(addresses)
 
 
 async def connect_rtds():
     """Connect to RTDS WebSocket and subscribe to trader activities"""
-    global ws, reconnect_attempts
+    global ws, reconnect_attempts, disconnected_at, backfill_task
+    metrics = get_rtds_metrics()
+    recorder = get_frame_recorder()
+    
+    try:
+        ws = await warm_spare.take()
+        from_spare = ws is not None
+        if from_spare:
+            success('RTDS warm spare connection took over')
+        else:
+            info(f'Connecting to RTDS at {RTDS_URL}...')
+            ws = await open_connection(RTDS_URL)
+            success('RTDS WebSocket connected')
+    except Exception as e:
+        metrics.failed_connects += 1
+        error(f'RTDS WebSocket error: {e}')
+        raise
+    
+    reconnect_attempts = 0
+    activity_poller.stop()
+    episode = metrics.start_episode(from_spare)
+    heartbeat_task = asyncio.create_task(heartbeat(ws))
+    reason = 'closed'
     
     try:
-        info(f'Connecting to RTDS at {RTDS_URL}...')
-        
-        # Connect with timeout
-        ws = await asyncio.wait_for(
-            websockets.connect(RTDS_URL),
-            timeout=30.0  # 30 second timeout
-        )
-        success('RTDS WebSocket connected')
-        reconnect_attempts = 0
-        
         # Subscribe to activity/trades for each trader address
         subscriptions = [{
             'topic': 'activity',
@@ -238,12 +282,21 @@ async def connect_rtds():
         }
         
         await ws.send(json.dumps(subscribe_message))
-        success(f'Subscribed to RTDS for {len(USER_ADDRESSES)} trader(s) - monitoring in real-time')
+        success(f'Subscribed to RTDS for {len(get_active_wallets())} trader(s) - monitoring in real-time')
+        get_startup_profiler().mark('RTDS subscribed')
+        warm_spare.ensure()
         
-        # Listen for messages
-        async for message in ws:
+        if disconnected_at is not None:
+            # RTDS only pushes live events; fetch what was missed while disconnected
+            backfill_task = asyncio.create_task(backfill_gap(time.time() - disconnected_at))
+            disconnected_at = None
+        
+        # Listen for messages (PONGs are filtered; silence raises StaleConnection)
+        async for message in receive(ws, episode):
             if not is_running:
                 break
+            if recorder is not None:
+                recorder.write(message, episode.last_message_at)
             
             try:
                 data = json.loads(message)
@@ -257,35 +310,65 @@ async def connect_rtds():
                     activity = data['payload']
                     trader_address = activity.get('proxyWallet', '').lower()
                     
-                    if trader_address in [addr.lower() for addr in USER_ADDRESSES]:
+                    # With INSTANCE_GROUP set, other instances store the rest of the wallets
+                    if is_active_wallet(trader_address):
+                        activity_poller.observe(activity, trader_address)
                         await process_trade_activity(activity, trader_address)
             except Exception as e:
                 error(f'Error processing RTDS message: {e}')
                 
+    except StaleConnection as e:
+        reason = 'stale'
+        warning(f'RTDS connection stale ({e}), reconnecting')
+        raise
     except Exception as e:
+        reason = type(e).__name__
         error(f'RTDS WebSocket error: {e}')
-        if ws:
-            await ws.close()
         raise
+    finally:
+        heartbeat_task.cancel()
+        metrics.end_episode(episode, reason)
+        # Trades after the last frame may have been missed
+        if is_running and disconnected_at is None:
+            disconnected_at = episode.last_message_at
+        await ws.close()
+
+
+async def backfill_gap(gap_seconds: float):
+    """Store the trades made since each trader's last seen trade"""
+    try:
+        recovered = await activity_poller.backfill()
+    except Exception as e:
+        error(f'RTDS gap backfill failed: {e}')
+        return
+    for address, count in recovered.items():
+        if count > 0:
+            info(f'Recovered {count} missed trade(s) for {address[:6]}...{address[-4:]}')
+    info(f'RTDS gap of {gap_seconds:.0f}s backfilled: {sum(recovered.values())} trade(s) recovered')
 
 
 async def reconnect_loop():
-    """Handle reconnection logic"""
-    global reconnect_attempts, ws
+    """Keep RTDS connected (no attempt limit); ingest over HTTP polling whenever it is down"""
+    global reconnect_attempts, disconnected_at
     
-    while is_running and reconnect_attempts < MAX_RECONNECT_ATTEMPTS:
+    while is_running:
         try:
             await connect_rtds()
-            # If connection successful, break out of loop
+        except Exception:
+            pass  # connect_rtds logged the error
+        if not is_running:
             break
-        except Exception as e:
-            reconnect_attempts += 1
-            if reconnect_attempts < MAX_RECONNECT_ATTEMPTS:
-                delay = RECONNECT_DELAY * min(reconnect_attempts, 5)  # Max 25 seconds
-                info(f'Reconnecting to RTDS in {delay}s (attempt {reconnect_attempts}/{MAX_RECONNECT_ATTEMPTS})...')
-                await asyncio.sleep(delay)
-            else:
-                error(f'Max reconnection attempts ({MAX_RECONNECT_ATTEMPTS}) reached. Please restart the bot.')
+        if disconnected_at is None:
+            disconnected_at = time.time()
+        
+        if warm_spare.ready:
+            continue  # Take over the spare right away
+        
+        reconnect_attempts += 1
+        activity_poller.start()
+        delay = backoff_delay(reconnect_attempts)
+        info(f'Reconnecting to RTDS in {delay:.1f}s (attempt {reconnect_attempts})...')
+        await asyncio.sleep(delay)
 
 
 def stop_trade_monitor():
@@ -298,10 +381,18 @@ def stop_trade_monitor():
         position_update_task.cancel()
         position_update_task = None
     
+    activity_poller.stop()
+    
     if ws:
         asyncio.create_task(ws.close())
         ws = None
     
+    asyncio.create_task(warm_spare.close())
+    
+    recorder = get_frame_recorder()
+    if recorder is not None:
+        recorder.close()
+    
     info('Trade monitor shutdown requested...')
 
 
@@ -309,45 +400,52 @@ async def trade_monitor():
     """Main trade monitor function"""
     global is_first_run, position_update_task
     
-    await init()
-    success(f'Monitoring {len(USER_ADDRESSES)} trader(s) using RTDS (Real-Time Data Stream)')
-    
     # On first run, mark all existing historical trades as already processed
+    # (must happen before subscribing, or new trades would be marked too)
+    group = get_instance_group()
+    if is_first_run and group is not None and len(group.members) > 1:
+        # Joining a running group: pending trades belong to live peers, leave them alone
+        is_first_run = False
+    
     if is_first_run:
         info('First run: marking all historical trades as processed...')
-        for address in USER_ADDRESSES:
-            collection = get_user_activity_collection(address)
-            result = collection.update_many(
-                {'bot': False},
-                {'$set': {'bot': True, 'botExcutedTime': 999}}
-            )
-            if result.modified_count > 0:
-                info(f'Marked {result.modified_count} historical trades as processed for {address[:6]}...{address[-4:]}')
+        marked = mark_pending_trades(USER_ADDRESSES, {'$set': {'bot': True, 'botExcutedTime': 999}})
+        for address, count in marked.items():
+            if count > 0:
+                info(f'Marked {count} historical trades as processed for {address[:6]}...{address[-4:]}')
         
         is_first_run = False
         success('\nHistorical trades processed. Now monitoring for new trades only.')
     
+    # Position/balance overview is display only; load it while RTDS connects
+    init_task = asyncio.create_task(init())
+    success(f'Monitoring {len(get_active_wallets())} trader(s) using RTDS (Real-Time Data Stream)')
+    
+    # Update positions now (seeds the trader capital estimates) and then every 30 seconds
+    async def update_positions_periodically():
+        while is_running:
+            await update_positions()
+            await asyncio.sleep(30)
+    
+    position_update_task = asyncio.create_task(update_positions_periodically())
+    
+    # Polling after an RTDS drop starts from here, not from the traders' history
+    for address in get_active_wallets():
+        activity_poller.cursor(address)
+    
     # Connect to RTDS
     try:
         await reconnect_loop()
         
-        # Update positions periodically (every 30 seconds)
-        async def update_positions_periodically():
-            while is_running:
-                await asyncio.sleep(30)
-                if is_running:
-                    await update_positions()
-        
-        position_update_task = asyncio.create_task(update_positions_periodically())
-        
         # Keep the process alive
         while is_running:
             await asyncio.sleep(1)
             
     except Exception as e:
-        error(f'Failed to connect to RTDS: {e}')
-        error('Falling back to HTTP polling is not implemented. Please check your connection.')
+        error(f'Trade monitor failed: {e}')
         raise
+    finally:
+        init_task.cancel()
+        activity_poller.stop()
     
     info('Trade monitor stopped')
-
@@ -0,0 +1,158 @@
+"""
+Running capital estimates of followed traders
+
+Proportional sizing needs each trader's capital. Instead of summing the
+trader's full /positions list on every copied trade, each trader's position
+value is kept incrementally: RTDS trades adjust the traded position (size and
+mark price) and the periodic position sync replaces the snapshot. With
+TRADER_CAPITAL_INCLUDE_CASH the trader's USDC balance is added, read for all
+traders in one batched RPC request during the sync.
+"""
+import asyncio
+import time
+from typing import Callable, List, Dict, Any, Optional, Sequence
+from ..config.env import ENV
+from ..utils.fetch_data import fetch_data_async
+from ..utils.onchain_reader import get_onchain_reader, format_units
+from ..utils.logger import warning
+from .activity_poller import trade_seconds
+
+TRADER_CAPITAL_INCLUDE_CASH = ENV.TRADER_CAPITAL_INCLUDE_CASH
+
+
+class TraderPortfolio:
+    """Position value (and optionally USDC cash) of one trader"""
+
+    def __init__(self):
+        # asset -> [size, mark price]
+        self._positions: Dict[str, List[float]] = {}
+        self.position_value = 0.0
+        self.cash: Optional[float] = None
+        # When the current /positions snapshot was loaded (0 = never)
+        self.synced_at = 0.0
+
+    def load_positions(self, positions: List[Dict[str, Any]], synced_at: Optional[float] = None) -> None:
+        """Replace the positions with a /positions snapshot"""
+        self.synced_at = synced_at if synced_at is not None else time.time()
+        self._positions.clear()
+        for position in positions:
+            size = float(position.get('size', 0) or 0)
+            if not position.get('asset') or size <= 0:
+                continue
+            value = float(position.get('currentValue', 0) or 0)
+            price = value / size if value else float(position.get('curPrice', 0) or 0)
+            self._positions[position['asset']] = [size, price]
+        self.position_value = sum(size * price for size, price in self._positions.values())
+
+    def apply_trade(self, asset: str, side: str, size: float, price: float) -> None:
+        """Apply a trade: move the position size and re-mark it at the trade price"""
+        held, old_price = self._positions.get(asset, [0.0, price])
+        new_size = held + size if side == 'BUY' else max(0.0, held - size)
+        self.position_value += new_size * price - held * old_price
+        if new_size > 0:
+            self._positions[asset] = [new_size, price]
+        else:
+            self._positions.pop(asset, None)
+        if self.cash is not None:
+            cash_delta = -size * price if side == 'BUY' else size * price
+            self.cash = max(0.0, self.cash + cash_delta)
+
+    def position_size(self, asset: str) -> float:
+        return self._positions.get(asset, [0.0, 0.0])[0]
+
+    def predates(self, timestamp: float) -> bool:
+        """Whether the snapshot was taken before a trade (so it doesn't include it yet)"""
+        return 0 < self.synced_at < timestamp
+
+    @property
+    def capital(self) -> float:
+        return max(0.0, self.position_value) + (self.cash or 0.0)
+
+
+class TraderPortfolioTracker:
+    """TraderPortfolio per followed trader address"""
+
+    def __init__(self, include_cash: bool = TRADER_CAPITAL_INCLUDE_CASH):
+        self.include_cash = include_cash
+        self._portfolios: Dict[str, TraderPortfolio] = {}
+
+    def get(self, address: str) -> Optional[TraderPortfolio]:
+        return self._portfolios.get(address.lower())
+
+    def _portfolio(self, address: str) -> TraderPortfolio:
+        return self._portfolios.setdefault(address.lower(), TraderPortfolio())
+
+    def sync_positions(self, address: str, positions: List[Dict[str, Any]]) -> None:
+        self._portfolio(address).load_positions(positions)
+
+    def position_size_before(self, address: str, activity: Dict[str, Any]) -> Optional[float]:
+        """
+        Trader's size in the traded asset before a trade
+
+        None unless the positions snapshot predates the trade: a snapshot taken
+        after it (polled or backfilled trades, or a sync racing RTDS) already
+        holds the post-trade size.
+        """
+        portfolio = self.get(address)
+        if portfolio is None or not portfolio.predates(trade_seconds(activity)):
+            return None
+        return portfolio.position_size(activity.get('asset', ''))
+
+    def apply_activity(self, address: str, activity: Dict[str, Any]) -> None:
+        """Apply a trade unless the positions snapshot already includes it (or was never loaded)"""
+        portfolio = self.get(address)
+        if portfolio is None or not activity.get('asset') or not portfolio.predates(trade_seconds(activity)):
+            return
+        portfolio.apply_trade(
+            activity['asset'],
+            activity.get('side', 'BUY'),
+            float(activity.get('size', 0) or 0),
+            float(activity.get('price', 0) or 0)
+        )
+
+    async def refresh_cash(self, addresses: Sequence[str]) -> None:
+        """Read the USDC balance of every trader in one batched RPC request"""
+        if not self.include_cash or not addresses:
+            return
+        try:
+            balances = await get_onchain_reader().get_balances(addresses)
+        except Exception as e:
+            warning(f'Failed to read trader USDC balances: {e}')
+            return
+        for address in addresses:
+            raw = balances.get(address.lower())
+            if raw is not None:
+                self._portfolio(address).cash = format_units(raw)
+
+    async def sync_from_data_api(self, addresses: Sequence[str]) -> None:
+        """Reload every trader's positions and cash (for processes without the monitor's sync)"""
+        for address in addresses:
+            try:
+                positions = await fetch_data_async(f'{ENV.DATA_API_URL}/positions?user={address}')
+                if isinstance(positions, list):
+                    self.sync_positions(address, positions)
+            except Exception as e:
+                warning(f'Failed to sync positions of {address[:6]}...{address[-4:]}: {e}')
+        await self.refresh_cash(addresses)
+
+    async def run_sync_loop(self, get_addresses: Callable[[], Sequence[str]], interval_seconds: float = 30) -> None:
+        """Sync the current addresses now and then every interval until cancelled"""
+        while True:
+            await self.sync_from_data_api(get_addresses())
+            await asyncio.sleep(interval_seconds)
+
+    def capital(self, address: str) -> Optional[float]:
+        """Capital estimate of a trader in USD (None until the trader was synced)"""
+        portfolio = self.get(address)
+        return portfolio.capital if portfolio is not None else None
+
+
+_tracker: Optional[TraderPortfolioTracker] = None
+
+
+def get_trader_portfolios() -> TraderPortfolioTracker:
+    """Process-wide tracker of the followed traders"""
+    global _tracker
+    if _tracker is None:
+        _tracker = TraderPortfolioTracker()
+    return _tracker
@@ -0,0 +1,76 @@
+"""
+Persisted CLOB client bootstrap data
+
+Wallet type detection and API key creation/derivation only depend on the
+private key and proxy wallet, so their results are cached in a local file
+(owner read/write only) and reused on every later start. The cache is keyed by
+a hash of PRIVATE_KEY + PROXY_WALLET; changing either one invalidates it.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent.parent / '.clob_bootstrap.json'
+BOOTSTRAP_CACHE_FILE = Path(os.getenv('CLOB_BOOTSTRAP_CACHE_FILE', str(DEFAULT_CACHE_FILE)))
+# Set to true to ignore the cache once (e.g. after revoking API keys)
+BOOTSTRAP_CACHE_REFRESH = os.getenv('CLOB_BOOTSTRAP_REFRESH', 'false').lower() == 'true'
+
+CACHE_VERSION = 1
+
+
+def wallet_fingerprint(private_key: str, proxy_wallet: str) -> str:
+    """Hash identifying the wallet configuration the cache was built for"""
+    key = private_key.lower().replace('0x', '')
+    material = f'{CACHE_VERSION}:{key}:{proxy_wallet.lower()}'
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def load_bootstrap(
+    private_key: str,
+    proxy_wallet: str,
+    path: Optional[Path] = None
+) -> Optional[Dict[str, Any]]:
+    """Load cached bootstrap data (None if missing, stale or unreadable)"""
+    path = path or BOOTSTRAP_CACHE_FILE
+    if BOOTSTRAP_CACHE_REFRESH or not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('fingerprint') != wallet_fingerprint(private_key, proxy_wallet):
+        return None
+    return data
+
+
+def save_bootstrap(
+    private_key: str,
+    proxy_wallet: str,
+    data: Dict[str, Any],
+    path: Optional[Path] = None
+) -> None:
+    """Write bootstrap data atomically, readable by the owner only"""
+    path = path or BOOTSTRAP_CACHE_FILE
+    payload = dict(data)
+    payload['fingerprint'] = wallet_fingerprint(private_key, proxy_wallet)
+    payload['created_at'] = int(datetime.now().timestamp())
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    # Create with 0600 from the start so credentials are never world-readable
+    fd = os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+
+def clear_bootstrap(path: Optional[Path] = None) -> None:
+    """Delete the bootstrap cache"""
+    path = path or BOOTSTRAP_CACHE_FILE
+    if path.exists():
+        path.unlink()
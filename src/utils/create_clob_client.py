@@ -3,26 +3,51 @@ Create Polymarket CLOB client
 Note: This is a simplified wrapper. For full functionality, you may need to use
 the JavaScript SDK via subprocess or implement the full Python API client.
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
-from typing import Optional, Dict, Any
-from web3 import Web3
-from eth_account import Account
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from ..config.env import ENV
-from ..utils.logger import info, error
+from ..utils.logger import info, warning, error
+from ..utils.onchain_reader import get_onchain_reader
+from ..utils.bootstrap_cache import load_bootstrap, save_bootstrap
 
+POLYGON_CHAIN_ID = 137
+CLOB_AUTH_MESSAGE = 'This message attests that I control the given wallet'
+# Maximum orders the CLOB accepts in one POST /orders request
+MAX_ORDERS_PER_BATCH = 15
+# Order books younger than this are reused (0 disables caching)
+ORDER_BOOK_CACHE_MS = ENV.ORDER_BOOK_CACHE_MS
 
-async def is_gnosis_safe(address: str) -> bool:
-    """Determines if a wallet is a Gnosis Safe by checking if it has contract code"""
+
+async def is_gnosis_safe(address: str) -> Optional[bool]:
+    """
+    Determines if a wallet is a Gnosis Safe by checking if it has contract code
+
+    Returns None when the code could not be read, so callers can tell an
+    RPC failure apart from an EOA.
+    """
     try:
-        w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
-        # Convert address to checksum format for web3.py
-        checksum_address = Web3.to_checksum_address(address)
-        code = w3.eth.get_code(checksum_address)
-        # If code is not "0x", then it's a contract (likely Gnosis Safe)
-        return code != b'0x'
+        reader = get_onchain_reader()
+        [code] = await reader.batch([reader.code_call(address)])
+        if isinstance(code, Exception):
+            raise code
+        # Empty code ("0x") means an EOA; anything else is a contract (likely Gnosis Safe)
+        return code not in (None, '', '0x')
     except Exception as e:
         error(f'Error checking wallet type: {e}')
-        return False
+        return None
+
+
+def _normalize_creds(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an /auth response to {'key', 'secret', 'passphrase'}"""
+    key = data.get('apiKey') or data.get('key')
+    if not key:
+        return {}
+    return {'key': key, 'secret': data.get('secret'), 'passphrase': data.get('passphrase')}
 
 
 class ClobClient:
@@ -46,63 +71,256 @@ class ClobClient:
         self.api_key = api_creds.get('key') if api_creds else None
         self.api_secret = api_creds.get('secret') if api_creds else None
         self.api_passphrase = api_creds.get('passphrase') if api_creds else None
+        self._order_factory = None
+        self._neg_risk: Dict[str, bool] = {}
+        self._books: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._book_requests: Dict[str, asyncio.Future] = {}
     
-    async def create_api_key(self) -> Dict[str, Any]:
-        """Create API key - placeholder, needs implementation"""
-        # This would need to call the Polymarket API to create keys
-        # For now, return empty dict
-        return {}
+    @property
+    def order_factory(self):
+        """Order signer with cached key and per-token hash templates (created on first order)"""
+        if self._order_factory is None:
+            from ..utils.order_factory import OrderFactory
+            self._order_factory = OrderFactory(
+                self.wallet.key.hex(),
+                maker=self.proxy_wallet,
+                signature_type=self.signature_type,
+                chain_id=self.chain_id
+            )
+        return self._order_factory
     
-    async def derive_api_key(self) -> Dict[str, Any]:
-        """Derive API key - placeholder, needs implementation"""
-        # This would need to call the Polymarket API to derive keys
-        # For now, return empty dict
-        return {}
+    def _l1_headers(self, nonce: int = 0) -> Dict[str, str]:
+        """Sign the ClobAuth EIP-712 message for key management endpoints"""
+        try:
+            from eth_account.messages import encode_typed_data
+        except ImportError:  # eth-account < 0.10
+            from eth_account.messages import encode_structured_data as encode_typed_data
+
+        timestamp = str(int(time.time()))
+        typed_data = {
+            'types': {
+                'EIP712Domain': [
+                    {'name': 'name', 'type': 'string'},
+                    {'name': 'version', 'type': 'string'},
+                    {'name': 'chainId', 'type': 'uint256'},
+                ],
+                'ClobAuth': [
+                    {'name': 'address', 'type': 'address'},
+                    {'name': 'timestamp', 'type': 'string'},
+                    {'name': 'nonce', 'type': 'uint256'},
+                    {'name': 'message', 'type': 'string'},
+                ],
+            },
+            'primaryType': 'ClobAuth',
+            'domain': {'name': 'ClobAuthDomain', 'version': '1', 'chainId': self.chain_id},
+            'message': {
+                'address': self.wallet.address,
+                'timestamp': timestamp,
+                'nonce': nonce,
+                'message': CLOB_AUTH_MESSAGE,
+            },
+        }
+        signed = self.wallet.sign_message(encode_typed_data(full_message=typed_data))
+        signature = signed.signature.hex()
+        return {
+            'POLY_ADDRESS': self.wallet.address,
+            'POLY_SIGNATURE': signature if signature.startswith('0x') else '0x' + signature,
+            'POLY_TIMESTAMP': timestamp,
+            'POLY_NONCE': str(nonce),
+        }
+
+    async def create_api_key(self, nonce: int = 0) -> Dict[str, Any]:
+        """Create a new API key for the wallet"""
+        import httpx
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f'{self.host}/auth/api-key', headers=self._l1_headers(nonce))
+            if not response.is_success:
+                return {}
+            return _normalize_creds(response.json())
+
+    async def derive_api_key(self, nonce: int = 0) -> Dict[str, Any]:
+        """Derive the wallet's existing API key"""
+        import httpx
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f'{self.host}/auth/derive-api-key', headers=self._l1_headers(nonce))
+            response.raise_for_status()
+            return _normalize_creds(response.json())
+
+    async def get_order_book(self, token_id: str, max_age_ms: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get order book for a token
+
+        Books younger than ORDER_BOOK_CACHE_MS are served from memory and
+        concurrent requests for the same token share one fetch. Posting an
+        order for a token drops its cached book.
+        """
+        max_age_ms = ORDER_BOOK_CACHE_MS if max_age_ms is None else max_age_ms
+        cached = self._books.get(token_id)
+        if cached and (time.monotonic() - cached[0]) * 1000 < max_age_ms:
+            return cached[1]
+        
+        pending = self._book_requests.get(token_id)
+        if pending is None:
+            pending = self._book_requests[token_id] = asyncio.ensure_future(self._fetch_order_book(token_id))
+            pending.add_done_callback(lambda _: self._book_requests.pop(token_id, None))
+        return await asyncio.shield(pending)
     
-    async def get_order_book(self, token_id: str) -> Dict[str, Any]:
-        """Get order book for a token"""
+    async def _fetch_order_book(self, token_id: str) -> Dict[str, Any]:
         import httpx
         url = f'{self.host}/book?token_id={token_id}'
         async with httpx.AsyncClient() as client:
             response = await client.get(url)
             response.raise_for_status()
-            return response.json()
+            book = response.json()
+        self._books[token_id] = (time.monotonic(), book)
+        return book
+    
+    def invalidate_order_book(self, token_id: str) -> None:
+        """Drop a cached book (our own orders changed it)"""
+        self._books.pop(token_id, None)
+    
+    async def get_neg_risk(self, token_id: str) -> bool:
+        """Whether a token trades on the neg-risk exchange (cached per token)"""
+        if token_id not in self._neg_risk:
+            import httpx
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f'{self.host}/neg-risk?token_id={token_id}')
+                response.raise_for_status()
+                self._neg_risk[token_id] = bool(response.json().get('neg_risk'))
+        return self._neg_risk[token_id]
     
     async def create_market_order(self, order_args: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a market order - placeholder, needs full implementation"""
-        # This needs to create and sign an order according to Polymarket's format
-        # For now, return a placeholder
+        """Create and sign a market order ({'side', 'tokenID', 'amount', 'price', 'negRisk'?})"""
+        neg_risk = order_args.get('negRisk')
+        if neg_risk is None:
+            neg_risk = await self.get_neg_risk(order_args['tokenID'])
+        return self.order_factory.create_market_order(
+            order_args['tokenID'],
+            order_args['side'],
+            order_args['amount'],
+            order_args['price'],
+            neg_risk
+        )
+    
+    async def create_market_orders(self, orders_args: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Sign several market orders at once (e.g. a depth sweep) off the event loop"""
+        orders_args = [dict(args) for args in orders_args]
+        for args in orders_args:
+            if args.get('negRisk') is None:
+                args['negRisk'] = await self.get_neg_risk(args['tokenID'])
+        return await self.order_factory.sign_batch_async(orders_args)
+    
+    def _l2_headers(self, method: str, path: str, body: str = '') -> Dict[str, str]:
+        """HMAC-authenticated headers for trading endpoints"""
+        timestamp = str(int(time.time()))
+        message = timestamp + method + path + body
+        secret = base64.urlsafe_b64decode(self.api_secret)
+        digest = hmac.new(secret, message.encode('utf-8'), hashlib.sha256).digest()
         return {
-            'side': order_args.get('side'),
-            'tokenID': order_args.get('tokenID'),
-            'amount': order_args.get('amount'),
-            'price': order_args.get('price'),
+            'POLY_ADDRESS': self.wallet.address,
+            'POLY_SIGNATURE': base64.urlsafe_b64encode(digest).decode('utf-8'),
+            'POLY_TIMESTAMP': timestamp,
+            'POLY_API_KEY': self.api_key,
+            'POLY_PASSPHRASE': self.api_passphrase,
+            'Content-Type': 'application/json',
         }
     
+    async def _post_json(self, path: str, payload: Any) -> Any:
+        import httpx
+        if not self.api_key:
+            raise RuntimeError('No API credentials - cannot post orders')
+        # The HMAC covers the exact body, so serialize once and send that string
+        body = json.dumps(payload, separators=(',', ':'))
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f'{self.host}{path}',
+                content=body,
+                headers=self._l2_headers('POST', path, body)
+            )
+            try:
+                data = response.json()
+            except ValueError:
+                data = {'error': response.text or f'HTTP {response.status_code}'}
+            if not response.is_success and isinstance(data, dict):
+                data.setdefault('success', False)
+            return data
+    
     async def post_order(self, signed_order: Dict[str, Any], order_type: str) -> Dict[str, Any]:
-        """Post order to Polymarket - placeholder, needs full implementation"""
-        # This needs to post the signed order to Polymarket's API
-        # For now, return a placeholder response
-        return {'success': False, 'error': 'Not implemented - requires full CLOB client implementation'}
+        """Post a signed order"""
+        self.invalidate_order_book(str(signed_order.get('tokenId', '')))
+        return await self._post_json(
+            '/order',
+            {'order': signed_order, 'owner': self.api_key, 'orderType': order_type}
+        )
+    
+    async def post_orders(self, signed_orders: List[Dict[str, Any]], order_type: str) -> List[Dict[str, Any]]:
+        """
+        Post several signed orders in as few requests as possible
+
+        Returns one response per order, in order. A failed request yields an
+        error response for each of its orders instead of raising.
+        """
+        for order in signed_orders:
+            self.invalidate_order_book(str(order.get('tokenId', '')))
+        responses: List[Dict[str, Any]] = []
+        for start in range(0, len(signed_orders), MAX_ORDERS_PER_BATCH):
+            chunk = signed_orders[start:start + MAX_ORDERS_PER_BATCH]
+            try:
+                data = await self._post_json(
+                    '/orders',
+                    [{'order': order, 'owner': self.api_key, 'orderType': order_type} for order in chunk]
+                )
+            except Exception as e:
+                data = {'success': False, 'error': str(e)}
+            if isinstance(data, list) and len(data) == len(chunk):
+                responses.extend(data)
+            else:
+                # Whole request rejected: same error for every order in it
+                responses.extend(dict(data) if isinstance(data, dict) else {'success': False, 'error': str(data)} for _ in chunk)
+        return responses
 
 
 async def create_clob_client() -> ClobClient:
-    """Create and initialize CLOB client"""
-    chain_id = 137  # Polygon
+    """
+    Create and initialize CLOB client
+
+    Wallet type and API credentials are loaded from the bootstrap cache when
+    available, so a warm start makes no network requests.
+    """
+    from eth_account import Account
+
     host = ENV.CLOB_HTTP_URL
-    
+
     # Create wallet from private key
     account = Account.from_key(ENV.PRIVATE_KEY)
-    
+
+    cached = load_bootstrap(ENV.PRIVATE_KEY, ENV.PROXY_WALLET)
+    if cached and cached.get('api_creds', {}).get('key'):
+        is_proxy_safe = bool(cached['is_proxy_safe'])
+        info(f'Loaded CLOB bootstrap cache ({"Gnosis Safe" if is_proxy_safe else "EOA"} wallet)')
+        return ClobClient(
+            host=host,
+            chain_id=cached.get('chain_id', POLYGON_CHAIN_ID),
+            wallet=account,
+            api_creds=cached['api_creds'],
+            signature_type=cached['signature_type'],
+            proxy_wallet=ENV.PROXY_WALLET if is_proxy_safe else None
+        )
+
+    chain_id = POLYGON_CHAIN_ID
+
     # Detect if the proxy wallet is a Gnosis Safe or EOA
-    is_proxy_safe = await is_gnosis_safe(ENV.PROXY_WALLET)
+    detected = await is_gnosis_safe(ENV.PROXY_WALLET)
+    is_proxy_safe = bool(detected)
     signature_type = 'POLY_GNOSIS_SAFE' if is_proxy_safe else 'EOA'
-    
-    info(
-        f'Wallet type detected: {"Gnosis Safe" if is_proxy_safe else "EOA (Externally Owned Account)"}'
-    )
-    
-    # Create initial client
+
+    if detected is None:
+        warning('Could not detect wallet type, assuming EOA for this run (not cached)')
+    else:
+        info(
+            f'Wallet type detected: {"Gnosis Safe" if is_proxy_safe else "EOA (Externally Owned Account)"}'
+        )
+
     clob_client = ClobClient(
         host=host,
         chain_id=chain_id,
@@ -110,7 +328,7 @@ async def create_clob_client() -> ClobClient:
         signature_type=signature_type,
         proxy_wallet=ENV.PROXY_WALLET if is_proxy_safe else None
     )
-    
+
     # Try to create or derive API key
     try:
         creds = await clob_client.create_api_key()
@@ -119,16 +337,23 @@ async def create_clob_client() -> ClobClient:
     except Exception as e:
         error(f'Failed to create/derive API key: {e}')
         creds = {}
-    
-    # Create client with credentials
-    clob_client = ClobClient(
-        host=host,
-        chain_id=chain_id,
-        wallet=account,
-        api_creds=creds,
-        signature_type=signature_type,
-        proxy_wallet=ENV.PROXY_WALLET if is_proxy_safe else None
-    )
-    
-    return clob_client
 
+    clob_client.api_creds = creds
+    clob_client.api_key = creds.get('key')
+    clob_client.api_secret = creds.get('secret')
+    clob_client.api_passphrase = creds.get('passphrase')
+
+    # Only cache a complete bootstrap; a failed key request or wallet type
+    # detection is retried next start
+    if creds.get('key') and detected is not None:
+        try:
+            save_bootstrap(ENV.PRIVATE_KEY, ENV.PROXY_WALLET, {
+                'chain_id': chain_id,
+                'is_proxy_safe': is_proxy_safe,
+                'signature_type': signature_type,
+                'api_creds': creds,
+            })
+        except OSError as e:
+            error(f'Failed to save CLOB bootstrap cache: {e}')
+
+    return clob_client
@@ -1,7 +1,6 @@
 """
 Fetch data from HTTP endpoints with retry logic
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import asyncio
 import httpx
 from typing import Any
@@ -1,33 +1,24 @@
 """
 Get USDC balance for an address
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
-from web3 import Web3
-from ..config.env import ENV
-
-
-USDC_ABI = [
-    {
-        "constant": True,
-        "inputs": [{"name": "owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "type": "function"
-    }
-]
+from typing import List, Dict
+from ..utils.onchain_reader import get_onchain_reader, format_units, RpcError
 
 
 async def get_my_balance_async(address: str) -> float:
     """Get USDC balance for an address (async)"""
-    w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
-    # Convert address to checksum format
-    checksum_address = Web3.to_checksum_address(address)
-    checksum_usdc_address = Web3.to_checksum_address(ENV.USDC_CONTRACT_ADDRESS)
-    usdc_contract = w3.eth.contract(address=checksum_usdc_address, abi=USDC_ABI)
-    balance_usdc = usdc_contract.functions.balanceOf(checksum_address).call()
+    balances = await get_onchain_reader().get_balances([address])
+    raw = balances.get(address.lower())
+    if raw is None:
+        raise RpcError(f'Failed to read USDC balance of {address}')
     # USDC has 6 decimals
-    balance_usdc_real = balance_usdc / 10**6
-    return float(balance_usdc_real)
+    return float(format_units(raw, 6))
+
+
+async def get_balances_async(addresses: List[str]) -> Dict[str, float]:
+    """Get USDC balances for many addresses in one RPC request (keys lowercase, failed reads omitted)"""
+    balances = await get_onchain_reader().get_balances(addresses)
+    return {address: float(format_units(raw, 6)) for address, raw in balances.items() if raw is not None}
 
 
 def get_my_balance(address: str) -> float:
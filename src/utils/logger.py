@@ -1,7 +1,6 @@
 """
 Logger utility with colored output and file logging
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
 import os
 import sys
 from datetime import datetime
@@ -0,0 +1,266 @@
+"""
+Batched on-chain reads over JSON-RPC
+
+Collects ERC-20 balances, allowances, decimals, contract code and chain status
+for any number of wallets/tokens/spenders and sends them as a single JSON-RPC
+batch request. Falls back to one request per call if the endpoint rejects
+batches. Reads only, so it needs no ABI tooling: calldata is built by hand.
+
+Works against any JSON-RPC endpoint (Polygon RPC, a local anvil/hardhat node);
+pass an httpx transport (e.g. httpx.MockTransport) to test against a stub.
+"""
+from typing import List, Dict, Any, Optional, Sequence
+
+import httpx
+
+from ..config.env import ENV
+
+# Polymarket contracts that spend collateral on behalf of the proxy wallet
+CTF_EXCHANGE = '0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E'
+NEG_RISK_CTF_EXCHANGE = '0xC5d563A36AE78145C45a50134d48A1215220f80a'
+NEG_RISK_ADAPTER = '0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296'
+POLYMARKET_SPENDERS = {
+    'CTF Exchange': CTF_EXCHANGE,
+    'NegRisk CTF Exchange': NEG_RISK_CTF_EXCHANGE,
+    'NegRisk Adapter': NEG_RISK_ADAPTER,
+}
+
+# ERC-20 function selectors
+BALANCE_OF_SELECTOR = '0x70a08231'
+ALLOWANCE_SELECTOR = '0xdd62ed3e'
+DECIMALS_SELECTOR = '0x313ce567'
+
+# Endpoints commonly cap batch size; larger batches are split
+MAX_BATCH_SIZE = 100
+# Rate limiting, not a rejection of batching; retried with a batch next time
+RETRYABLE_STATUS_CODES = {408, 425, 429}
+
+
+class RpcError(Exception):
+    """JSON-RPC call returned an error"""
+
+
+def _encode_address(address: str) -> str:
+    """ABI-encode an address as a 32-byte word (hex, no prefix)"""
+    return address.lower().replace('0x', '').rjust(64, '0')
+
+
+def _decode_uint(result: Optional[str]) -> Optional[int]:
+    """Decode a uint256 eth_call result (None if the target has no code)"""
+    if not result or result == '0x':
+        return None
+    return int(result, 16)
+
+
+def format_units(raw: Optional[int], decimals: int = 6) -> float:
+    """Convert a raw token amount to a float"""
+    return (raw or 0) / (10 ** decimals)
+
+
+class OnchainReader:
+    """Batched read-only JSON-RPC client"""
+
+    def __init__(
+        self,
+        rpc_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.rpc_url = rpc_url or ENV.RPC_URL
+        self.timeout = timeout if timeout is not None else ENV.REQUEST_TIMEOUT_MS / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.transport = transport
+        self.batch_supported = True
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+
+    async def batch(self, calls: Sequence[Dict[str, Any]]) -> List[Any]:
+        """
+        Execute [{'method': ..., 'params': [...]}, ...] in as few requests as possible
+
+        Returns results in call order; failed calls are returned as RpcError
+        instances instead of raising, so one bad read doesn't lose the rest.
+        """
+        if not calls:
+            return []
+
+        results: List[Any] = []
+        async with self._client() as client:
+            for start in range(0, len(calls), self.max_batch_size):
+                chunk = calls[start:start + self.max_batch_size]
+                results.extend(await self._send_chunk(client, chunk, start))
+        return results
+
+    async def _send_chunk(
+        self,
+        client: httpx.AsyncClient,
+        chunk: Sequence[Dict[str, Any]],
+        id_offset: int
+    ) -> List[Any]:
+        payload = [
+            {'jsonrpc': '2.0', 'id': id_offset + i, 'method': call['method'], 'params': call.get('params', [])}
+            for i, call in enumerate(chunk)
+        ]
+
+        if self.batch_supported and len(payload) > 1:
+            response = await client.post(self.rpc_url, json=payload)
+            if response.status_code in RETRYABLE_STATUS_CODES or response.is_server_error:
+                # Transient: fail this read and keep batching for the next one
+                response.raise_for_status()
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            if isinstance(data, list):
+                by_id = {item.get('id'): item for item in data}
+                return [self._unwrap(by_id.get(request['id'])) for request in payload]
+            if response.is_client_error or (isinstance(data, dict) and data.get('error')):
+                # The endpoint rejected the batch itself: use single calls from now on
+                self.batch_supported = False
+            # Anything else (e.g. a garbled body) falls back for this chunk only
+
+        results = []
+        for request in payload:
+            response = await client.post(self.rpc_url, json=request)
+            response.raise_for_status()
+            results.append(self._unwrap(response.json()))
+        return results
+
+    @staticmethod
+    def _unwrap(item: Optional[Dict[str, Any]]) -> Any:
+        if item is None:
+            return RpcError('Missing response')
+        if item.get('error'):
+            error = item['error']
+            return RpcError(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+        return item.get('result')
+
+    # ---- call builders ----
+
+    @staticmethod
+    def eth_call(to: str, data: str) -> Dict[str, Any]:
+        return {'method': 'eth_call', 'params': [{'to': to, 'data': data}, 'latest']}
+
+    @classmethod
+    def balance_of_call(cls, token: str, owner: str) -> Dict[str, Any]:
+        return cls.eth_call(token, BALANCE_OF_SELECTOR + _encode_address(owner))
+
+    @classmethod
+    def allowance_call(cls, token: str, owner: str, spender: str) -> Dict[str, Any]:
+        return cls.eth_call(token, ALLOWANCE_SELECTOR + _encode_address(owner) + _encode_address(spender))
+
+    @classmethod
+    def decimals_call(cls, token: str) -> Dict[str, Any]:
+        return cls.eth_call(token, DECIMALS_SELECTOR)
+
+    @staticmethod
+    def code_call(address: str) -> Dict[str, Any]:
+        return {'method': 'eth_getCode', 'params': [address, 'latest']}
+
+    # ---- high-level reads ----
+
+    async def read_wallets(
+        self,
+        wallets: Sequence[str],
+        tokens: Optional[Sequence[str]] = None,
+        spenders: Optional[Sequence[str]] = None,
+        include_code: bool = False,
+        include_chain: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Read balances, allowances and code for many wallets in one batch
+
+        Returns:
+            {
+                'chain_id': int | None, 'block_number': int | None,
+                'decimals': {token: int | None},
+                'wallets': {wallet: {
+                    'balances': {token: int | None},
+                    'allowances': {token: {spender: int | None}},
+                    'code': str | None,
+                }},
+                'errors': [str, ...],
+            }
+        Addresses are keyed in lowercase. Values are None when a read failed.
+        """
+        tokens = [t.lower() for t in (tokens or [ENV.USDC_CONTRACT_ADDRESS])]
+        spenders = [s.lower() for s in (spenders or [])]
+        wallets = [w.lower() for w in wallets]
+
+        calls: List[Dict[str, Any]] = []
+        slots: List[tuple] = []
+
+        def add(slot: tuple, call: Dict[str, Any]) -> None:
+            slots.append(slot)
+            calls.append(call)
+
+        if include_chain:
+            add(('chain_id',), {'method': 'eth_chainId', 'params': []})
+            add(('block_number',), {'method': 'eth_blockNumber', 'params': []})
+        for token in tokens:
+            add(('decimals', token), self.decimals_call(token))
+        for wallet in wallets:
+            for token in tokens:
+                add(('balance', wallet, token), self.balance_of_call(token, wallet))
+                for spender in spenders:
+                    add(('allowance', wallet, token, spender), self.allowance_call(token, wallet, spender))
+            if include_code:
+                add(('code', wallet), self.code_call(wallet))
+
+        raw_results = await self.batch(calls)
+
+        snapshot: Dict[str, Any] = {
+            'chain_id': None,
+            'block_number': None,
+            'decimals': {},
+            'wallets': {
+                wallet: {
+                    'balances': {},
+                    'allowances': {token: {} for token in tokens},
+                    'code': None,
+                }
+                for wallet in wallets
+            },
+            'errors': [],
+        }
+
+        for slot, result in zip(slots, raw_results):
+            if isinstance(result, RpcError):
+                snapshot['errors'].append(f"{' '.join(slot)}: {result}")
+                result = None
+            kind = slot[0]
+            if kind in ('chain_id', 'block_number'):
+                snapshot[kind] = int(result, 16) if result else None
+            elif kind == 'decimals':
+                snapshot['decimals'][slot[1]] = _decode_uint(result)
+            elif kind == 'balance':
+                snapshot['wallets'][slot[1]]['balances'][slot[2]] = _decode_uint(result)
+            elif kind == 'allowance':
+                snapshot['wallets'][slot[1]]['allowances'][slot[2]][slot[3]] = _decode_uint(result)
+            elif kind == 'code':
+                snapshot['wallets'][slot[1]]['code'] = result
+
+        return snapshot
+
+    async def get_balances(self, wallets: Sequence[str], token: Optional[str] = None) -> Dict[str, Optional[int]]:
+        """Raw token balances of many wallets (one request)"""
+        token = (token or ENV.USDC_CONTRACT_ADDRESS).lower()
+        results = await self.batch([self.balance_of_call(token, wallet) for wallet in wallets])
+        return {
+            wallet.lower(): None if isinstance(result, RpcError) else _decode_uint(result)
+            for wallet, result in zip(wallets, results)
+        }
+
+
+_readers: Dict[str, OnchainReader] = {}
+
+
+def get_onchain_reader(rpc_url: Optional[str] = None) -> OnchainReader:
+    """Get a shared reader for an RPC URL (defaults to ENV.RPC_URL)"""
+    url = rpc_url or ENV.RPC_URL
+    reader = _readers.get(url)
+    if reader is None:
+        reader = _readers[url] = OnchainReader(url)
+    return reader
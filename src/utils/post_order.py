@@ -1,12 +1,15 @@
 """
 Post order to Polymarket
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from ..config.env import ENV
 from ..models.user_history import get_user_activity_collection
 from ..utils.logger import info, warning, order_result
 from ..config.copy_strategy import calculate_order_size, get_trade_multiplier
+from ..utils.risk_metrics import record_live_fill, get_live_tracker
+from ..utils.volume_ledger import get_volume_ledger
+from ..services.portfolio_state import record_portfolio_fill
 
 RETRY_LIMIT = ENV.RETRY_LIMIT
 COPY_STRATEGY_CONFIG = ENV.COPY_STRATEGY_CONFIG
@@ -15,6 +18,13 @@ COPY_STRATEGY_CONFIG = ENV.COPY_STRATEGY_CONFIG
 MIN_ORDER_SIZE_USD = 1.0  # Minimum order size in USD for BUY orders
 MIN_ORDER_SIZE_TOKENS = 1.0  # Minimum order size in tokens for SELL/MERGE orders
 
+# Book levels signed and posted together per attempt
+MAX_SWEEP_LEVELS = max(1, ENV.MAX_SWEEP_LEVELS)
+
+# Sell ratios of recent trades (see get_sell_ratio)
+SELL_RATIO_CACHE_SIZE = 1024
+_sell_ratio_cache: 'OrderedDict[Tuple[str, str, str], float]' = OrderedDict()
+
 
 def extract_order_error(response: Any) -> Optional[str]:
     """Extract error message from order response"""
@@ -45,6 +55,27 @@ def extract_order_error(response: Any) -> Optional[str]:
     return None
 
 
+def filled_amounts(response: Dict[str, Any], order_args: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    (USDC, tokens) a successful order actually filled
+
+    Read from the response's makingAmount/takingAmount (a BUY makes USDC and
+    takes tokens, a SELL the reverse), since a marketable order can fill at
+    better prices than its limit. Falls back to the order's own amount and
+    price when the response doesn't report them.
+    """
+    try:
+        making = float(response.get('makingAmount') or 0)
+        taking = float(response.get('takingAmount') or 0)
+    except (TypeError, ValueError):
+        making = taking = 0.0
+    if making > 0 and taking > 0:
+        return (making, taking) if order_args['side'] == 'BUY' else (taking, making)
+    if order_args['side'] == 'BUY':
+        return order_args['amount'], order_args['amount'] / order_args['price']
+    return order_args['amount'] * order_args['price'], order_args['amount']
+
+
 def is_insufficient_balance_or_allowance_error(message: Optional[str]) -> bool:
     """Check if error is related to insufficient balance or allowance"""
     if not message:
@@ -53,6 +84,275 @@ def is_insufficient_balance_or_allowance_error(message: Optional[str]) -> bool:
     return 'not enough balance' in lower or 'allowance' in lower
 
 
+async def execute_buy_sweep(
+    clob_client: Any,
+    asset: str,
+    amount: float,
+    available_balance: float,
+    condition_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Buy up to `amount` USDC of an asset, sweeping the best ask levels
+
+    Each attempt signs one FOK order per ask level (up to MAX_SWEEP_LEVELS) and
+    posts them in one batch request. The batch is best-effort, not atomic: each
+    order fills or is killed on its own, and unfilled amounts are retried
+    against a fresh book. Fills are accounted from the amounts the CLOB
+    reports (filled_amounts). An attempt where every order fails counts
+    against RETRY_LIMIT; any fill resets the retry count.
+
+    Returns:
+        {'spent': USDC filled, 'tokens': shares bought, 'retry': failed attempts,
+         'abort_due_to_funds': bool}
+    """
+    remaining = amount
+    spent = 0.0
+    tokens = 0.0
+    retry = 0
+    abort_due_to_funds = False
+    
+    while remaining > 0 and retry < RETRY_LIMIT:
+        try:
+            order_book = await clob_client.get_order_book(asset)
+            asks = sorted(order_book.get('asks') or [], key=lambda x: float(x['price']))
+            if not asks:
+                warning('No asks available in order book')
+                break
+            
+            info(f'Best ask: {asks[0]["size"]} @ ${asks[0]["price"]}')
+            
+            # Check if remaining amount is below minimum before creating orders
+            if remaining < MIN_ORDER_SIZE_USD:
+                info(f'Remaining amount (${remaining:.2f}) below minimum - completing trade')
+                break
+            
+            # One order per level, each sized to the level's liquidity
+            orders_args = []
+            to_place = remaining
+            balance_left = available_balance
+            for level in asks[:MAX_SWEEP_LEVELS]:
+                price = float(level['price'])
+                order_size = min(to_place, float(level['size']) * price)
+                if order_size < MIN_ORDER_SIZE_USD or balance_left < order_size:
+                    break
+                orders_args.append({'side': 'BUY', 'tokenID': asset, 'amount': order_size, 'price': price})
+                to_place -= order_size
+                balance_left -= order_size
+                if to_place < MIN_ORDER_SIZE_USD:
+                    break
+            
+            if not orders_args:
+                order_size = min(remaining, float(asks[0]['size']) * float(asks[0]['price']))
+                if order_size < MIN_ORDER_SIZE_USD:
+                    info(f'Order size (${order_size:.2f}) below minimum (${MIN_ORDER_SIZE_USD}) - completing trade')
+                else:
+                    warning(f'Insufficient balance: Need ${order_size:.2f} but only have ${available_balance:.2f}')
+                    abort_due_to_funds = True
+                break
+            
+            for order_args in orders_args:
+                info(f'Creating order: ${order_args["amount"]:.2f} @ ${order_args["price"]} (Balance: ${available_balance:.2f})')
+            
+            signed_orders = await clob_client.create_market_orders(orders_args)
+            responses = await clob_client.post_orders(signed_orders, 'FOK')
+            
+            filled_any = False
+            failures = []
+            for order_args, resp in zip(orders_args, responses):
+                if resp.get('success') is True:
+                    filled_any = True
+                    usd_spent, tokens_bought = filled_amounts(resp, order_args)
+                    fill_price = usd_spent / tokens_bought
+                    order_result(
+                        True,
+                        f'Bought ${usd_spent:.2f} at ${fill_price:.4f} ({tokens_bought:.2f} tokens)'
+                    )
+                    spent += usd_spent
+                    tokens += tokens_bought
+                    remaining -= usd_spent
+                    record_live_fill(asset, 'BUY', tokens_bought, fill_price)
+                    record_portfolio_fill(asset, 'BUY', tokens_bought, fill_price, condition_id)
+                    # Update balance after successful order
+                    available_balance -= usd_spent
+                else:
+                    error_message = extract_order_error(resp)
+                    if is_insufficient_balance_or_allowance_error(error_message):
+                        abort_due_to_funds = True
+                        warning(f'Order rejected: {error_message or "Insufficient balance or allowance"}')
+                    elif error_message:
+                        failures.append(error_message)
+            
+            if abort_due_to_funds:
+                warning('Skipping remaining attempts. Top up funds or check allowance before retrying.')
+                break
+            
+            if filled_any:
+                retry = 0
+                if failures:
+                    warning(f'{len(failures)} of {len(orders_args)} orders failed - {failures[0]}')
+            else:
+                retry += 1
+                warning(f'Order failed (attempt {retry}/{RETRY_LIMIT}){f" - {failures[0]}" if failures else ""}')
+        except Exception as e:
+            retry += 1
+            warning(f'Order error (attempt {retry}/{RETRY_LIMIT}): {e}')
+    
+    return {'spent': spent, 'tokens': tokens, 'retry': retry, 'abort_due_to_funds': abort_due_to_funds}
+
+
+async def execute_sell_sweep(
+    clob_client: Any,
+    asset: str,
+    shares: float,
+    condition_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Sell up to `shares` tokens of an asset, sweeping the best bid levels
+
+    Same batching and retry rules as execute_buy_sweep.
+
+    Returns:
+        {'sold': shares sold, 'proceeds': USDC received, 'retry': failed attempts,
+         'abort_due_to_funds': bool}
+    """
+    remaining = shares
+    sold = 0.0
+    proceeds = 0.0
+    retry = 0
+    abort_due_to_funds = False
+    
+    while remaining > 0 and retry < RETRY_LIMIT:
+        try:
+            order_book = await clob_client.get_order_book(asset)
+            bids = sorted(order_book.get('bids') or [], key=lambda x: float(x['price']), reverse=True)
+            if not bids:
+                warning('No bids available in order book')
+                break
+            
+            info(f'Best bid: {bids[0]["size"]} @ ${bids[0]["price"]}')
+            
+            if remaining < MIN_ORDER_SIZE_TOKENS:
+                info(f'Remaining size ({remaining:.2f} tokens) below minimum - completing trade')
+                break
+            
+            # One order per level; a level smaller than the minimum order is merged
+            # into the next one (sold at the lower price, which fills both)
+            orders_args = []
+            to_place = remaining
+            depth = 0.0
+            for level in bids:
+                depth += float(level['size'])
+                size = min(to_place, depth)
+                if size < MIN_ORDER_SIZE_TOKENS:
+                    continue
+                orders_args.append({'side': 'SELL', 'tokenID': asset, 'amount': size, 'price': float(level['price'])})
+                depth = 0.0
+                to_place -= size
+                if to_place < MIN_ORDER_SIZE_TOKENS or len(orders_args) >= MAX_SWEEP_LEVELS:
+                    break
+            
+            if not orders_args:
+                warning(f'Bid depth below minimum order size ({MIN_ORDER_SIZE_TOKENS} tokens)')
+                break
+            
+            signed_orders = await clob_client.create_market_orders(orders_args)
+            responses = await clob_client.post_orders(signed_orders, 'FOK')
+            
+            filled_any = False
+            failures = []
+            for order_args, resp in zip(orders_args, responses):
+                if resp.get('success') is True:
+                    filled_any = True
+                    usd_received, tokens_sold = filled_amounts(resp, order_args)
+                    fill_price = usd_received / tokens_sold
+                    order_result(True, f'Sold {tokens_sold:.2f} tokens at ${fill_price:.4f}')
+                    sold += tokens_sold
+                    proceeds += usd_received
+                    remaining -= tokens_sold
+                    closed_pnl = record_live_fill(asset, 'SELL', tokens_sold, fill_price)
+                    record_portfolio_fill(asset, 'SELL', tokens_sold, fill_price, condition_id)
+                    if closed_pnl is not None:
+                        tracker = get_live_tracker()
+                        info(f'Position closed: P&L ${closed_pnl:.2f} (session win rate {tracker.win_rate:.1f}% over {tracker.closed_positions})')
+                else:
+                    error_message = extract_order_error(resp)
+                    if is_insufficient_balance_or_allowance_error(error_message):
+                        abort_due_to_funds = True
+                        warning(f'Order rejected: {error_message or "Insufficient balance or allowance"}')
+                    elif error_message:
+                        failures.append(error_message)
+            
+            if abort_due_to_funds:
+                warning('Skipping remaining attempts. Top up funds or check allowance before retrying.')
+                break
+            
+            if filled_any:
+                retry = 0
+                if failures:
+                    warning(f'{len(failures)} of {len(orders_args)} orders failed - {failures[0]}')
+            else:
+                retry += 1
+                warning(f'Order failed (attempt {retry}/{RETRY_LIMIT}){f" - {failures[0]}" if failures else ""}')
+        except Exception as e:
+            retry += 1
+            warning(f'Order error (attempt {retry}/{RETRY_LIMIT}): {e}')
+    
+    return {'sold': sold, 'proceeds': proceeds, 'retry': retry, 'abort_due_to_funds': abort_due_to_funds}
+
+
+def _sell_ratio_key(trade: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        str(trade.get('userAddress') or trade.get('proxyWallet') or '').lower(),
+        str(trade.get('asset', '')),
+        str(trade.get('transactionHash') or trade.get('timestamp') or trade.get('_id', '')),
+    )
+
+
+def get_sell_ratio(trade: Dict[str, Any], user_position: Optional[Dict[str, Any]]) -> float:
+    """
+    Fraction of their position the trader sold in this trade
+
+    ratio = sold / size before, using the pre-trade size the monitor stored
+    with the trade (traderPositionBefore). Without it, falls back to
+    sold / (size after + sold) from the data-api position, which understates
+    the ratio while that snapshot still predates the sell. The first result
+    per trade is cached: the trader's position may change again before a
+    retry or a netted execution, which would otherwise change the ratio of
+    the same trade.
+    """
+    key = _sell_ratio_key(trade)
+    ratio = _sell_ratio_cache.get(key)
+    if ratio is not None:
+        _sell_ratio_cache.move_to_end(key)
+        return ratio
+    
+    trader_sold = float(trade.get('size', 0) or 0)
+    trader_before = float(trade.get('traderPositionBefore', 0) or 0)
+    if trader_sold <= 0:
+        ratio = 0.0
+    elif trader_before > 0:
+        ratio = min(1.0, trader_sold / trader_before)
+    else:
+        trader_after = float(user_position.get('size', 0) or 0) if user_position else 0.0
+        ratio = min(1.0, trader_sold / (trader_after + trader_sold))
+    
+    _sell_ratio_cache[key] = ratio
+    if len(_sell_ratio_cache) > SELL_RATIO_CACHE_SIZE:
+        _sell_ratio_cache.popitem(last=False)
+    return ratio
+
+
+def calculate_sell_size(
+    my_position: Optional[Dict[str, Any]],
+    user_position: Optional[Dict[str, Any]],
+    trade: Dict[str, Any]
+) -> float:
+    """Shares to sell: our position scaled by the fraction of theirs the trader just sold"""
+    if not my_position:
+        return 0.0
+    return float(my_position.get('size', 0) or 0) * get_sell_ratio(trade, user_position)
+
+
 async def post_order(
     clob_client: Any,
     condition: str,
@@ -81,67 +381,19 @@ async def post_order(
             collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
             return
         
-        retry = 0
-        abort_due_to_funds = False
-        
-        while remaining > 0 and retry < RETRY_LIMIT:
-            try:
-                order_book = await clob_client.get_order_book(trade['asset'])
-                if not order_book.get('bids') or len(order_book['bids']) == 0:
-                    warning('No bids available in order book')
-                    collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
-                    break
-                
-                max_price_bid = max(order_book['bids'], key=lambda x: float(x['price']))
-                
-                info(f'Best bid: {max_price_bid["size"]} @ ${max_price_bid["price"]}')
-                
-                if remaining <= float(max_price_bid['size']):
-                    order_args = {
-                        'side': 'SELL',
-                        'tokenID': my_position['asset'],
-                        'amount': remaining,
-                        'price': float(max_price_bid['price']),
-                    }
-                else:
-                    order_args = {
-                        'side': 'SELL',
-                        'tokenID': my_position['asset'],
-                        'amount': float(max_price_bid['size']),
-                        'price': float(max_price_bid['price']),
-                    }
-                
-                signed_order = await clob_client.create_market_order(order_args)
-                resp = await clob_client.post_order(signed_order, 'FOK')
-                
-                if resp.get('success') is True:
-                    retry = 0
-                    order_result(True, f'Sold {order_args["amount"]} tokens at ${order_args["price"]}')
-                    remaining -= order_args['amount']
-                else:
-                    error_message = extract_order_error(resp)
-                    if is_insufficient_balance_or_allowance_error(error_message):
-                        abort_due_to_funds = True
-                        warning(f'Order rejected: {error_message or "Insufficient balance or allowance"}')
-                        warning('Skipping remaining attempts. Top up funds or check allowance before retrying.')
-                        break
-                    retry += 1
-                    warning(f'Order failed (attempt {retry}/{RETRY_LIMIT}){f" - {error_message}" if error_message else ""}')
-            except Exception as e:
-                retry += 1
-                warning(f'Order error (attempt {retry}/{RETRY_LIMIT}): {e}')
+        sweep = await execute_sell_sweep(clob_client, my_position['asset'], remaining, trade.get('conditionId'))
         
-        if abort_due_to_funds:
+        if sweep['abort_due_to_funds']:
             collection.update_one(
                 {'_id': trade['_id']},
                 {'$set': {'bot': True, 'botExcutedTime': RETRY_LIMIT}}
             )
             return
         
-        if retry >= RETRY_LIMIT:
+        if sweep['retry'] >= RETRY_LIMIT:
             collection.update_one(
                 {'_id': trade['_id']},
-                {'$set': {'bot': True, 'botExcutedTime': retry}}
+                {'$set': {'bot': True, 'botExcutedTime': sweep['retry']}}
             )
         else:
             collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
@@ -160,7 +412,9 @@ async def post_order(
             COPY_STRATEGY_CONFIG,
             trade.get('usdcSize', 0),
             my_balance,
-            current_position_value
+            current_position_value,
+            user_address,
+            trade.get('conditionId')
         )
         
         # Log the calculation reasoning
@@ -174,110 +428,69 @@ async def post_order(
             collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
             return
         
-        remaining = order_calc.final_amount
-        available_balance = my_balance  # Track remaining balance after orders
-        
-        retry = 0
-        abort_due_to_funds = False
-        total_bought_tokens = 0  # Track total tokens bought for this trade
-        
-        while remaining > 0 and retry < RETRY_LIMIT:
-            try:
-                order_book = await clob_client.get_order_book(trade['asset'])
-                if not order_book.get('asks') or len(order_book['asks']) == 0:
-                    warning('No asks available in order book')
-                    collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
-                    break
-                
-                min_price_ask = min(order_book['asks'], key=lambda x: float(x['price']))
-                
-                info(f'Best ask: {min_price_ask["size"]} @ ${min_price_ask["price"]}')
-                
-                # Check if remaining amount is below minimum before creating order
-                if remaining < MIN_ORDER_SIZE_USD:
-                    info(f'Remaining amount (${remaining:.2f}) below minimum - completing trade')
-                    collection.update_one(
-                        {'_id': trade['_id']},
-                        {'$set': {'bot': True, 'myBoughtSize': total_bought_tokens}}
-                    )
-                    break
-                
-                max_order_size = float(min_price_ask['size']) * float(min_price_ask['price'])
-                order_size = min(remaining, max_order_size)
-                
-                # Ensure minimum order size is 1 USDC
-                if order_size < MIN_ORDER_SIZE_USD:
-                    info(f'Order size (${order_size:.2f}) below minimum (${MIN_ORDER_SIZE_USD}) - completing trade')
-                    collection.update_one(
-                        {'_id': trade['_id']},
-                        {'$set': {'bot': True, 'myBoughtSize': total_bought_tokens}}
-                    )
-                    break
-                
-                # Check if balance is sufficient for the order
-                if available_balance < order_size:
-                    warning(f'Insufficient balance: Need ${order_size:.2f} but only have ${available_balance:.2f}')
-                    abort_due_to_funds = True
-                    break
-                
-                order_args = {
-                    'side': 'BUY',
-                    'tokenID': trade['asset'],
-                    'amount': order_size,
-                    'price': float(min_price_ask['price']),
-                }
-                
-                info(f'Creating order: ${order_size:.2f} @ ${min_price_ask["price"]} (Balance: ${available_balance:.2f})')
-                
-                signed_order = await clob_client.create_market_order(order_args)
-                resp = await clob_client.post_order(signed_order, 'FOK')
-                
-                if resp.get('success') is True:
-                    retry = 0
-                    tokens_bought = order_args['amount'] / order_args['price']
-                    total_bought_tokens += tokens_bought
-                    order_result(
-                        True,
-                        f'Bought ${order_args["amount"]:.2f} at ${order_args["price"]} ({tokens_bought:.2f} tokens)'
-                    )
-                    remaining -= order_args['amount']
-                    # Update balance after successful order
-                    available_balance -= order_args['amount']
-                else:
-                    error_message = extract_order_error(resp)
-                    if is_insufficient_balance_or_allowance_error(error_message):
-                        abort_due_to_funds = True
-                        warning(f'Order rejected: {error_message or "Insufficient balance or allowance"}')
-                        warning('Skipping remaining attempts. Top up funds or check allowance before retrying.')
-                        break
-                    retry += 1
-                    warning(f'Order failed (attempt {retry}/{RETRY_LIMIT}){f" - {error_message}" if error_message else ""}')
-            except Exception as e:
-                retry += 1
-                warning(f'Order error (attempt {retry}/{RETRY_LIMIT}): {e}')
+        sweep = await execute_buy_sweep(
+            clob_client, trade['asset'], order_calc.final_amount, my_balance, trade.get('conditionId')
+        )
+        get_volume_ledger().add(sweep['spent'], user_address, trade.get('conditionId'))
         
-        if abort_due_to_funds:
+        if sweep['abort_due_to_funds']:
             collection.update_one(
                 {'_id': trade['_id']},
                 {'$set': {'bot': True, 'botExcutedTime': RETRY_LIMIT}}
             )
             return
         
-        if retry >= RETRY_LIMIT:
+        if sweep['retry'] >= RETRY_LIMIT:
             collection.update_one(
                 {'_id': trade['_id']},
-                {'$set': {'bot': True, 'botExcutedTime': retry}}
+                {'$set': {'bot': True, 'botExcutedTime': sweep['retry']}}
             )
         else:
             collection.update_one(
                 {'_id': trade['_id']},
-                {'$set': {'bot': True, 'myBoughtSize': total_bought_tokens}}
+                {'$set': {'bot': True, 'myBoughtSize': sweep['tokens']}}
             )
     
     elif condition == 'sell':
-        # SELL strategy - similar to merge but different logic
         info('Executing SELL strategy...')
-        # Implementation similar to merge but for selling positions
-        # This would be implemented based on the full TypeScript version
-        collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
-
+        if not my_position:
+            warning('No position to sell')
+            collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
+            return
+        
+        my_size = float(my_position.get('size', 0) or 0)
+        ratio = get_sell_ratio(trade, user_position)
+        sell_size = my_size * ratio
+        
+        info(
+            f'Trader sold {float(trade.get("size", 0) or 0):.2f} tokens ({ratio * 100:.1f}% of their position) '
+            f'- selling {sell_size:.2f} of your {my_size:.2f} tokens'
+        )
+        
+        # Check minimum order size
+        if sell_size < MIN_ORDER_SIZE_TOKENS:
+            warning(f'Sell size ({sell_size:.2f} tokens) too small to sell - skipping')
+            collection.update_one({'_id': trade['_id']}, {'$set': {'bot': True}})
+            return
+        
+        sweep = await execute_sell_sweep(
+            clob_client, my_position.get('asset') or trade['asset'], sell_size, trade.get('conditionId')
+        )
+        
+        if sweep['abort_due_to_funds']:
+            collection.update_one(
+                {'_id': trade['_id']},
+                {'$set': {'bot': True, 'botExcutedTime': RETRY_LIMIT, 'mySoldSize': sweep['sold']}}
+            )
+            return
+        
+        if sweep['retry'] >= RETRY_LIMIT:
+            collection.update_one(
+                {'_id': trade['_id']},
+                {'$set': {'bot': True, 'botExcutedTime': sweep['retry'], 'mySoldSize': sweep['sold']}}
+            )
+        else:
+            collection.update_one(
+                {'_id': trade['_id']},
+                {'$set': {'bot': True, 'mySoldSize': sweep['sold']}}
+            )
@@ -0,0 +1,199 @@
+"""
+Historical price timeline cache
+
+Keeps the last traded price per asset by timestamp, built from the trade
+histories the research and simulation scripts already download. Lookups are
+O(log n) (bisect), so equity curves can be marked to market at any resolution
+without extra network calls.
+"""
+import json
+from bisect import bisect_right, insort
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+# Default on-disk location (relative to the project root)
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent.parent / 'price_timeline_cache' / 'timelines.json'
+
+
+def normalize_timestamp(timestamp: Any) -> int:
+    """Normalize a trade timestamp to seconds (RTDS may send milliseconds)"""
+    ts = int(float(timestamp or 0))
+    return ts // 1000 if ts > 1000000000000 else ts
+
+
+class PriceTimeline:
+    """Last traded price of one asset over time"""
+    __slots__ = ('timestamps', 'prices')
+
+    def __init__(self):
+        self.timestamps: List[int] = []
+        self.prices: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def add(self, timestamp: int, price: float) -> None:
+        """Record a trade price (appends in O(1) when trades arrive in order)"""
+        if not self.timestamps or timestamp > self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.prices.append(price)
+            return
+
+        index = bisect_right(self.timestamps, timestamp)
+        if index > 0 and self.timestamps[index - 1] == timestamp:
+            # Same second: the later-seen trade wins
+            self.prices[index - 1] = price
+            return
+
+        insort(self.timestamps, timestamp)
+        self.prices.insert(index, price)
+
+    def price_at(self, timestamp: int) -> Optional[float]:
+        """Last traded price at or before timestamp (None if no trade yet)"""
+        index = bisect_right(self.timestamps, timestamp) - 1
+        return self.prices[index] if index >= 0 else None
+
+    def latest(self) -> Optional[float]:
+        """Most recent traded price"""
+        return self.prices[-1] if self.prices else None
+
+    def to_list(self) -> List[Tuple[int, float]]:
+        """Serialize as [(timestamp, price), ...]"""
+        return list(zip(self.timestamps, self.prices))
+
+
+class PriceTimelineStore:
+    """Per-asset price timelines with point-in-time lookup"""
+
+    def __init__(self):
+        self.timelines: Dict[str, PriceTimeline] = {}
+
+    def __len__(self) -> int:
+        return len(self.timelines)
+
+    def __contains__(self, asset: str) -> bool:
+        return asset in self.timelines
+
+    def add_price(self, asset: str, timestamp: Any, price: Any) -> None:
+        """Record a single observed price"""
+        try:
+            price_val = float(price)
+        except (TypeError, ValueError):
+            return
+        if not asset or price_val <= 0:
+            return
+
+        timeline = self.timelines.get(asset)
+        if timeline is None:
+            timeline = self.timelines[asset] = PriceTimeline()
+        timeline.add(normalize_timestamp(timestamp), price_val)
+
+    def add_trade(self, trade: Dict[str, Any]) -> None:
+        """Record the price of a data-api / RTDS trade dict"""
+        self.add_price(trade.get('asset', ''), trade.get('timestamp', 0), trade.get('price', 0))
+
+    def add_trades(self, trades: Iterable[Dict[str, Any]]) -> None:
+        """Record prices from a list of trades (sorting first keeps appends O(1))"""
+        for trade in sorted(trades, key=lambda t: normalize_timestamp(t.get('timestamp', 0))):
+            self.add_trade(trade)
+
+    def timeline(self, asset: str) -> Optional[PriceTimeline]:
+        """Get the timeline for an asset"""
+        return self.timelines.get(asset)
+
+    def price_at(self, asset: str, timestamp: Any, default: Optional[float] = None) -> Optional[float]:
+        """Last traded price of asset at or before timestamp"""
+        timeline = self.timelines.get(asset)
+        if timeline is None:
+            return default
+        price = timeline.price_at(normalize_timestamp(timestamp))
+        return default if price is None else price
+
+    def latest_price(self, asset: str, default: Optional[float] = None) -> Optional[float]:
+        """Most recent traded price of asset"""
+        timeline = self.timelines.get(asset)
+        if timeline is None or not len(timeline):
+            return default
+        return timeline.latest()
+
+    def latest_prices(self) -> Dict[str, float]:
+        """Most recent traded price of every asset"""
+        return {asset: tl.latest() for asset, tl in self.timelines.items() if len(tl)}
+
+    def value_holdings(
+        self,
+        holdings: Dict[str, float],
+        timestamp: Any,
+        fallback_prices: Optional[Dict[str, float]] = None
+    ) -> float:
+        """Mark a {asset: shares} portfolio to market at timestamp"""
+        ts = normalize_timestamp(timestamp)
+        fallback_prices = fallback_prices or {}
+        total = 0.0
+        for asset, shares in holdings.items():
+            if shares <= 0:
+                continue
+            price = self.price_at(asset, ts, fallback_prices.get(asset))
+            if price is not None:
+                total += shares * price
+        return total
+
+    def save(self, path: Path = DEFAULT_CACHE_FILE) -> None:
+        """Persist all timelines to a JSON file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {asset: tl.to_list() for asset, tl in self.timelines.items()}
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        tmp_path.replace(path)
+
+    def merge_file(self, path: Path = DEFAULT_CACHE_FILE) -> bool:
+        """Merge timelines from a JSON file written by save()"""
+        if not path.exists():
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for asset, points in payload.items():
+            for timestamp, price in points:
+                self.add_price(asset, timestamp, price)
+        return True
+
+    def merge_trade_cache(self, cache_dir: Path) -> int:
+        """Merge prices from fetch_historical_trades cache files, returns files read"""
+        if not cache_dir.exists():
+            return 0
+
+        files_read = 0
+        for cache_file in cache_dir.glob('*.json'):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            trades = data.get('trades') if isinstance(data, dict) else None
+            if isinstance(trades, list):
+                self.add_trades(trades)
+                files_read += 1
+        return files_read
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_CACHE_FILE) -> 'PriceTimelineStore':
+        """Load a store from disk (empty store if the file is missing)"""
+        store = cls()
+        store.merge_file(path)
+        return store
+
+
+_shared_store: Optional[PriceTimelineStore] = None
+
+
+def get_price_store() -> PriceTimelineStore:
+    """Get the process-wide store, loaded from the on-disk cache on first use"""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = PriceTimelineStore.load()
+    return _shared_store
@@ -0,0 +1,188 @@
+"""
+Indexed store for trader analysis and simulation results
+
+One SQLite table (stdlib sqlite3, no server) shared by the research and
+simulation scripts. Each row is one trader scored by one source under one
+configuration, tagged with the last trade seen when it was computed so callers
+can tell whether the trader's history has changed since.
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+DEFAULT_DB_FILE = Path(__file__).parent.parent.parent / 'results_store' / 'results.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trader_results (
+    source TEXT NOT NULL,
+    address TEXT NOT NULL,
+    history_days INTEGER NOT NULL,
+    config_key TEXT NOT NULL DEFAULT '',
+    multiplier REAL NOT NULL DEFAULT 1.0,
+    last_trade_key TEXT NOT NULL DEFAULT '',
+    total_trades INTEGER NOT NULL DEFAULT 0,
+    roi REAL,
+    total_pnl REAL,
+    win_rate REAL,
+    error TEXT,
+    computed_at INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (source, address, history_days, config_key)
+);
+CREATE INDEX IF NOT EXISTS idx_results_address ON trader_results (address);
+CREATE INDEX IF NOT EXISTS idx_results_source_roi ON trader_results (source, roi DESC);
+CREATE INDEX IF NOT EXISTS idx_results_strategy ON trader_results (history_days, multiplier);
+"""
+
+# Columns that can be used in query(order_by=...)
+_ORDER_COLUMNS = {'roi', 'total_pnl', 'win_rate', 'total_trades', 'computed_at'}
+
+
+def make_last_trade_key(trade: Optional[Dict[str, Any]]) -> str:
+    """Identify a trader's most recent trade (timestamp + transaction hash)"""
+    if not trade:
+        return ''
+    return f"{int(trade.get('timestamp', 0) or 0)}:{trade.get('transactionHash', '')}"
+
+
+class ResultsStore:
+    """SQLite-backed per-trader results"""
+
+    def __init__(self, path: Path = DEFAULT_DB_FILE):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def get(
+        self,
+        source: str,
+        address: str,
+        history_days: int,
+        config_key: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """Get one stored row (None if missing)"""
+        row = self._conn.execute(
+            'SELECT * FROM trader_results WHERE source = ? AND address = ? AND history_days = ? AND config_key = ?',
+            (source, address.lower(), history_days, config_key)
+        ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def get_fresh(
+        self,
+        source: str,
+        address: str,
+        history_days: int,
+        last_trade_key: str,
+        config_key: str = ''
+    ) -> Optional[Dict[str, Any]]:
+        """Get a stored result if it was computed at the same last trade"""
+        row = self.get(source, address, history_days, config_key)
+        if row and last_trade_key and row['last_trade_key'] == last_trade_key:
+            return row['result']
+        return None
+
+    def put(
+        self,
+        source: str,
+        address: str,
+        history_days: int,
+        result: Dict[str, Any],
+        last_trade_key: str = '',
+        config_key: str = '',
+        multiplier: float = 1.0
+    ) -> None:
+        """Insert or replace a trader's result"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO trader_results '
+            '(source, address, history_days, config_key, multiplier, last_trade_key, total_trades, '
+            'roi, total_pnl, win_rate, error, computed_at, result) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                source,
+                address.lower(),
+                history_days,
+                config_key,
+                multiplier,
+                last_trade_key,
+                int(result.get('total_trades', 0) or 0),
+                result.get('roi'),
+                result.get('total_pnl'),
+                result.get('win_rate'),
+                result.get('error'),
+                int(datetime.now().timestamp()),
+                json.dumps(result, default=str),
+            )
+        )
+        self._conn.commit()
+
+    def query(
+        self,
+        source: Optional[str] = None,
+        address: Optional[str] = None,
+        history_days: Optional[int] = None,
+        min_roi: Optional[float] = None,
+        include_errors: bool = False,
+        order_by: str = 'roi',
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Query rows, best first"""
+        if order_by not in _ORDER_COLUMNS:
+            raise ValueError(f'Cannot order by {order_by}')
+
+        clauses = []
+        params: List[Any] = []
+        if source is not None:
+            clauses.append('source = ?')
+            params.append(source)
+        if address is not None:
+            clauses.append('address = ?')
+            params.append(address.lower())
+        if history_days is not None:
+            clauses.append('history_days = ?')
+            params.append(history_days)
+        if min_roi is not None:
+            clauses.append('roi >= ?')
+            params.append(min_roi)
+        if not include_errors:
+            clauses.append('error IS NULL')
+
+        sql = 'SELECT * FROM trader_results'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f' ORDER BY {order_by} DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        return [self._row_to_dict(row) for row in self._conn.execute(sql, params)]
+
+    def sources(self) -> List[str]:
+        """Distinct result sources"""
+        return [row[0] for row in self._conn.execute('SELECT DISTINCT source FROM trader_results ORDER BY source')]
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data['result'] = json.loads(data['result'])
+        return data
+
+
+def open_results_store(path: Optional[Path] = None) -> Optional[ResultsStore]:
+    """Open the store for reading (None if it has not been created yet)"""
+    path = path or DEFAULT_DB_FILE
+    if not path.exists():
+        return None
+    return ResultsStore(path)
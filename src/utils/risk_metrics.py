@@ -0,0 +1,321 @@
+"""
+Equity-curve and risk metrics
+
+Two flavours of the same metrics:
+- Online accumulators (RunningStats, DrawdownTracker, PositionOutcomeTracker,
+  EquityMetrics) that update in O(1) per point/fill, for streaming use and for
+  the live bot
+- NumPy batch functions over a full equity series, for research/simulation scripts
+
+Conventions match the original find_low_risk_traders calculations: returns are
+per-point percentage changes, variance is the population variance, and Sharpe
+and volatility are annualized with sqrt(365).
+"""
+import math
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ANNUALIZATION_FACTOR = math.sqrt(365)
+# Positions with fewer shares than this are considered closed
+DUST_SHARES = 0.001
+# Win rate reported when no position closed (neither good nor bad for scoring)
+NEUTRAL_WIN_RATE = 50.0
+
+EquityInput = Union[Sequence[float], Sequence[Tuple[int, float]], 'np.ndarray']
+
+
+class RunningStats:
+    """Welford's online mean/variance"""
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        """Add one observation"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Population variance"""
+        return self._m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation"""
+        variance = self.variance
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class DrawdownTracker:
+    """Running peak and maximum drawdown"""
+    __slots__ = ('peak', 'max_drawdown', 'max_drawdown_amount', 'current_drawdown')
+
+    def __init__(self):
+        self.peak: Optional[float] = None
+        self.max_drawdown = 0.0
+        self.max_drawdown_amount = 0.0
+        self.current_drawdown = 0.0
+
+    def update(self, equity: float) -> None:
+        """Add one equity observation"""
+        if self.peak is None or equity > self.peak:
+            self.peak = equity
+
+        self.current_drawdown = ((self.peak - equity) / self.peak) * 100 if self.peak > 0 else 0.0
+        if self.current_drawdown > self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+            self.max_drawdown_amount = self.peak - equity
+
+
+class PositionOutcomeTracker:
+    """
+    Per-position realized P&L and win/loss counts
+
+    A position is opened by the first BUY of an asset and closed when its
+    shares drop to dust; its outcome is the sum of P&L realized over that
+    lifetime (average-cost basis).
+    """
+
+    def __init__(self):
+        self.open_positions: Dict[str, Dict[str, float]] = {}
+        self.wins = 0
+        self.losses = 0
+        self.realized_pnl = 0.0
+
+    def record_fill(self, asset: str, side: str, size: float, price: float) -> Optional[float]:
+        """Record a fill (size in shares), returns the position's P&L if it closed"""
+        if not asset or size <= 0 or price <= 0:
+            return None
+
+        side = side.upper()
+        pos = self.open_positions.get(asset)
+
+        if side == 'BUY':
+            if pos is None:
+                pos = self.open_positions[asset] = {'shares': 0.0, 'cost': 0.0, 'pnl': 0.0}
+            pos['shares'] += size
+            pos['cost'] += size * price
+            return None
+
+        if side != 'SELL' or pos is None or pos['shares'] <= 0:
+            return None
+
+        sold = min(size, pos['shares'])
+        avg_price = pos['cost'] / pos['shares']
+        pnl = sold * (price - avg_price)
+        pos['pnl'] += pnl
+        pos['cost'] -= sold * avg_price
+        pos['shares'] -= sold
+        self.realized_pnl += pnl
+
+        if pos['shares'] > DUST_SHARES:
+            return None
+
+        del self.open_positions[asset]
+        if pos['pnl'] > 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+        return pos['pnl']
+
+    def record_trade(self, trade: Dict[str, Any]) -> Optional[float]:
+        """Record a data-api / RTDS trade dict"""
+        return self.record_fill(
+            trade.get('asset', ''),
+            trade.get('side', ''),
+            float(trade.get('size', 0) or 0),
+            float(trade.get('price', 0) or 0)
+        )
+
+    def resolve(self, asset: str, payout_price: float) -> Optional[float]:
+        """Close an open position at its resolution price (1.0 or 0.0)"""
+        pos = self.open_positions.get(asset)
+        if pos is None:
+            return None
+        pos_pnl = pos['pnl'] + pos['shares'] * payout_price - pos['cost']
+        self.realized_pnl += pos_pnl - pos['pnl']
+        del self.open_positions[asset]
+        if pos_pnl > 0:
+            self.wins += 1
+        else:
+            self.losses += 1
+        return pos_pnl
+
+    @property
+    def closed_positions(self) -> int:
+        return self.wins + self.losses
+
+    @property
+    def win_rate(self) -> float:
+        """Percentage of closed positions with positive P&L"""
+        closed = self.closed_positions
+        return (self.wins / closed) * 100 if closed > 0 else 0.0
+
+
+class EquityMetrics:
+    """Streaming drawdown, Sharpe and volatility over an equity curve"""
+
+    def __init__(self):
+        self.returns = RunningStats()
+        self.drawdown = DrawdownTracker()
+        self.last_equity: Optional[float] = None
+        self.last_timestamp: Optional[int] = None
+
+    def update(self, equity: float, timestamp: Optional[int] = None) -> None:
+        """Add one equity point"""
+        if self.last_equity is not None and self.last_equity > 0:
+            self.returns.push(((equity - self.last_equity) / self.last_equity) * 100)
+        self.drawdown.update(equity)
+        self.last_equity = equity
+        self.last_timestamp = timestamp
+
+    def extend(self, equity_points: Sequence[Tuple[int, float]]) -> None:
+        """Add (timestamp, equity) points"""
+        for timestamp, equity in equity_points:
+            self.update(equity, timestamp)
+
+    @property
+    def sharpe_ratio(self) -> float:
+        std = self.returns.std
+        return (self.returns.mean / std) * ANNUALIZATION_FACTOR if std > 0 else 0.0
+
+    @property
+    def volatility(self) -> float:
+        return self.returns.std * ANNUALIZATION_FACTOR
+
+    def summary(self) -> Dict[str, float]:
+        """Current metric values"""
+        return {
+            'max_drawdown': self.drawdown.max_drawdown,
+            'max_drawdown_amount': self.drawdown.max_drawdown_amount,
+            'current_drawdown': self.drawdown.current_drawdown,
+            'sharpe_ratio': self.sharpe_ratio,
+            'volatility': self.volatility,
+        }
+
+
+# ============================================================================
+# Batch (NumPy) versions
+# ============================================================================
+
+def _numpy():
+    """Import NumPy on first use (the live bot only needs the online accumulators)"""
+    import numpy
+    return numpy
+
+
+def equity_array(equity: EquityInput) -> 'np.ndarray':
+    """Equity values as a float array (accepts values or (timestamp, equity) pairs)"""
+    np = _numpy()
+    array = np.asarray(equity, dtype=np.float64)
+    if array.ndim == 2:
+        array = array[:, 1]
+    return array
+
+
+def equity_returns(equity: EquityInput) -> 'np.ndarray':
+    """Per-point percentage returns (points following non-positive equity are skipped)"""
+    np = _numpy()
+    values = equity_array(equity)
+    if values.size < 2:
+        return np.empty(0, dtype=np.float64)
+    prev, curr = values[:-1], values[1:]
+    valid = prev > 0
+    return (curr[valid] - prev[valid]) / prev[valid] * 100
+
+
+def max_drawdown(equity: EquityInput) -> Tuple[float, float]:
+    """Maximum drawdown (percentage, amount)"""
+    np = _numpy()
+    values = equity_array(equity)
+    if values.size < 2:
+        return 0.0, 0.0
+    peaks = np.maximum.accumulate(values)
+    safe_peaks = np.where(peaks > 0, peaks, 1.0)
+    drawdowns = np.where(peaks > 0, (peaks - values) / safe_peaks * 100, 0.0)
+    index = int(np.argmax(drawdowns))
+    if drawdowns[index] <= 0:
+        return 0.0, 0.0
+    return float(drawdowns[index]), float(peaks[index] - values[index])
+
+
+def sharpe_ratio(equity: EquityInput) -> float:
+    """Annualized Sharpe ratio of per-point returns"""
+    returns = equity_returns(equity)
+    if returns.size == 0:
+        return 0.0
+    std = float(returns.std())
+    return float(returns.mean()) / std * ANNUALIZATION_FACTOR if std > 0 else 0.0
+
+
+def volatility(equity: EquityInput) -> float:
+    """Annualized standard deviation of per-point returns"""
+    returns = equity_returns(equity)
+    if returns.size == 0:
+        return 0.0
+    return float(returns.std()) * ANNUALIZATION_FACTOR
+
+
+def resolved_prices_from_positions(positions: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Payout price per asset of resolved data-api positions
+
+    A position counts as resolved when it is redeemable or its curPrice is
+    exactly 0 or 1.
+    """
+    prices: Dict[str, float] = {}
+    for pos in positions:
+        asset = pos.get('asset')
+        if not asset or pos.get('curPrice') is None:
+            continue
+        price = float(pos['curPrice'])
+        if pos.get('redeemable') or price in (0.0, 1.0):
+            prices[asset] = 1.0 if price >= 0.5 else 0.0
+    return prices
+
+
+def win_rate(
+    trades: List[Dict[str, Any]],
+    resolved_prices: Optional[Dict[str, float]] = None,
+    default: float = NEUTRAL_WIN_RATE
+) -> float:
+    """
+    Win rate over positions closed within a trade history
+
+    Positions are closed by sells or by resolution (resolved_prices); `default`
+    is returned when none closed.
+    """
+    tracker = PositionOutcomeTracker()
+    for trade in trades:
+        tracker.record_trade(trade)
+    for asset, payout_price in (resolved_prices or {}).items():
+        tracker.resolve(asset, payout_price)
+    return tracker.win_rate if tracker.closed_positions > 0 else default
+
+
+# ============================================================================
+# Live metrics (fed by the bot's own fills)
+# ============================================================================
+
+_live_tracker: Optional[PositionOutcomeTracker] = None
+
+
+def get_live_tracker() -> PositionOutcomeTracker:
+    """Get the process-wide tracker of the bot's own fills"""
+    global _live_tracker
+    if _live_tracker is None:
+        _live_tracker = PositionOutcomeTracker()
+    return _live_tracker
+
+
+def record_live_fill(asset: str, side: str, size: float, price: float) -> Optional[float]:
+    """Record one of the bot's fills (size in shares)"""
+    return get_live_tracker().record_fill(asset, side, size, price)
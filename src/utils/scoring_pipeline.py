@@ -0,0 +1,109 @@
+"""
+Concurrent trader scoring with cached results
+
+Runs a per-trader analysis coroutine over many traders at once and stores each
+result in the results store. Before analyzing, one cheap request fetches the
+trader's latest trade; when it matches the trade the cached result was
+computed at (and the result is not too old), the cached result is reused.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+from ..config.env import ENV
+from ..utils.fetch_data import fetch_data_async
+from ..utils.results_store import ResultsStore, make_last_trade_key
+
+SCORING_CONCURRENCY = int(os.getenv('SCORING_CONCURRENCY', '4'))
+# Cached results older than this are recomputed even if no new trade was seen
+# (the history window moves forward over time)
+SCORING_CACHE_MAX_AGE_HOURS = float(os.getenv('SCORING_CACHE_MAX_AGE_HOURS', '24'))
+
+AnalyzeFn = Callable[[str], Awaitable[Dict[str, Any]]]
+ResultCallback = Callable[[int, int, Dict[str, Any], bool], None]
+
+
+async def fetch_last_trade_key(address: str) -> str:
+    """Key of a trader's most recent trade ('' if unavailable)"""
+    try:
+        trades = await fetch_data_async(
+            f'{ENV.DATA_API_URL}/activity?user={address}&type=TRADE&limit=1'
+        )
+    except Exception:
+        return ''
+    return make_last_trade_key(trades[0] if isinstance(trades, list) and trades else None)
+
+
+async def score_traders(
+    addresses: List[str],
+    analyze: AnalyzeFn,
+    source: str,
+    history_days: int,
+    config_key: str = '',
+    multiplier: float = 1.0,
+    concurrency: int = SCORING_CONCURRENCY,
+    on_result: Optional[ResultCallback] = None,
+    store: Optional[ResultsStore] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score traders concurrently, reusing cached results for unchanged traders
+
+    Args:
+        addresses: Traders to score
+        analyze: Coroutine returning a result dict for one trader
+        source: Name of the calling script (results are stored per source)
+        history_days: History window the analysis uses
+        config_key: Any other settings that change the result
+        multiplier: Copy multiplier (for strategy grouping in aggregate_results)
+        concurrency: Maximum traders analyzed at once
+        on_result: Called as on_result(done, total, result, cached) as traders finish
+        store: Results store (default store if omitted)
+
+    Returns:
+        Results in the same order as addresses
+    """
+    own_store = store is None
+    store = store or ResultsStore()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    max_age_seconds = SCORING_CACHE_MAX_AGE_HOURS * 3600
+    total = len(addresses)
+    done = 0
+
+    async def score_one(address: str) -> Dict[str, Any]:
+        nonlocal done
+        async with semaphore:
+            last_trade_key = await fetch_last_trade_key(address)
+            row = store.get(source, address, history_days, config_key)
+            cached = bool(
+                row
+                and last_trade_key
+                and row['last_trade_key'] == last_trade_key
+                and datetime.now().timestamp() - row['computed_at'] < max_age_seconds
+            )
+
+            if cached:
+                result = row['result']
+            else:
+                try:
+                    result = await analyze(address)
+                except Exception as e:
+                    result = {'address': address, 'error': str(e), 'roi': 0, 'total_pnl': 0}
+                # Failed analyses are stored but never reused (they may be transient)
+                error = str(result.get('error') or '')
+                reusable = not error or error.startswith('Not enough trades')
+                store.put(
+                    source, address, history_days, result,
+                    last_trade_key if reusable else '', config_key, multiplier
+                )
+
+        done += 1
+        if on_result:
+            on_result(done, total, result, cached)
+        return result
+
+    try:
+        return list(await asyncio.gather(*(score_one(address) for address in addresses)))
+    finally:
+        if own_store:
+            store.close()
@@ -0,0 +1,154 @@
+"""
+Startup profiling for the bot (enabled with --startup-profile)
+
+Records how long each module takes to import (inclusive and self time) and
+how long each startup phase takes, then prints a breakdown. Project modules
+that were already imported when timing started (the src package itself) are
+listed too, so every module that runs at startup shows up in the report. Phases may run
+concurrently, so each is reported with its start offset as well as its
+duration. When disabled every method is a cheap no-op.
+"""
+import sys
+import time
+from typing import List, Dict, Any, Optional, Awaitable, TypeVar
+
+T = TypeVar('T')
+
+STARTUP_PROFILE_FLAG = '--startup-profile'
+
+
+class _ImportTimer:
+    """Meta path hook that times module execution"""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self.profiler = profiler
+        self._finding = False
+        self._stack: List[List[Any]] = []
+
+    def find_spec(self, fullname, path, target=None):
+        if self._finding:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+
+        loader = spec.loader
+        # Builtin/frozen importers are classes shared by every module; only wrap loader instances
+        if loader is None or isinstance(loader, type) or not hasattr(loader, 'exec_module'):
+            return spec
+        exec_module = loader.exec_module
+        timer = self
+
+        def timed_exec_module(module):
+            frame = [fullname, 0.0]
+            timer._stack.append(frame)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                timer._stack.pop()
+                if timer._stack:
+                    timer._stack[-1][1] += elapsed
+                timer.profiler.imports[fullname] = (elapsed, elapsed - frame[1])
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            pass
+        return spec
+
+
+class StartupProfiler:
+    """Collects import and phase timings"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.imports: Dict[str, tuple] = {}
+        self.import_total = 0.0
+        self.phases: List[Dict[str, Any]] = []
+        self.marks: List[tuple] = []
+        # Project modules imported before start_import_timing() (not timed)
+        self.preloaded: List[str] = []
+        self._timer: Optional[_ImportTimer] = None
+        self._import_started = 0.0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def start_import_timing(self) -> None:
+        """Time every module imported from now on"""
+        if not self.enabled or self._timer:
+            return
+        self.preloaded = sorted(name for name in sys.modules if name == 'src' or name.startswith('src.'))
+        self._timer = _ImportTimer(self)
+        self._import_started = time.perf_counter()
+        sys.meta_path.insert(0, self._timer)
+
+    def stop_import_timing(self) -> None:
+        if not self._timer:
+            return
+        self.import_total += time.perf_counter() - self._import_started
+        if self._timer in sys.meta_path:
+            sys.meta_path.remove(self._timer)
+        self._timer = None
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await a startup phase, recording its timing"""
+        if not self.enabled:
+            return await awaitable
+        start = self.elapsed()
+        try:
+            return await awaitable
+        finally:
+            self.phases.append({'name': name, 'start': start, 'duration': self.elapsed() - start})
+
+    def mark(self, name: str) -> None:
+        """Record a point in time (e.g. first subscription confirmed)"""
+        if self.enabled:
+            self.marks.append((name, self.elapsed()))
+
+    def report(self, top: int = 15) -> None:
+        """Print the import and phase breakdown"""
+        if not self.enabled:
+            return
+        print()
+        print('=' * 70)
+        print('  STARTUP PROFILE')
+        print('=' * 70)
+        print(f'  Imports: {self.import_total * 1000:.0f} ms ({len(self.imports)} modules)')
+        print(f"  {'module':<44} {'total ms':>10} {'self ms':>10}")
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        for name, (total, own) in slowest:
+            print(f'  {name[:44]:<44} {total * 1000:>10.1f} {own * 1000:>10.1f}')
+        print(f"  Imported before timing: {', '.join(self.preloaded) or '-'}")
+        print()
+        print(f"  {'phase':<32} {'start ms':>10} {'duration ms':>12}")
+        for phase in sorted(self.phases, key=lambda p: p['start']):
+            print(f"  {phase['name'][:32]:<32} {phase['start'] * 1000:>10.0f} {phase['duration'] * 1000:>12.0f}")
+        for name, at in self.marks:
+            print(f"  {name[:32]:<32} {at * 1000:>10.0f} {'-':>12}")
+        print(f'  Total to ready: {self.elapsed() * 1000:.0f} ms')
+        print('=' * 70)
+        print()
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the process-wide profiler (enabled by --startup-profile)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler(enabled=STARTUP_PROFILE_FLAG in sys.argv)
+    return _profiler
@@ -1,7 +1,7 @@
 """
 System status and diagnostics utilities
 """
-import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))); import src.lib_core
+import asyncio
 import sys
 from typing import Dict, Any
 from colorama import init, Fore, Style
@@ -9,133 +9,118 @@ from colorama import init, Fore, Style
 init(autoreset=True)
 
 from ..config.env import ENV
-from ..utils.get_my_balance import get_my_balance
+from ..utils.onchain_reader import get_onchain_reader, format_units
 
 
-async def check_system_status() -> Dict[str, Any]:
-    """Perform comprehensive system status check"""
-    results = {
-        'healthy': True,
-        'checks': {},
-        'summary': {
-            'total_checks': 0,
-            'passed': 0,
-            'failed': 0,
-            'warnings': 0
-        }
-    }
-    
-    # Check MongoDB connection
-    results['summary']['total_checks'] += 1
+def _count(results: Dict[str, Any], check: Dict[str, Any]) -> None:
+    """Add a check's outcome to the summary"""
+    status = check['status']
+    if status == 'ok':
+        results['summary']['passed'] += 1
+    elif status == 'warning':
+        results['summary']['warnings'] += 1
+    else:
+        results['healthy'] = False
+        results['summary']['failed'] += 1
+
+
+def _check_mongodb() -> Dict[str, Dict[str, Any]]:
+    """Ping MongoDB (blocking; run in a thread)"""
     try:
         from ..config.db import get_client, get_database_name
         client = get_client()
         client.admin.command('ping')
         db_name = get_database_name()
-        results['checks']['mongodb'] = {
+        return {'mongodb': {
             'status': 'ok',
             'message': 'Connected',
             'details': f'Database: {db_name}'
-        }
-        results['summary']['passed'] += 1
+        }}
     except Exception as e:
-        results['healthy'] = False
-        results['checks']['mongodb'] = {
+        return {'mongodb': {
             'status': 'error',
             'message': 'Connection failed',
             'details': str(e)
-        }
-        results['summary']['failed'] += 1
-    
-    # Check RPC connection
-    results['summary']['total_checks'] += 1
+        }}
+
+
+async def _check_rpc_and_balance() -> Dict[str, Dict[str, Any]]:
+    """Check RPC connection and wallet balance (one batched RPC request)"""
+    checks = {}
+    wallet_short = f"{ENV.PROXY_WALLET[:6]}...{ENV.PROXY_WALLET[-4:]}"
     try:
-        from web3 import Web3
-        w3 = Web3(Web3.HTTPProvider(ENV.RPC_URL))
-        if w3.is_connected():
-            chain_id = w3.eth.chain_id
-            block_number = w3.eth.block_number
-            results['checks']['rpc'] = {
-                'status': 'ok',
-                'message': 'Connected',
-                'details': f'Chain ID: {chain_id}, Block: {block_number}'
-            }
-            results['summary']['passed'] += 1
-        else:
-            results['healthy'] = False
-            results['checks']['rpc'] = {
-                'status': 'error',
-                'message': 'Not connected',
-                'details': 'Unable to establish connection'
-            }
-            results['summary']['failed'] += 1
+        snapshot = await get_onchain_reader().read_wallets([ENV.PROXY_WALLET], include_chain=True)
     except Exception as e:
-        results['healthy'] = False
-        results['checks']['rpc'] = {
+        snapshot = None
+        rpc_error = str(e)
+    
+    if snapshot and snapshot['chain_id'] is not None:
+        checks['rpc'] = {
+            'status': 'ok',
+            'message': 'Connected',
+            'details': f"Chain ID: {snapshot['chain_id']}, Block: {snapshot['block_number']}"
+        }
+    else:
+        checks['rpc'] = {
             'status': 'error',
-            'message': 'Connection failed',
-            'details': str(e)
+            'message': 'Connection failed' if snapshot is None else 'Not connected',
+            'details': rpc_error if snapshot is None else 'Unable to establish connection'
         }
-        results['summary']['failed'] += 1
     
-    # Check wallet balance
-    results['summary']['total_checks'] += 1
-    try:
-        balance = get_my_balance(ENV.PROXY_WALLET)
-        wallet_short = f"{ENV.PROXY_WALLET[:6]}...{ENV.PROXY_WALLET[-4:]}"
-        
+    raw_balance = None
+    if snapshot:
+        raw_balance = snapshot['wallets'][ENV.PROXY_WALLET.lower()]['balances'].get(ENV.USDC_CONTRACT_ADDRESS.lower())
+    
+    if raw_balance is None:
+        checks['balance'] = {
+            'status': 'error',
+            'message': 'Balance check failed',
+            'details': '; '.join(snapshot['errors']) if snapshot and snapshot['errors'] else 'RPC unavailable'
+        }
+    else:
+        # USDC has 6 decimals
+        balance = format_units(raw_balance, 6)
         if balance < 10:
-            results['checks']['balance'] = {
+            checks['balance'] = {
                 'status': 'warning',
                 'message': f'${balance:.2f} USDC',
                 'details': f'Wallet: {wallet_short} - Low balance warning'
             }
-            results['summary']['warnings'] += 1
         else:
-            results['checks']['balance'] = {
+            checks['balance'] = {
                 'status': 'ok',
                 'message': f'${balance:.2f} USDC',
                 'details': f'Wallet: {wallet_short}'
             }
-            results['summary']['passed'] += 1
-    except Exception as e:
-        results['healthy'] = False
-        results['checks']['balance'] = {
-            'status': 'error',
-            'message': 'Balance check failed',
-            'details': str(e)
-        }
-        results['summary']['failed'] += 1
-    
-    # Check CLOB endpoints
-    results['summary']['total_checks'] += 1
+    return checks
+
+
+def _check_clob() -> Dict[str, Dict[str, Any]]:
+    """Check CLOB endpoints are configured"""
     try:
         clob_http = ENV.CLOB_HTTP_URL
         clob_ws = ENV.CLOB_WS_URL
         if clob_http and clob_ws:
-            results['checks']['clob'] = {
+            return {'clob': {
                 'status': 'ok',
                 'message': 'Configured',
                 'details': f'HTTP: {clob_http[:30]}..., WS: {clob_ws[:30]}...'
-            }
-            results['summary']['passed'] += 1
-        else:
-            results['checks']['clob'] = {
-                'status': 'warning',
-                'message': 'Partially configured',
-                'details': 'Some CLOB endpoints missing'
-            }
-            results['summary']['warnings'] += 1
+            }}
+        return {'clob': {
+            'status': 'warning',
+            'message': 'Partially configured',
+            'details': 'Some CLOB endpoints missing'
+        }}
     except Exception as e:
-        results['checks']['clob'] = {
+        return {'clob': {
             'status': 'error',
             'message': 'Configuration error',
             'details': str(e)
-        }
-        results['summary']['failed'] += 1
-    
-    # Check trader addresses
-    results['summary']['total_checks'] += 1
+        }}
+
+
+def _check_traders() -> Dict[str, Dict[str, Any]]:
+    """Check trader addresses are configured"""
     try:
         if hasattr(ENV, 'USER_ADDRESSES') and ENV.USER_ADDRESSES:
             if isinstance(ENV.USER_ADDRESSES, list):
@@ -144,33 +129,53 @@ async def check_system_status() -> Dict[str, Any]:
                 trader_count = len([a for a in ENV.USER_ADDRESSES.split(',') if a.strip()])
             
             if trader_count > 0:
-                results['checks']['traders'] = {
+                return {'traders': {
                     'status': 'ok',
                     'message': f'{trader_count} trader(s) configured',
                     'details': 'Traders loaded successfully'
-                }
-                results['summary']['passed'] += 1
-            else:
-                results['checks']['traders'] = {
-                    'status': 'warning',
-                    'message': 'No traders configured',
-                    'details': 'USER_ADDRESSES is empty'
-                }
-                results['summary']['warnings'] += 1
-        else:
-            results['checks']['traders'] = {
+                }}
+            return {'traders': {
                 'status': 'warning',
-                'message': 'Not configured',
-                'details': 'USER_ADDRESSES not set'
-            }
-            results['summary']['warnings'] += 1
+                'message': 'No traders configured',
+                'details': 'USER_ADDRESSES is empty'
+            }}
+        return {'traders': {
+            'status': 'warning',
+            'message': 'Not configured',
+            'details': 'USER_ADDRESSES not set'
+        }}
     except Exception as e:
-        results['checks']['traders'] = {
+        return {'traders': {
             'status': 'error',
             'message': 'Configuration error',
             'details': str(e)
+        }}
+
+
+async def check_system_status() -> Dict[str, Any]:
+    """Perform comprehensive system status check (network checks run concurrently)"""
+    results = {
+        'healthy': True,
+        'checks': {},
+        'summary': {
+            'total_checks': 0,
+            'passed': 0,
+            'failed': 0,
+            'warnings': 0
         }
-        results['summary']['failed'] += 1
+    }
+    
+    check_groups = await asyncio.gather(
+        asyncio.to_thread(_check_mongodb),
+        _check_rpc_and_balance(),
+    )
+    check_groups += [_check_clob(), _check_traders()]
+    
+    for group in check_groups:
+        for name, check in group.items():
+            results['checks'][name] = check
+            results['summary']['total_checks'] += 1
+            _count(results, check)
     
     return results
 
@@ -249,7 +254,6 @@ def display_system_status(results: Dict[str, Any]) -> None:
 
 async def run_system_status_check():
     """Run system status check as a standalone script"""
-    import asyncio
     from ..config.db import connect_db
     
     try:
@@ -278,6 +282,5 @@ async def run_system_status_check():
 
 
 if __name__ == '__main__':
-    import asyncio
     asyncio.run(run_system_status_check())
 
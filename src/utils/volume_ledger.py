@@ -0,0 +1,157 @@
+"""
+Rolling 24h copy volume ledger
+
+Keeps the USD we bought over the last day in memory so the daily volume caps
+(total, per trader, per market) can be checked on every trade without summing
+activity documents from MongoDB. Volume is kept in a ring of fixed-width time
+buckets with running totals: recording a fill and expiring an old bucket are
+both O(1) per key touched.
+
+At startup the ledger is rebuilt from the activity documents of the last day
+that carry myBoughtSize.
+"""
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+DAY_SECONDS = 24 * 60 * 60
+DEFAULT_BUCKET_SECONDS = 5 * 60
+
+TOTAL_KEY = ('total', '')
+
+LedgerKey = Tuple[str, str]
+
+
+def trader_key(trader_address: str) -> LedgerKey:
+    return ('trader', trader_address.lower())
+
+
+def market_key(market: str) -> LedgerKey:
+    return ('market', market)
+
+
+class RollingVolumeLedger:
+    """USD volume over a sliding window, kept in time buckets"""
+
+    def __init__(self, window_seconds: int = DAY_SECONDS, bucket_seconds: int = DEFAULT_BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = max(1, -(-window_seconds // bucket_seconds))
+        self._buckets: List[Dict[LedgerKey, float]] = [{} for _ in range(self.bucket_count)]
+        self._totals: Dict[LedgerKey, float] = {}
+        # Absolute index of the newest bucket in the ring
+        self._head: Optional[int] = None
+
+    def _bucket_index(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _advance(self, now: float) -> None:
+        """Expire buckets that fell out of the window"""
+        index = self._bucket_index(now)
+        if self._head is None:
+            self._head = index
+            return
+        if index <= self._head:
+            return
+        # A long idle gap expires at most the whole ring
+        for expired in range(max(self._head + 1, index - self.bucket_count + 1), index + 1):
+            bucket = self._buckets[expired % self.bucket_count]
+            for key, amount in bucket.items():
+                remaining = self._totals.get(key, 0.0) - amount
+                if remaining > 1e-9:
+                    self._totals[key] = remaining
+                else:
+                    self._totals.pop(key, None)
+            bucket.clear()
+        self._head = index
+
+    def add(
+        self,
+        amount_usd: float,
+        trader_address: Optional[str] = None,
+        market: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Record volume (negative amounts correct an earlier reservation)
+
+        Entries older than the window are ignored; entries from before the
+        newest bucket (e.g. replayed history) go to their own bucket.
+        """
+        now = time.time()
+        timestamp = now if timestamp is None else timestamp
+        self._advance(now)
+        index = self._bucket_index(timestamp)
+        if index <= self._head - self.bucket_count or index > self._head or not amount_usd:
+            return
+        bucket = self._buckets[index % self.bucket_count]
+        keys = [TOTAL_KEY]
+        if trader_address:
+            keys.append(trader_key(trader_address))
+        if market:
+            keys.append(market_key(market))
+        for key in keys:
+            bucket[key] = bucket.get(key, 0.0) + amount_usd
+            self._totals[key] = self._totals.get(key, 0.0) + amount_usd
+
+    def volume(self, key: LedgerKey = TOTAL_KEY) -> float:
+        """USD recorded under a key within the window"""
+        self._advance(time.time())
+        return max(0.0, self._totals.get(key, 0.0))
+
+    def total_volume(self) -> float:
+        return self.volume(TOTAL_KEY)
+
+    def trader_volume(self, trader_address: str) -> float:
+        return self.volume(trader_key(trader_address))
+
+    def market_volume(self, market: str) -> float:
+        return self.volume(market_key(market))
+
+    def clear(self) -> None:
+        for bucket in self._buckets:
+            bucket.clear()
+        self._totals.clear()
+        self._head = None
+
+
+def activity_volume_usd(activity: Dict[str, Any]) -> float:
+    """USD we spent copying an activity (attributed fill if recorded, else tokens at the trader's price)"""
+    allocation = activity.get('copyAllocation') or {}
+    if 'filledUsd' in allocation:
+        return float(allocation['filledUsd'] or 0)
+    netting = activity.get('netting') or {}
+    if netting.get('side') == 'BUY':
+        return float(netting.get('nettedShares', 0) or 0) * float(netting.get('nettedPrice', 0) or 0) + \
+            float(netting.get('executedUsd', 0) or 0)
+    return float(activity.get('myBoughtSize', 0) or 0) * float(activity.get('price', 0) or 0)
+
+
+def rebuild_volume_ledger(ledger: 'RollingVolumeLedger', user_addresses: List[str]) -> int:
+    """Replay the last day's copied buys from MongoDB into the ledger; returns the number of fills"""
+    from ..models.user_history import get_user_activity_collection
+
+    since = int(time.time()) - ledger.bucket_count * ledger.bucket_seconds
+    ledger.clear()
+    fills = 0
+    for address in user_addresses:
+        cursor = get_user_activity_collection(address).find(
+            {'type': 'TRADE', 'side': 'BUY', 'myBoughtSize': {'$gt': 0}, 'timestamp': {'$gte': since}},
+            {'timestamp': 1, 'conditionId': 1, 'price': 1, 'myBoughtSize': 1, 'copyAllocation': 1, 'netting': 1}
+        )
+        for activity in cursor:
+            # Activity timestamps come in seconds or milliseconds depending on the source
+            timestamp = activity['timestamp']
+            timestamp = timestamp / 1000 if timestamp > 1000000000000 else timestamp
+            ledger.add(activity_volume_usd(activity), address, activity.get('conditionId'), timestamp)
+            fills += 1
+    return fills
+
+
+_ledger: Optional[RollingVolumeLedger] = None
+
+
+def get_volume_ledger() -> RollingVolumeLedger:
+    """Process-wide volume ledger"""
+    global _ledger
+    if _ledger is None:
+        _ledger = RollingVolumeLedger()
+    return _ledger